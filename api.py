@@ -0,0 +1,121 @@
+# api.py
+# Headless HTTP API over the orchestrator pipeline.
+#   uvicorn api:app --workers 4        or        python api.py
+import asyncio
+import os
+from typing import Dict, Optional, Tuple
+
+from fastapi import FastAPI, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from starlette.concurrency import run_in_threadpool
+
+from utils import http_client, llm, providers, topics, tracing
+from utils.events import build_events
+from utils.orchestrator import (MAX_ARTICLES_LIMIT, cached_pipeline, get_prefetcher, get_result_cache, note_query,
+                                pipeline_key, run_pipeline)
+from utils.timeline import BUCKETS, bucket_milestones, bucket_records
+
+API_HOST = os.getenv("API_HOST", "0.0.0.0")
+API_PORT = int(os.getenv("API_PORT", "8000"))
+API_WORKERS = int(os.getenv("API_WORKERS", "2"))
+
+app = FastAPI(title="AI News Orchestrator")
+
+# identical concurrent queries share one computation (per worker process)
+_inflight: Dict[Tuple, asyncio.Future] = {}
+
+
+async def _pipeline(q: str, max_articles: int, use_openai: bool, refresh: bool) -> Dict:
+    key = pipeline_key(q, max_articles, use_openai)
+    note_query(q, max_articles, use_openai)  # every request counts, coalesced or not
+    if not refresh:
+        hit = get_result_cache().get(key)
+        if hit is not None:
+            return hit
+    task = _inflight.get(key)
+    if task is None:
+        # the pipeline is blocking (requests, spaCy), so it runs in the threadpool
+        task = asyncio.ensure_future(run_in_threadpool(cached_pipeline, q, max_articles, use_openai, refresh, False))
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    # shield: a client disconnecting must not cancel work other requests wait on
+    result, _ = await asyncio.shield(task)
+    return result
+
+
+QueryParam = Query(..., min_length=1, description="Event or topic")
+MaxArticles = Query(8, ge=1, le=MAX_ARTICLES_LIMIT)
+UseOpenAI = Query(True)
+Refresh = Query(False, description="Ignore cached results")
+Bucket = Query(None, pattern="^(auto|day|week|month)$", description="Also aggregate the milestones per day/week/month")
+Events = Query(False, description="Also group the articles' dated sentences into events")
+
+
+@app.get("/timeline")
+async def timeline(q: str = QueryParam, max_articles: int = MaxArticles, use_openai: bool = UseOpenAI, refresh: bool = Refresh,
+                   bucket: Optional[str] = Bucket, events: bool = Events):
+    # checked here too: FastAPI before 0.100 ignores Query(pattern=...)
+    if bucket and bucket != "auto" and bucket not in BUCKETS:
+        raise HTTPException(status_code=422, detail=f"bucket must be auto, {', '.join(BUCKETS)}")
+    result = await _pipeline(q, max_articles, use_openai, refresh)
+    out = {"query": q, "milestones": [m.to_dict() for m in result["milestones"]]}
+    if bucket:
+        out["buckets"] = bucket_records(bucket_milestones(result["milestones"], bucket))
+    if events:
+        found = await run_in_threadpool(build_events, [m.article for m in result["milestones"]])
+        out["events"] = [m.to_dict() for m in found]
+    return out
+
+
+@app.get("/articles")
+async def articles(q: str = QueryParam, max_articles: int = MaxArticles, use_openai: bool = UseOpenAI, refresh: bool = Refresh):
+    result = await _pipeline(q, max_articles, use_openai, refresh)
+    # without the raw provider payload
+    return {"query": q, "articles": [a.to_dict() for a in result["articles"]]}
+
+
+@app.get("/summary")
+async def summary(q: str = QueryParam, max_articles: int = MaxArticles, use_openai: bool = UseOpenAI, refresh: bool = Refresh):
+    result = await _pipeline(q, max_articles, use_openai, refresh)
+    return {"query": q, "summary": result["summary"]}
+
+
+@app.get("/stats")
+async def stats():
+    cache = get_result_cache()
+    return {
+        "http": http_client.http_stats(),
+        "llm_cache": llm.cache_stats(),
+        "result_cache": {"entries": len(cache), "hits": cache.hits, "misses": cache.misses},
+        "prefetch": get_prefetcher().stats(),
+        "providers": providers.provider_stats(),
+        "topics": topics.topic_stats(),
+        "stages": tracing.histograms_json(),
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    # per-stage latency histograms in Prometheus text format
+    return tracing.prometheus_text()
+
+
+def _traced_run(q: str, max_articles: int, use_openai: bool, refresh: bool, profile: str) -> Dict:
+    with tracing.start_trace(q, profile=profile) as trace:
+        run_pipeline(q, max_articles, use_openai, refresh)
+    return {"query": q, "totals": trace.totals(), "spans": trace.waterfall(), "profile": trace.profile}
+
+
+@app.get("/debug/trace")
+async def debug_trace(q: str = QueryParam, max_articles: int = MaxArticles, use_openai: bool = UseOpenAI, refresh: bool = Refresh,
+                      profile: str = Query("", pattern="^(|cprofile|sample)$", description="cprofile or sample")):
+    # one uncached, uncoalesced run with its span waterfall and optional profile
+    if profile not in ("", "cprofile", "sample"):  # FastAPI before 0.100 ignores pattern=
+        raise HTTPException(status_code=422, detail="profile must be cprofile or sample")
+    return await run_in_threadpool(_traced_run, q, max_articles, use_openai, refresh, profile)
+
+
+if __name__ == "__main__":
+    import uvicorn
+    # each worker is a separate process with its own caches and coalescing
+    uvicorn.run("api:app", host=API_HOST, port=API_PORT, workers=API_WORKERS)
@@ -3,11 +3,10 @@ from dotenv import load_dotenv
 load_dotenv()
 import os
 import streamlit as st
-from utils.fetcher import aggregate_articles
-from utils.nlp import extract_entities, find_dates, openai_summarize, lightweight_summary
-from utils.timeline import build_milestones_from_entities, plot_timeline
-import pandas as pd
-from utils.nlp import openai_summarize, lightweight_summary
+from utils.orchestrator import MAX_ARTICLES_LIMIT, iter_cached_pipeline
+from utils.events import build_events
+from utils.timeline import TIMELINE_MAX_POINTS, plot_timeline
+from utils.tracing import plot_waterfall, start_trace
 
 
 
@@ -189,69 +188,125 @@ query = st.text_input(label="", value="Chandrayaan-3 mission", label_visibility=
 
 cols = st.columns([1, 1, 1, 2])
 with cols[0]:
-    max_articles = st.number_input("Max articles", min_value=3, max_value=20, value=8, step=1)
+    max_articles = st.number_input("Max articles", min_value=3, max_value=MAX_ARTICLES_LIMIT, value=8, step=1)
 with cols[1]:
     use_openai = st.checkbox("Use OpenAI summarization", value=True)
 with cols[2]:
     run_button = st.button("🚀 Generate Timeline")
 with cols[3]:
-    st.write("")
+    refresh = st.checkbox("♻️ Refresh (ignore cached results)", value=False)
+
+with st.sidebar:
+    debug = st.checkbox("🐞 Debug: stage waterfall", value=False)
+    profiler = st.selectbox("Profiler", ["off", "cprofile", "sample"], disabled=not debug)
 
 # -----------------------------
 # Main Logic
 # -----------------------------
-if run_button and query.strip():
-    with st.spinner("Fetching articles and building timeline..."):
-        articles = aggregate_articles(query, max_articles)
-        if not articles:
-            st.warning("No articles found. Check NEWSAPI_KEY or internet connection.")
-        for a in articles:
-            a['entities'] = extract_entities(a.get('content', '') or a.get('title', ''))
-            a['dates_found'] = find_dates((a.get('content') or "") + " " + (a.get('title') or ""))
-        milestones = build_milestones_from_entities(articles)
-        texts = [a.get('content') or a.get('title') or "" for a in articles]
-        summary_text = openai_summarize(texts) if use_openai else lightweight_summary(texts)
-        #summary_text = openai_summarize(texts)
+def render_milestones(milestones):
+    for m in milestones:
+        date = m.date or "Unknown date"
+        also = f" · also reported by {', '.join(m.corroborations)}" if m.corroborations else ""
+        st.markdown(f"""
+        <div class='timeline-box auto-box'>
+            <span class='timeline-item'>{date}</span>
+            <h4 class='auto-text'>{m.headline}</h4>
+            <div class='auto-text'>{m.description}</div>
+            <a href='{m.url}' target='_blank'>🔗 Source</a>{also}
+        </div>
+        """, unsafe_allow_html=True)
+
 
+if run_button and query.strip():
+    # results are cached per server process, shared by every session;
+    # a fresh run streams: boxes appear per article, the summary per token
+    status = st.empty()
     tab1, tab2, tab3 = st.tabs(["🕒 Timeline", "🧠 Summary", "📊 Sources"])
-    st.markdown(f"<div class='auto-text'>{summary_text}</div>", unsafe_allow_html=True)
+    top_summary = st.empty()
     with tab1:
         st.markdown("### Timeline")
-        fig = plot_timeline(milestones)
-        if fig:
-            st.plotly_chart(fig, use_container_width=True)
-        else:
-            st.info("No date-tagged milestones; showing articles below.")
-        for m in milestones:
-            date = m.get("date") or "Unknown date"
-            st.markdown(f"""
-            <div class='timeline-box auto-box'>
-                <span class='timeline-item'>{date}</span>
-                <h4 class='auto-text'>{m.get('headline')}</h4>
-                <div class='auto-text'>{m.get('description')}</div>
-                <a href='{m.get('url')}' target='_blank'>🔗 Source</a>
-            </div>
-            """, unsafe_allow_html=True)
-       
-
+        timeline_slot = st.empty()
     with tab2:
         st.markdown("### 🧠 Event Summary")
-        st.markdown(f"<div class='auto-text'>{summary_text}</div>", unsafe_allow_html=True)
-
+        summary_slot = st.empty()
     with tab3:
         st.markdown("### 📊 Sources & Authenticity")
-        rows = []
-        for a in articles:
-            len_text = len((a.get('content') or "").strip())
-            score = min(100, max(30, int(len_text / 50)))
-            rows.append({
-                "source": a.get("source") or "Unknown",
-                "title": a.get("title") or "",
-                "url": a.get("url"),
-                "score": score
-            })
-        df = pd.DataFrame(rows)
-        st.dataframe(df[['source', 'title', 'score']])
+        sources_slot = st.empty()
+
+    # spans for the debug waterfall; the profiler only runs when asked for
+    with start_trace(query, profile=profiler if debug and profiler != "off" else "") as trace:
+        result, from_cache, n_arrived, summary_so_far = None, False, 0, ""
+        streamed = None  # boxes appended as milestones arrive; replaced by the full timeline at the end
+        status.info("Fetching articles and building timeline...")
+        for kind, payload in iter_cached_pipeline(query, int(max_articles), bool(use_openai), refresh=refresh):
+            if kind == "article":
+                n_arrived += 1
+                status.info(f"Fetched {n_arrived} article(s)...")
+            elif kind == "milestones":
+                if streamed is None:
+                    streamed = timeline_slot.container()
+                with streamed:
+                    render_milestones(payload)
+            elif kind == "summary":
+                if not summary_so_far:
+                    status.info("Writing summary...")
+                summary_so_far += payload
+                summary_slot.markdown(f"<div class='auto-text'>{summary_so_far}</div>", unsafe_allow_html=True)
+                top_summary.markdown(f"<div class='auto-text'>{summary_so_far}</div>", unsafe_allow_html=True)
+            else:  # "done" / "cached"
+                result, from_cache = payload, kind == "cached"
+        status.empty()
+
+        articles, milestones, summary_text = result["articles"], result["milestones"], result["summary"]
+        if from_cache:
+            st.caption("⚡ Served from cache — tick Refresh to fetch again.")
+        if not articles:
+            st.warning("No articles found. Check NEWSAPI_KEY or internet connection.")
+
+        top_summary.markdown(f"<div class='auto-text'>{summary_text}</div>", unsafe_allow_html=True)
+        summary_slot.markdown(f"<div class='auto-text'>{summary_text}</div>", unsafe_allow_html=True)
+        with timeline_slot.container():
+            fig = plot_timeline(milestones)
+            if fig:
+                st.plotly_chart(fig, use_container_width=True)
+            else:
+                st.info("No date-tagged milestones; showing articles below.")
+            # a long-running topic can hold TOPIC_TIMELINE_MAX milestones: boxes
+            # for the latest dated ones only, the chart above buckets them all
+            shown = [m for m in milestones if m.date][-TIMELINE_MAX_POINTS:] or milestones[:TIMELINE_MAX_POINTS]
+            if len(shown) < len(milestones):
+                st.caption(f"Showing the latest {len(shown)} of {len(milestones)} milestones.")
+            render_milestones(shown)
+            # dated sentences grouped across articles; only the ones several outlets report
+            events = [e for e in build_events([m.article for m in milestones]) if e.corroborations]
+            if events:
+                with st.expander(f"🧩 Events reported by several outlets ({len(events)})"):
+                    render_milestones(events[:TIMELINE_MAX_POINTS])
+
+        with sources_slot.container():
+            import pandas as pd
+            rows = []
+            for a in articles:
+                len_text = len(a.content.strip())
+                score = min(100, max(30, int(len_text / 50)))
+                rows.append({
+                    "source": a.source or "Unknown",
+                    "title": a.title,
+                    "url": a.url,
+                    "score": score
+                })
+            df = pd.DataFrame(rows)
+            st.dataframe(df[['source', 'title', 'score']])
+
+    if debug:
+        with st.expander("🐞 Stage waterfall", expanded=True):
+            wf = plot_waterfall(trace)
+            if wf:
+                st.plotly_chart(wf, use_container_width=True)
+            totals = sorted(trace.totals().items(), key=lambda t: t[1], reverse=True)
+            st.table([{"stage": k, "seconds": round(v, 3)} for k, v in totals])
+            if trace.profile:
+                st.code(trace.profile, language="text")
 
 # Footer
 st.markdown("""
@@ -0,0 +1,54 @@
+# benchmarks/bench_cache.py
+# Cold vs warm vs revalidated (304) extraction with the on-disk content cache.
+#   python -m benchmarks.bench_cache --articles 20 --latency 0.2
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.stub_server import StubServer, ARTICLE_HTML
+import utils.cache as cache_mod
+from utils.fetcher import extract_full_text
+
+
+def etag_handler(path, headers):
+    etag = f'"{abs(hash(path))}"'
+    if headers.get("If-None-Match") == etag:
+        return 304, {"ETag": etag}, b""
+    return 200, {"Content-Type": "text/html", "ETag": etag}, ARTICLE_HTML.format(n=path).encode()
+
+
+def timed(urls):
+    t0 = time.perf_counter()
+    out = [extract_full_text(u) for u in urls]
+    return time.perf_counter() - t0, sum(1 for t in out if t)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--articles", type=int, default=20)
+    ap.add_argument("--latency", type=float, default=0.2)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp, StubServer(latency=args.latency, handler=etag_handler) as srv:
+        cache = cache_mod.ContentCache(os.path.join(tmp, "bench.sqlite3"))
+        cache_mod._content_cache = cache
+        urls = [srv.url(f"/article/{i}?utm_source=bench") for i in range(args.articles)]
+
+        t_cold, n_cold = timed(urls)
+        hits = srv.hits
+        t_warm, n_warm = timed(urls)
+        warm_requests = srv.hits - hits
+        cache.ttl = 0  # everything stale -> conditional GETs
+        hits = srv.hits
+        t_reval, n_reval = timed(urls)
+        reval_requests = srv.hits - hits
+
+    print(f"articles={args.articles} latency={args.latency}s")
+    print(f"cold:         {t_cold:7.3f}s  extracted={n_cold}")
+    print(f"warm (fresh): {t_warm:7.3f}s  extracted={n_warm}  requests={warm_requests}")
+    print(f"revalidated:  {t_reval:7.3f}s  extracted={n_reval}  requests={reval_requests} (304)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# benchmarks/bench_candidates.py
+# Fetching and extracting many articles for one query: the original flow
+# (one request per provider, every page then submitted to the extraction
+# pool at once) vs iter_articles streaming NewsAPI pages into extraction
+# with a bounded window. The consumer drops each article after use. "held"
+# is what the stage still references when it ends (the articles, the
+# dedupe index); "transient" is the peak above that: responses, pages and
+# texts in flight.
+#   python -m benchmarks.bench_candidates --counts 100 500 1000
+import argparse
+import os
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from benchmarks.bench_e2e import RecordedProviders
+from utils.dedupe import NearDuplicateIndex
+
+QUERY = "Chandrayaan-3 mission"
+
+
+def legacy_articles(fetcher, query, n):
+    # iter_articles before streaming: NewsAPI, then RSS for the rest, then
+    # every page submitted to the extraction pool at once
+    index = NearDuplicateIndex()
+    found = fetcher.fetch_from_newsapi(query, page_size=n)
+    if len(found) < n:
+        found.extend(fetcher.fetch_from_gnews(query, page_size=n - len(found)))
+    candidates = [a for i, a in enumerate(found) if index.add_candidate(i, a.url, a.title, a.source or "") is None]
+    pool = ThreadPoolExecutor(max_workers=fetcher.EXTRACT_WORKERS)
+    futures = {pool.submit(fetcher.extract_full_text, a.url): (i, a) for i, a in enumerate(candidates)}
+    for fut in as_completed(futures):
+        i, a = futures[fut]
+        text = fut.result()
+        if index.add_text(i, text) is None:
+            a.content = text
+            yield a
+    pool.shutdown()
+
+
+def streamed_articles(fetcher, query, n):
+    for _, a in fetcher.iter_articles(query, n):
+        yield a
+
+
+def measure(run, fetcher, n):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    first, got = None, 0
+    for a in run(fetcher, QUERY, n):
+        if a.content:
+            first = first or time.perf_counter() - t0
+            got += 1
+        held = tracemalloc.get_traced_memory()[0]
+    wall = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return first or 0.0, wall, got, peak, held
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--counts", type=int, nargs="+", default=[100, 500, 1000])
+    args = ap.parse_args()
+
+    with RecordedProviders(max(args.counts)) as providers:
+        os.environ.update({
+            "NEWSAPI_URL": providers.server.url("/v2/everything"),
+            "GNEWS_RSS_URL": providers.server.url("/rss/search"),
+            "NEWSAPI_KEY": "bench",
+            "ARTICLE_CACHE_PATH": "",
+            "EXTRACT_DEADLINE": "600",
+            "EXTRACT_PER_HOST": os.environ.get("EXTRACT_WORKERS", "8"),
+        })
+        providers.load()
+        from utils import fetcher
+
+        measure(streamed_articles, fetcher, 8)  # imports and connections outside the timings
+        print(f"{'':10s} {'':10s} {'first article':>14s} {'all':>8s} {'with text':>10s} {'held MB':>8s} "
+              f"{'transient MB':>13s}")
+        for n in args.counts:
+            # the fixture splits NewsAPI / RSS by the largest count; keep that share per size
+            providers.from_newsapi = int(n * 0.75)
+            providers.count = n
+            for name, run in (("original", legacy_articles), ("streamed", streamed_articles)):
+                first, wall, got, peak, held = measure(run, fetcher, n)
+                print(f"{n:10d} {name:10s} {first:13.2f}s {wall:7.1f}s {got:10d} {held / 2 ** 20:8.1f} "
+                      f"{(peak - held) / 2 ** 20:13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# benchmarks/bench_dates.py
+# Original per-match/per-sentence dateparser find_dates vs utils.dates.
+#   python -m benchmarks.bench_dates [--corpus DIR] [--chars 20000]
+import argparse
+import glob
+import os
+import re
+import time
+
+import dateparser
+
+from utils.nlp import find_dates
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "articles")
+
+LEGACY_PATTERNS = [
+    r"\b(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Sept|Oct|Nov|Dec)[a-z]*\s+\d{1,2},?\s*\d{0,4}",
+    r"\b\d{4}-\d{2}-\d{2}\b",
+    r"\b\d{1,2}\s+(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{4}\b",
+    r"\b\d{1,2}/\d{1,2}/\d{2,4}\b",
+    r"\b\d{4}\b",
+]
+
+# sentences with no written-out date that dateparser still reads: relative
+# phrases, number words and other languages; each is its own sentence
+RELATIVE_PHRASES = [
+    "Two days ago", "3 hours ago", "midnight", "in three weeks", "Half an hour ago", "tomorrow at noon",
+    "vor zwei Tagen", "gestern", "il y a deux jours", "hace 2 días", "ayer", "há dois dias", "2 giorni fa",
+    "два дня назад", "пару дней назад", "сутки назад", "dwa dni temu", "iki gün önce", "2日前", "昨天",
+    "The court met on Tuesday", "He said the vote was close",
+]
+
+
+def legacy_find_dates(text):
+    # find_dates as it was before utils/dates.py
+    res = set()
+    for pat in LEGACY_PATTERNS:
+        for m in re.findall(pat, text, flags=re.IGNORECASE):
+            parsed = dateparser.parse(m)
+            if parsed:
+                res.add(parsed.date().isoformat())
+    for sent in text.split("."):
+        dt = dateparser.parse(sent)
+        if dt:
+            res.add(dt.date().isoformat())
+    return sorted(res)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--corpus", default=FIXTURES, help="directory of .txt article bodies")
+    ap.add_argument("--chars", type=int, default=20000, help="grow each document to about this size")
+    args = ap.parse_args()
+
+    docs = []
+    for path in sorted(glob.glob(os.path.join(args.corpus, "*.txt"))):
+        text = open(path, encoding="utf-8").read()
+        docs.append((os.path.basename(path), (text + "\n\n") * max(1, args.chars // max(1, len(text)))))
+    if not docs:
+        raise SystemExit(f"no .txt files in {args.corpus}")
+    docs.append(("(relative phrases)", ". ".join(RELATIVE_PHRASES) + "."))
+
+    dateparser.parse("2020-01-01")  # load locale data outside the timings
+    find_dates("January 1, 2020.")
+
+    t_old = t_new = 0.0
+    mismatches = 0
+    for name, text in docs:
+        t0 = time.perf_counter()
+        old = legacy_find_dates(text)
+        t_old += time.perf_counter() - t0
+        t0 = time.perf_counter()
+        new = find_dates(text)
+        t_new += time.perf_counter() - t0
+        if old != new:
+            mismatches += 1
+            print(f"MISMATCH {name}: only legacy={sorted(set(old) - set(new))} only new={sorted(set(new) - set(old))}")
+        print(f"{name:24s} chars={len(text):6d} dates={len(new):3d}")
+
+    print(f"legacy: {t_old:8.3f}s   fast: {t_new:8.3f}s   speedup: {t_old / max(t_new, 1e-9):6.1f}x   mismatches: {mismatches}")
+    if mismatches:
+        raise SystemExit(f"{mismatches} document(s) dated differently")
+
+
+if __name__ == "__main__":
+    main()
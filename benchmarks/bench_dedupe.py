@@ -0,0 +1,169 @@
+# benchmarks/bench_dedupe.py
+# Exact URL/title dedupe (the old fetch_candidates) vs NearDuplicateIndex on a
+# synthetic corpus with known duplicates: AMP / mobile / tracking URLs,
+# syndicated wire copies with a new byline and footer, and trimmed copies.
+# Reports precision/recall and the CPU time the NLP stages no longer spend.
+#   python -m benchmarks.bench_dedupe --stories 60 --copies 3
+import argparse
+import glob
+import os
+import random
+import time
+from collections import defaultdict
+
+from utils import dates
+from utils.dedupe import NearDuplicateIndex
+from utils.llm import estimate_tokens
+from utils.models import Article
+from utils.nlp import extract_entities_batch, find_dates
+from utils.timeline import build_milestones_from_entities
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "articles")
+OUTLETS = ["ndtv.com", "thehindu.com", "reuters.com", "bbc.co.uk", "apnews.com", "livemint.com"]
+
+
+def markov_story(chain, starts, rng, words):
+    # a same-topic but distinct story: random walk over the fixtures' bigrams
+    out = [rng.choice(starts)]
+    while len(out) < words:
+        nxt = chain.get(out[-1])
+        out.append(rng.choice(nxt) if nxt else rng.choice(starts))
+    paras, step = [], max(40, words // 6)
+    for i in range(0, len(out), step):
+        paras.append(" ".join(out[i:i + step]).rstrip(".") + ".")
+    return "\n\n".join(paras)
+
+
+def syndicate(text, rng, kind):
+    paras = text.split("\n\n")
+    if kind == "wire":
+        words = text.split()
+        for _ in range(max(1, len(words) // 40)):  # light copy-editing
+            words[rng.randrange(len(words))] = rng.choice(["said", "reported", "officials", "on", "the"])
+        return f"NEW DELHI ({rng.choice(['Reuters', 'PTI', 'AP'])}) - " + " ".join(words) + \
+            "\n\n(Reporting by staff; editing by desk.) Read more at our site."
+    if kind == "trimmed":
+        paras.pop(rng.randrange(1, len(paras)))
+        return "\n\n".join(paras)
+    return text  # same page, different URL
+
+
+def url_variant(url, rng):
+    host_path = url.split("://", 1)[1]
+    return rng.choice([
+        f"https://{host_path}?utm_source=twitter&utm_medium=social",
+        f"https://{host_path}/amp",
+        f"https://www.google.com/amp/s/{host_path}",
+        "https://m." + host_path.replace("www.", "", 1),
+        f"https://{host_path}?outputType=amp",
+    ])
+
+
+def build_corpus(stories, copies, seed):
+    rng = random.Random(seed)
+    words = []
+    for p in sorted(glob.glob(os.path.join(FIXTURES, "*.txt"))):
+        words += open(p, encoding="utf-8").read().split()
+    chain = defaultdict(list)
+    for a, b in zip(words, words[1:]):
+        chain[a].append(b)
+    starts = [w for w in words if w[:1].isupper()]
+    corpus = []
+    for s in range(stories):
+        text = markov_story(chain, starts, rng, rng.randint(250, 700))
+        title = " ".join(text.split()[:9]).rstrip(".,")
+        outlet = rng.choice(OUTLETS)
+        url = f"https://www.{outlet}/news/story-{s}"
+        corpus.append({"story": s, "url": url, "title": title, "source": outlet, "content": text})
+        for c in range(rng.randint(0, copies)):
+            kind = rng.choice(["url", "wire", "trimmed"])
+            if kind == "url":
+                corpus.append({"story": s, "url": url_variant(url, rng), "title": title, "source": outlet, "content": text})
+                continue
+            other = rng.choice([o for o in OUTLETS if o != outlet])
+            corpus.append({
+                "story": s, "url": f"https://www.{other}/world/{s}-{c}-syndicated",
+                "title": rng.choice([title, title + " - " + other, "UPDATE: " + title]),
+                "source": other, "content": syndicate(text, rng, kind),
+            })
+    rng.shuffle(corpus)
+    return corpus
+
+
+def exact_dedupe(corpus):
+    # fetch_candidates before near-duplicate detection
+    seen, kept, dropped = {}, [], []
+    for a in corpus:
+        key = (a["url"] or a["title"]).strip()
+        if key in seen:
+            dropped.append((a, seen[key]))
+            continue
+        seen[key] = a
+        kept.append(a)
+    return kept, dropped
+
+
+def near_dedupe(corpus):
+    # the same two passes iter_articles makes
+    index, by_key, kept, dropped = NearDuplicateIndex(), {}, [], []
+    for i, a in enumerate(corpus):
+        by_key[i] = a
+        original = index.add_candidate(i, a["url"], a["title"], a["source"])
+        if original is None:
+            original = index.add_text(i, a["content"])
+        if original is not None:
+            dropped.append((a, by_key[original]))
+            continue
+        kept.append(a)
+    return kept, dropped
+
+
+def score(corpus, dropped):
+    true_dups = len(corpus) - len({a["story"] for a in corpus})
+    tp = sum(1 for a, orig in dropped if a["story"] == orig["story"])
+    precision = tp / len(dropped) if dropped else 1.0
+    recall = tp / true_dups if true_dups else 1.0
+    return precision, recall
+
+
+def nlp_stages(articles):
+    # what every kept article costs after extraction (LLM measured in tokens)
+    dates.parse_span.cache_clear()
+    dates._dateparser_iso.cache_clear()
+    t0 = time.process_time()
+    for a in articles:
+        find_dates(a["content"] + " " + a["title"])
+    extract_entities_batch([a["content"] for a in articles])
+    build_milestones_from_entities([Article(title=a["title"], url=a["url"], source=a["source"], content=a["content"])
+                                    for a in articles])
+    tokens = sum(estimate_tokens(a["content"]) for a in articles)
+    return time.process_time() - t0, tokens
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--stories", type=int, default=60)
+    ap.add_argument("--copies", type=int, default=3, help="max duplicates per story")
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    corpus = build_corpus(args.stories, args.copies, args.seed)
+    print(f"corpus: {len(corpus)} articles, {args.stories} stories, {len(corpus) - args.stories} duplicates")
+    nlp_stages(corpus[:2])  # warm up imports
+
+    results = {}
+    for name, dedupe in (("exact url/title", exact_dedupe), ("near-duplicate", near_dedupe)):
+        t0 = time.process_time()
+        kept, dropped = dedupe(corpus)
+        t_dedupe = time.process_time() - t0
+        precision, recall = score(corpus, dropped)
+        t_nlp, tokens = nlp_stages(kept)
+        results[name] = (t_dedupe, t_nlp)
+        print(f"{name:16s} kept={len(kept):4d}  precision={precision:.3f}  recall={recall:.3f}  "
+              f"dedupe cpu={t_dedupe:6.3f}s  nlp cpu={t_nlp:6.3f}s  llm input~{tokens} tokens")
+    (d0, n0), (d1, n1) = results["exact url/title"], results["near-duplicate"]
+    print(f"cpu saved: {(d0 + n0) - (d1 + n1):.3f}s ({(1 - (d1 + n1) / (d0 + n0)) * 100:.0f}%)")
+
+
+if __name__ == "__main__":
+    main()
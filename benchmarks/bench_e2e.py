@@ -0,0 +1,312 @@
+# benchmarks/bench_e2e.py
+# The whole pipeline (provider search -> extraction -> dates/NER -> timeline ->
+# summary) against recorded NewsAPI / Google News RSS / article-page fixtures
+# served locally, at several article counts. Reports per-stage time from the
+# tracing spans, wall-clock p50/p95, throughput and peak RSS, and compares the
+# run with a stored baseline.
+#   python -m benchmarks.bench_e2e --counts 8 20 100 1000
+#   python -m benchmarks.bench_e2e --save-baseline      # after an intended change
+import argparse
+import glob
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from urllib.parse import parse_qs, urlsplit
+from xml.sax.saxutils import escape
+
+from benchmarks.stub_server import StubServer
+
+HERE = os.path.dirname(__file__)
+RECORDED = os.path.join(HERE, "fixtures", "recorded")
+FIXTURES = os.path.join(HERE, "fixtures", "articles")
+BASELINE = os.path.join(HERE, "baseline_e2e.json")
+QUERY = "Chandrayaan-3 mission"
+NEWSAPI_SHARE = 0.75  # the rest of each result set comes from the RSS fallback
+MIN_STAGE_SECONDS = 0.01  # stages faster than this are too noisy to compare
+# settings that decide which stages run (NLP_WORKERS=0: extract_entities_batch
+# in-process instead of analyze_articles); recorded with every result
+SETTINGS = ("NLP_WORKERS", "EXTRACT_WORKERS", "EXTRACT_ENGINE")
+
+
+def percentile(values, p):
+    values = sorted(values)
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+
+class RecordedProviders:
+    """
+    Replays the recorded provider responses for `count` articles: NewsAPI
+    returns the recorded articles cycled up to its share, the RSS feed the
+    rest. Every result points at a page on this server whose body is a
+    distinct Markov story (see load()), so no two articles are near-duplicates.
+    """
+
+    def __init__(self, count):
+        with open(os.path.join(RECORDED, "newsapi_everything.json"), encoding="utf-8") as f:
+            self.newsapi = json.load(f)
+        with open(os.path.join(RECORDED, "gnews_search.xml"), encoding="utf-8") as f:
+            rss = f.read()
+        with open(os.path.join(RECORDED, "article_page.html"), encoding="utf-8") as f:
+            self.page = f.read()
+        self.rss_head, rest = rss.split("<item>", 1)
+        self.rss_item = "<item>" + rest.split("</item>", 1)[0] + "</item>"
+        self.rss_tail = "</channel>\n</rss>\n"
+        self.count = count
+        self.from_newsapi = max(1, int(count * NEWSAPI_SHARE))
+        self.stories = []
+        self.server = StubServer(handler=self._get)
+
+    def load(self, seed=0):
+        # imports utils, so call it once the environment points at this server
+        from benchmarks.bench_dedupe import markov_story
+
+        rng = random.Random(seed)
+        words = []
+        for p in sorted(glob.glob(os.path.join(FIXTURES, "*.txt"))):
+            words += open(p, encoding="utf-8").read().split()
+        chain = defaultdict(list)
+        for a, b in zip(words, words[1:]):
+            chain[a].append(b)
+        starts = [w for w in words if w[:1].isupper()]
+        start = datetime(2023, 7, 14, 9, 30, tzinfo=timezone.utc)
+        self.stories = []
+        for i in range(self.count):
+            text = markov_story(chain, starts, rng, rng.randint(250, 700))
+            self.stories.append({
+                "title": " ".join(text.split()[:9]).rstrip(".,") + f" ({i})",
+                "body": text,
+                "published": start + timedelta(hours=7 * i),
+            })
+
+    def _get(self, path, headers):
+        parts = urlsplit(path)
+        if parts.path == "/v2/everything":
+            params = parse_qs(parts.query)
+            size = int(params.get("pageSize", ["100"])[0])
+            start = (int(params.get("page", ["1"])[0]) - 1) * size
+            return self._json(self._newsapi(max(0, min(size, self.from_newsapi - start)), start))
+        if parts.path == "/rss/search":
+            return 200, {"Content-Type": "application/rss+xml; charset=utf-8"}, self._rss().encode()
+        if parts.path.startswith("/news/"):
+            i = int(parts.path.rsplit("/", 1)[1])
+            s = self.stories[i]
+            body = "\n".join(f"<p>{escape(p)}</p>" for p in s["body"].split("\n\n"))
+            html = self.page.format(title=escape(s["title"]), body=body, published=s["published"].isoformat(),
+                                    url=self.server.url(parts.path))
+            return 200, {"Content-Type": "text/html; charset=utf-8"}, html.encode()
+        return 404, {"Content-Type": "text/plain"}, b"not found"
+
+    @staticmethod
+    def _json(data):
+        return 200, {"Content-Type": "application/json"}, json.dumps(data).encode()
+
+    def _newsapi(self, n, start=0):
+        recorded = self.newsapi["articles"]
+        out = []
+        for i in range(start, start + n):
+            art = dict(recorded[i % len(recorded)])
+            s = self.stories[i]
+            art.update(title=s["title"], url=self.server.url(f"/news/{i}"),
+                       publishedAt=s["published"].strftime("%Y-%m-%dT%H:%M:%SZ"))
+            out.append(art)
+        return {"status": "ok", "totalResults": self.from_newsapi, "articles": out}
+
+    def _rss(self, start=None, stop=None):
+        items = []
+        for i in range(self.from_newsapi if start is None else start, self.count if stop is None else stop):
+            s = self.stories[i]
+            item = self.rss_item
+            for tag, value in (("title", escape(s["title"])), ("link", self.server.url(f"/news/{i}")),
+                               ("pubDate", format_datetime(s["published"], usegmt=True))):
+                head, rest = item.split(f"<{tag}>", 1)
+                item = f"{head}<{tag}>{value}</{tag}>" + rest.split(f"</{tag}>", 1)[1]
+            items.append(item)
+        return self.rss_head + "\n    ".join(items) + "\n  " + self.rss_tail
+
+    def __enter__(self):
+        self.server.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.__exit__(*exc)
+
+
+def worker(count, repeats, use_openai, llm_latency):
+    # one article count in a fresh process, so ru_maxrss is this size's peak
+    with RecordedProviders(count) as providers:
+        # utils reads its settings at import time
+        os.environ.update({
+            "NEWSAPI_URL": providers.server.url("/v2/everything"),
+            "GNEWS_RSS_URL": providers.server.url("/rss/search"),
+            "NEWSAPI_KEY": "bench",
+            "OPENAI_API_KEY": "bench",
+            # measure real work: no content/LLM caches, no local store
+            "ARTICLE_CACHE_PATH": "",
+            "LLM_CACHE_PATH": "",
+            "ARTICLE_STORE_PATH": "",
+            "PREFETCH_TOPICS": "0",
+            "EXTRACT_DEADLINE": "600",
+            "LLM_RPM": "100000",
+            # every fixture page lives on one host
+            "EXTRACT_PER_HOST": os.environ.get("EXTRACT_WORKERS", "8"),
+        })
+        providers.load()
+        from benchmarks.fake_openai import FakeOpenAI
+
+        with FakeOpenAI(base_latency=llm_latency) as fake:
+            import openai
+            from utils import extract, fetcher, nlp_pool, topics
+            from utils.orchestrator import run_pipeline
+            from utils.tracing import start_trace
+
+            openai.api_base = fake.api_base
+            settings = {"NLP_WORKERS": nlp_pool.NLP_WORKERS, "EXTRACT_WORKERS": fetcher.EXTRACT_WORKERS,
+                        "EXTRACT_ENGINE": extract.EXTRACT_ENGINE}
+            # untimed: lazy imports (newspaper, dateparser, spaCy) and first connections
+            run_pipeline(QUERY, min(count, 8), use_openai, refresh=True)
+            fake.reset()
+            walls, stages, articles = [], defaultdict(list), 0
+            for r in range(repeats):
+                # every run starts from an empty topic timeline and new stories:
+                # merged into the previous run's timeline its articles would all
+                # be known, and re-parsed text hits the workers' date memo
+                topics._timelines.clear()
+                providers.load(seed=r + 1)
+                with start_trace(QUERY, profile="") as trace:
+                    t0 = time.perf_counter()
+                    result = run_pipeline(QUERY, count, use_openai, refresh=True)
+                    walls.append(time.perf_counter() - t0)
+                articles = sum(1 for a in result["articles"] if a.content)
+                for s in trace.waterfall():
+                    if s["stage"] != "request":
+                        stages[s["stage"]].append(s["duration"])
+            llm_calls = fake.calls
+
+    wall_p50 = percentile(walls, 50)
+    return {
+        "count": count,
+        "articles": articles,
+        "repeats": repeats,
+        "wall_p50": round(wall_p50, 4),
+        "wall_p95": round(percentile(walls, 95), 4),
+        "articles_per_s": round(articles / wall_p50, 2) if wall_p50 else 0.0,
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "llm_calls": llm_calls // repeats,
+        "settings": settings,
+        "stages": {
+            name: {
+                "calls": len(d) // repeats,
+                "total": round(sum(d) / repeats, 4),
+                "p50": round(percentile(d, 50), 5),
+                "p95": round(percentile(d, 95), 5),
+            } for name, d in sorted(stages.items())
+        },
+    }
+
+
+def run_worker(count, args):
+    cmd = [sys.executable, "-m", "benchmarks.bench_e2e", "--worker", str(count),
+           "--repeats", str(args.repeats), "--llm-latency", str(args.llm_latency)]
+    if args.no_openai:
+        cmd.append("--no-openai")
+    out = subprocess.run(cmd, check=True, capture_output=True, text=True,
+                         cwd=os.path.dirname(os.path.abspath(HERE))).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def regressions(result, base, tolerance):
+    # (what, baseline, now) for every metric more than `tolerance` worse, and
+    # for every stage only one side has (None on the other): a renamed or
+    # new stage means the baseline no longer describes the pipeline. Runs
+    # with other SETTINGS than the baseline's run other stages by design;
+    # only the ones both have are compared.
+    out = []
+    checks = [("wall_p50", base["wall_p50"], result["wall_p50"]),
+              ("wall_p95", base["wall_p95"], result["wall_p95"]),
+              ("peak_rss_mb", base["peak_rss_mb"], result["peak_rss_mb"])]
+    if base.get("settings") == result["settings"]:
+        for name in sorted(base["stages"].keys() - result["stages"].keys()):
+            out.append((f"stage {name} missing", base["stages"][name]["total"], None))
+        for name in sorted(result["stages"].keys() - base["stages"].keys()):
+            out.append((f"stage {name} not in baseline", None, result["stages"][name]["total"]))
+    for name, b in base["stages"].items():
+        if b["total"] >= MIN_STAGE_SECONDS and name in result["stages"]:
+            checks.append((f"stage {name}", b["total"], result["stages"][name]["total"]))
+    for what, before, now in checks:
+        if now > before * (1 + tolerance):
+            out.append((what, before, now))
+    return out
+
+
+def report(r):
+    print(f"\n{r['count']} articles ({r['articles']} with text, {r['repeats']} runs): "
+          f"wall p50 {r['wall_p50']:.2f}s p95 {r['wall_p95']:.2f}s  "
+          f"{r['articles_per_s']:.1f} articles/s  peak RSS {r['peak_rss_mb']:.0f} MB  llm calls {r['llm_calls']}")
+    print(f"  {'stage':28s} {'calls':>6s} {'total s':>9s} {'p50 ms':>9s} {'p95 ms':>9s}")
+    for name, s in sorted(r["stages"].items(), key=lambda p: -p[1]["total"]):
+        print(f"  {name:28s} {s['calls']:6d} {s['total']:9.3f} {s['p50'] * 1000:9.2f} {s['p95'] * 1000:9.2f}")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--counts", type=int, nargs="+", default=[8, 20, 100, 1000])
+    ap.add_argument("--repeats", type=int, default=3)
+    ap.add_argument("--llm-latency", type=float, default=0.05, help="fixed seconds per fake completion")
+    ap.add_argument("--no-openai", action="store_true", help="lightweight summary instead of the LLM")
+    ap.add_argument("--baseline", default=BASELINE)
+    ap.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown before flagging")
+    ap.add_argument("--save-baseline", action="store_true")
+    ap.add_argument("--worker", type=int, help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.worker:
+        print(json.dumps(worker(args.worker, args.repeats, not args.no_openai, args.llm_latency)))
+        return
+
+    results = {}
+    for count in args.counts:
+        results[str(count)] = r = run_worker(count, args)
+        report(r)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=1, sort_keys=True)
+        print(f"\nbaseline written to {args.baseline}")
+        return
+    if not os.path.exists(args.baseline):
+        print("\nno baseline; run with --save-baseline to create one")
+        return
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    failed = False
+    print()
+    for count, r in results.items():
+        if count not in baseline:
+            print(f"{count}: not in baseline")
+            continue
+        if baseline[count].get("settings") != r["settings"]:
+            print(f"{count}: baseline settings {baseline[count].get('settings')}, this run {r['settings']}; "
+                  f"comparing the stages both have")
+        found = regressions(r, baseline[count], args.tolerance)
+        for what, before, now in found:
+            if before is None or now is None:
+                print(f"REGRESSION {count} articles: {what}")
+            else:
+                print(f"REGRESSION {count} articles: {what} {before:g} -> {now:g} (+{now / before - 1:.0%})")
+        failed = failed or bool(found)
+        if not found:
+            print(f"{count}: ok (within {args.tolerance:.0%} of baseline)")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+# benchmarks/bench_events.py
+# Sentence-level event clustering: a pairwise Python loop (dict-of-weights
+# cosine for every pair of same-day sentences, then union-find) vs the
+# NumPy engine in utils/events.py, on the same TF-IDF weights. Articles are
+# Markov text from the fixtures with planted events: one sentence per event,
+# reworded and dated in a different format by each article that reports it.
+# Checks both give the same events and how many planted ones come out whole.
+#   python -m benchmarks.bench_events --articles 100 500
+import argparse
+import glob
+import os
+import random
+import time
+from collections import defaultdict
+
+from benchmarks.bench_dedupe import FIXTURES, OUTLETS, markov_story
+from utils import events
+from utils.models import Article
+
+MONTH_NAMES = ["January", "February", "March", "April", "May", "June", "July", "August", "September", "October",
+               "November", "December"]
+
+
+def date_formats(y, m, d, rng):
+    return rng.choice([f"{y}-{m:02d}-{d:02d}", f"{MONTH_NAMES[m - 1]} {d}, {y}", f"{d} {MONTH_NAMES[m - 1]} {y}",
+                       f"{MONTH_NAMES[m - 1]} {d}"])
+
+
+def build_articles(n, seed):
+    rng = random.Random(seed)
+    words = []
+    for p in sorted(glob.glob(os.path.join(FIXTURES, "*.txt"))):
+        words += open(p, encoding="utf-8").read().split()
+    chain = defaultdict(list)
+    for a, b in zip(words, words[1:]):
+        chain[a].append(b)
+    starts = [w for w in words if w[:1].isupper()]
+    planted = []  # (date parts, sentence words)
+    for _ in range(n // 2):
+        text = markov_story(chain, starts, rng, rng.randint(14, 24))
+        base = [w.strip(".!?") for w in text.split() if w.strip(".!?")]  # one sentence
+        planted.append(((2023, 1 + rng.randrange(12), 1 + rng.randrange(28)), base))
+    texts = [[markov_story(chain, starts, rng, rng.randint(150, 400)).replace("\n\n", " ")] for _ in range(n)]
+    truth = {}  # (article, sentence start) -> planted event
+    for e, ((y, m, d), base) in enumerate(planted):
+        for i in rng.sample(range(n), rng.randint(1, 6)):
+            kept = [w for w in base if rng.random() > 0.15]
+            sentence = f"On {date_formats(y, m, d, rng)} {' '.join(kept)}."
+            texts[i].append(sentence)
+            truth[(i, sentence)] = e
+    articles = []
+    for i, parts in enumerate(texts):
+        rng.shuffle(parts)
+        articles.append(Article(title=f"Story {i}", url=f"https://example.com/{i}", source=rng.choice(OUTLETS),
+                                published_at="2023-12-31T00:00:00Z", content=" ".join(parts)))
+    return articles, truth
+
+
+def pairwise_labels(words, dates, threshold):
+    # the same TF-IDF weights, compared pair by pair in Python
+    rows, terms, weights = events.tfidf(words)
+    vectors = [dict() for _ in words]
+    for r, t, w in zip(rows.tolist(), terms.tolist(), weights.tolist()):
+        vectors[r][t] = w
+    parent = list(range(len(words)))
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    by_day = defaultdict(list)
+    for i, d in enumerate(dates):
+        by_day[d].append(i)
+    for same_day in by_day.values():
+        for a_pos, a in enumerate(same_day):
+            va = vectors[a]
+            for b in same_day[a_pos + 1:]:
+                vb = vectors[b]
+                small, big = (va, vb) if len(va) < len(vb) else (vb, va)
+                if sum(w * big.get(t, 0.0) for t, w in small.items()) >= threshold:
+                    parent[find(b)] = find(a)
+    return [find(i) for i in range(len(words))]
+
+
+def numpy_labels(words, dates, threshold):
+    import numpy as np
+    _, day = np.unique(np.array(dates, dtype=str), return_inverse=True)
+    left, right, sims = events.similar_pairs(*events.tfidf(words), day)
+    linked = sims >= threshold
+    return events.components(len(words), left[linked], right[linked]).tolist()
+
+
+def partition(labels):
+    groups = defaultdict(list)
+    for i, label in enumerate(labels):
+        groups[label].append(i)
+    return sorted(groups.values())
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--articles", type=int, nargs="+", default=[100, 500])
+    ap.add_argument("--threshold", type=float, default=events.EVENT_SIMILARITY)
+    args = ap.parse_args()
+
+    events.build_events(build_articles(10, seed=0)[0])
+    print(f"{'articles':>8s} {'sentences':>10s} {'pairwise s':>11s} {'numpy s':>8s} {'build_events s':>15s} "
+          f"{'events':>7s} {'planted whole':>14s} {'same':>5s}")
+    for n in args.articles:
+        articles, truth = build_articles(n, seed=n)
+        sentences, dates, words, owners = events.mentions(articles)
+        t0 = time.perf_counter()
+        slow = pairwise_labels(words, dates, args.threshold)
+        t_slow = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        fast = numpy_labels(words, dates, args.threshold)
+        t_fast = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        found = events.build_events(articles, args.threshold)
+        t_build = time.perf_counter() - t0
+
+        # a planted event is whole when its mentions, and nothing else planted, share one label
+        label_of = {}
+        for i, (s, o) in enumerate(zip(sentences, owners)):
+            if (o, s) in truth:
+                label_of.setdefault(truth[(o, s)], set()).add(fast[i])
+        members = defaultdict(set)
+        for e, labels in label_of.items():
+            for label in labels:
+                members[label].add(e)
+        whole = sum(1 for e, labels in label_of.items() if len(labels) == 1 and members[next(iter(labels))] == {e})
+        print(f"{n:8d} {len(sentences):10d} {t_slow:11.2f} {t_fast:8.3f} {t_build:15.3f} {len(found):7d} "
+              f"{whole / max(1, len(label_of)):13.0%} {str(partition(slow) == partition(fast)):>5s}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# benchmarks/bench_feeds.py
+# Feed -> articles: the original BeautifulSoup "xml" tree + find_all("item")
+# vs the streaming lxml iterparse in utils/feeds.py, on large feeds built
+# from the recorded Google News response (RSS 2.0) and an Atom rendering of
+# the same items. Reports CPU per feed, peak traced memory, and how much of
+# the feed each parser had to read.
+#   python -m benchmarks.bench_feeds --items 1000 10000 --limits 8 100 0
+import argparse
+import io
+import os
+import time
+import tracemalloc
+from xml.sax.saxutils import escape
+
+from bs4 import BeautifulSoup
+
+from utils.feeds import iter_feed
+
+RECORDED = os.path.join(os.path.dirname(__file__), "fixtures", "recorded", "gnews_search.xml")
+
+
+def legacy_parse(content, limit):
+    # fetch_from_gnews before utils/feeds.py (RSS only)
+    soup = BeautifulSoup(content, "xml")
+    out = []
+    for it in soup.find_all("item")[:limit]:
+        out.append((it.title.text, it.pubDate.text if it.pubDate else None, it.link.text,
+                    it.source.text if it.source else None))
+    return out
+
+
+def streamed_parse(content, limit):
+    src = CountingReader(content)
+    out = [(a.title, a.published_at, a.url, a.source) for a in iter_feed(src, limit)]
+    return out, src.read_bytes
+
+
+class CountingReader(io.RawIOBase):
+    # a response body: read in chunks, counting what was consumed
+    def __init__(self, data):
+        self.data = io.BytesIO(data)
+        self.read_bytes = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        chunk = self.data.read(min(len(b), 16384))
+        b[:len(chunk)] = chunk
+        self.read_bytes += len(chunk)
+        return len(chunk)
+
+
+def build_feeds(n):
+    raw = open(RECORDED, encoding="utf-8").read()
+    head, rest = raw.split("<item>", 1)
+    items = ["<item>" + chunk.split("</item>", 1)[0] + "</item>" for chunk in ("<item>" + rest).split("<item>")[1:]]
+    soup = BeautifulSoup(raw, "xml")
+    parsed = [(it.title.text, it.pubDate.text, it.link.text, it.source.text) for it in soup.find_all("item")]
+    rss_items, atom_entries = [], []
+    for i in range(n):
+        item = items[i % len(items)].replace("?oc=5", f"?oc=5&amp;n={i}")
+        rss_items.append(item)
+        title, published, link, source = parsed[i % len(parsed)]
+        atom_entries.append(
+            f"<entry><title>{escape(title)}</title><link rel=\"alternate\" href=\"{escape(link)}&amp;n={i}\"/>"
+            f"<id>urn:item:{i}</id><updated>{published}</updated><summary>{escape(title)}</summary>"
+            f"<source><title>{escape(source)}</title></source></entry>")
+    rss = head + "\n    ".join(rss_items) + "\n  </channel>\n</rss>\n"
+    atom = ("<?xml version=\"1.0\" encoding=\"utf-8\"?>\n<feed xmlns=\"http://www.w3.org/2005/Atom\">"
+            "<title>Google News</title><id>urn:feed</id>" + "\n".join(atom_entries) + "</feed>\n")
+    return rss.encode(), atom.encode()
+
+
+def measure(fn, *args):
+    tracemalloc.start()
+    t0 = time.process_time()
+    out = fn(*args)
+    cpu = time.process_time() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return out, cpu, peak
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--items", type=int, nargs="+", default=[1000, 10000])
+    ap.add_argument("--limits", type=int, nargs="+", default=[8, 100, 0], help="items wanted; 0 = all")
+    args = ap.parse_args()
+
+    print(f"{'feed':14s} {'KB':>7s} {'limit':>6s} {'parser':>10s} {'CPU ms':>8s} {'peak MB':>8s} {'read':>6s} {'same':>5s}")
+    for n in args.items:
+        rss, atom = build_feeds(n)
+        for kind, body in (("rss", rss), ("atom", atom)):
+            for limit in args.limits:
+                limit = limit or n
+                (new, read), cpu_new, peak_new = measure(streamed_parse, body, limit)
+                label = f"{kind} x{n}"
+                if kind == "rss":
+                    old, cpu_old, peak_old = measure(legacy_parse, body, limit)
+                    print(f"{label:14s} {len(body) / 1024:7.0f} {limit:6d} {'bs4':>10s} {cpu_old * 1000:8.1f} "
+                          f"{peak_old / 2 ** 20:8.1f} {'100%':>6s}")
+                    same = str(old == new)
+                else:
+                    same = str(len(new) == limit)
+                print(f"{label:14s} {len(body) / 1024:7.0f} {limit:6d} {'iterparse':>10s} {cpu_new * 1000:8.1f} "
+                      f"{peak_new / 2 ** 20:8.1f} {read / len(body):6.0%} {same:>5s}")
+
+
+if __name__ == "__main__":
+    main()
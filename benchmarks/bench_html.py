@@ -0,0 +1,107 @@
+# benchmarks/bench_html.py
+# Page -> text: the original extract_full_text (newspaper3k download + parse,
+# then a second download parsed by BeautifulSoup's html.parser when newspaper
+# finds nothing) vs utils.extract (one download, streaming lxml pass,
+# newspaper3k only as a fallback). Two page kinds: ordinary articles, and
+# data-heavy pages (results tables, scoreboards) newspaper3k gives up on.
+#   python -m benchmarks.bench_html --pages 50
+import argparse
+import random
+import threading
+import time
+
+import requests
+from bs4 import BeautifulSoup
+
+import utils.cache as cache_mod
+from benchmarks.bench_e2e import RecordedProviders
+from benchmarks.stub_server import StubServer
+from utils.extract import html_to_text
+from utils.fetcher import extract_full_text
+
+
+def legacy_extract(url):
+    # extract_full_text before the shared session and single download
+    try:
+        from newspaper import Article
+        art = Article(url)
+        art.download()
+        art.parse()
+        if art.text and len(art.text) > 50:
+            return art.text
+    except Exception:
+        pass
+    try:
+        r = requests.get(url, timeout=10, headers={"User-Agent": "Mozilla/5.0"})
+        soup = BeautifulSoup(r.content, "html.parser")
+        paragraphs = [p.get_text().strip() for p in soup.find_all("p")]
+        return "\n\n".join([p for p in paragraphs if len(p) > 30])[:20000]
+    except Exception:
+        return ""
+
+
+def results_page(i, rng, template):
+    rows = []
+    for c in range(rng.randint(20, 60)):
+        a, b = rng.randint(300000, 700000), rng.randint(300000, 700000)
+        rows.append(f"<p>Constituency {c + 1}: R. Sharma (BJP) {a:,} votes; A. Khan (INC) {b:,} votes; "
+                    f"margin {abs(a - b):,}; turnout {rng.uniform(55, 80):.1f}%.</p>")
+    return template.format(title=f"Results by constituency, table {i}", body="\n".join(rows),
+                            published="2024-06-04T18:00:00+05:30", url=f"/results/{i}")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pages", type=int, default=50, help="pages of each kind")
+    args = ap.parse_args()
+    cache_mod.CACHE_PATH = ""  # every call downloads
+
+    providers = RecordedProviders(args.pages)
+    providers.load()
+    rng = random.Random(1)
+    pages = {}
+    for i in range(args.pages):
+        pages[f"/article/{i}"] = providers._get(f"/news/{i}", {})[2]
+        pages[f"/results/{i}"] = results_page(i, rng, providers.page).encode()
+    sent = {"bytes": 0, "requests": 0}
+    lock = threading.Lock()
+
+    def handler(path, headers):
+        # newspaper3k also asks for the page's images (top-image detection)
+        body = pages.get(path, b"")
+        with lock:
+            sent["bytes"] += len(body)
+            sent["requests"] += 1
+        if not body:
+            return 404, {"Content-Type": "text/plain"}, body
+        return 200, {"Content-Type": "text/html; charset=utf-8"}, body
+
+    legacy_extract("http://127.0.0.1:1/warmup")  # import newspaper outside the timings
+    with StubServer(handler=handler) as srv:
+        print(f"{'':34s} {'CPU ms/page':>12s} {'KB/page':>9s} {'requests/page':>14s} {'chars/page':>11s}")
+        for kind in ("article", "results"):
+            urls = [srv.url(f"/{kind}/{i}") for i in range(args.pages)]
+            for name, fn in (("original", legacy_extract), ("extract_full_text", extract_full_text)):
+                fn(urls[0])  # warm connections and parsers
+                sent["bytes"] = sent["requests"] = 0
+                t0 = time.process_time()
+                texts = [fn(u) for u in urls]
+                cpu = (time.process_time() - t0) / len(urls)
+                chars = sum(len(t) for t in texts) / len(urls)
+                print(f"{kind + ' pages, ' + name:34s} {cpu * 1000:12.2f} {sent['bytes'] / len(urls) / 1024:9.1f}"
+                      f" {sent['requests'] / len(urls):14.1f} {chars:11.0f}")
+
+        # parsing alone, same bytes, no network
+        print()
+        for kind in ("article", "results"):
+            bodies = [pages[f"/{kind}/{i}"] for i in range(args.pages)]
+            for engine in ("newspaper", "lxml"):
+                t0 = time.process_time()
+                for b in bodies:
+                    html_to_text("http://example.com/a", b, "utf-8", engine=engine)
+                cpu = (time.process_time() - t0) / len(bodies)
+                print(f"{kind + ' parse, ' + engine:34s} {cpu * 1000:12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# benchmarks/bench_http.py
+# Fresh connection per request vs the shared pooled session, plus retry behaviour.
+#   python -m benchmarks.bench_http --requests 200
+import argparse
+import time
+
+import requests
+
+from benchmarks.stub_server import StubServer, ARTICLE_HTML
+from utils import http_client
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--requests", type=int, default=200)
+    args = ap.parse_args()
+
+    calls = {}
+
+    def handler(path, headers):
+        if path.startswith("/flaky"):
+            # fail twice with 503 + Retry-After, then succeed
+            calls[path] = calls.get(path, 0) + 1
+            if calls[path] <= 2:
+                return 503, {"Retry-After": "0"}, b"busy"
+        return 200, {"Content-Type": "text/html"}, ARTICLE_HTML.format(n=path).encode()
+
+    with StubServer(handler=handler) as srv:
+        urls = [srv.url(f"/article/{i}") for i in range(args.requests)]
+
+        t0 = time.perf_counter()
+        for u in urls:
+            requests.get(u, timeout=10)
+        t_plain = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        for u in urls:
+            http_client.get(u, timeout=10)
+        t_pooled = time.perf_counter() - t0
+        pooled = http_client.http_stats()
+
+        flaky = [http_client.get(srv.url(f"/flaky/{i}"), timeout=10).status_code for i in range(5)]
+        stats = http_client.http_stats()
+
+    print(f"requests={args.requests}")
+    print(f"requests.get per call: {t_plain:7.3f}s  connections={args.requests}")
+    print(f"pooled session:        {t_pooled:7.3f}s  connections={pooled['connections_opened']}  reused={pooled['connections_reused']}")
+    print(f"flaky endpoint statuses={flaky}  retries={stats['retries']}")
+
+
+if __name__ == "__main__":
+    main()
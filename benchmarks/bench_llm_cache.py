@@ -0,0 +1,54 @@
+# benchmarks/bench_llm_cache.py
+# Completion cache: cold run, identical rerun, and a rerun where a few of the
+# articles changed (unchanged ones reuse their cached map summaries).
+#   python -m benchmarks.bench_llm_cache --articles 20 --changed 3
+import argparse
+import glob
+import os
+import tempfile
+import time
+
+import openai
+
+from benchmarks.fake_openai import FakeOpenAI
+import utils.cache as cache_mod
+from utils import llm, nlp
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "articles")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--articles", type=int, default=20)
+    ap.add_argument("--changed", type=int, default=3)
+    ap.add_argument("--chars", type=int, default=12000)
+    ap.add_argument("--latency", type=float, default=0.3)
+    args = ap.parse_args()
+
+    corpus = [open(p, encoding="utf-8").read() for p in sorted(glob.glob(os.path.join(FIXTURES, "*.txt")))]
+    texts = []
+    for i in range(args.articles):
+        base = f"(story {i})\n\n" + corpus[i % len(corpus)]
+        texts.append("\n\n".join([base] * max(1, args.chars // len(base))))
+
+    with tempfile.TemporaryDirectory() as tmp, FakeOpenAI(base_latency=args.latency) as fake:
+        cache_mod._completion_cache = cache_mod.CompletionCache(os.path.join(tmp, "llm.sqlite3"))
+        openai.api_base = fake.api_base
+        llm.OPENAI_KEY = nlp.OPENAI_KEY = "sk-fake"
+
+        runs = [("cold", texts), ("identical rerun", texts),
+                (f"{args.changed} articles changed", [t + "\n\nUpdate: new details emerged." if i < args.changed else t
+                                                      for i, t in enumerate(texts)])]
+        for name, batch in runs:
+            fake.reset()
+            t0 = time.perf_counter()
+            nlp.openai_summarize(batch)
+            print(f"{name:22s} {time.perf_counter() - t0:6.2f}s  completion calls={fake.calls}")
+
+        stats = llm.cache_stats()
+    print(f"hit rate={stats['hit_rate']:.0%}  saved prompt tokens={stats['saved_prompt_tokens']}  "
+          f"saved completion tokens={stats['saved_completion_tokens']}  saved latency={stats['saved_seconds']:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# benchmarks/bench_memory.py
+# Memory held per processed article + milestone: the old free-form dicts
+# (raw NewsAPI payload as a dict, entity dict of lists, milestone dicts with
+# copied headline/description) vs the slotted Article / Milestone records.
+# Measured with tracemalloc over everything each representation allocates.
+#   python -m benchmarks.bench_memory --articles 100000 --chars 2000
+import argparse
+import gc
+import glob
+import json
+import os
+import random
+import tracemalloc
+
+from utils.models import Article, Milestone, pack_entities
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "articles")
+RECORDED = os.path.join(os.path.dirname(__file__), "fixtures", "recorded", "newsapi_everything.json")
+OUTLETS = ["The Hindu", "Reuters", "BBC News", "NDTV", "Bloomberg", "TechCrunch", "AP News", "Mint"]
+
+
+def inputs(n, chars, seed):
+    # plain strings/dicts as they arrive from the providers and extraction
+    rng = random.Random(seed)
+    corpus = " ".join(open(p, encoding="utf-8").read() for p in sorted(glob.glob(os.path.join(FIXTURES, "*.txt"))))
+    corpus = (corpus + " ") * (chars // len(corpus) + 2)
+    recorded = json.load(open(RECORDED, encoding="utf-8"))["articles"]
+    for i in range(n):
+        start = rng.randrange(len(corpus) - chars)
+        payload = dict(recorded[i % len(recorded)])
+        payload.update(url=f"https://www.example{i % 300}.com/news/{i}", title=f"{payload['title']} #{i}")
+        yield {
+            "payload": json.loads(json.dumps(payload)),  # a fresh object graph, like r.json()
+            "content": corpus[start:start + chars],
+            "source": "".join(rng.choice(OUTLETS)),  # a new str each time, like parsed JSON
+            "entities": {"PERSON": ["S. Somanath"], "ORG": ["ISRO", "NASA"], "GPE": ["India", "Moon"],
+                         "DATE": ["August 23, 2023"], "EVENT": [], "MISC": ["Chandrayaan-3"]},
+            "dates": ["2023-08-23", "2023-07-14", "2019"],
+        }
+
+
+def as_dicts(item):
+    p = item["payload"]
+    a = {
+        "title": p["title"], "publishedAt": p["publishedAt"], "url": p["url"], "source": item["source"],
+        "raw": p, "content": item["content"], "entities": item["entities"], "dates_found": item["dates"],
+        "duplicates": [],
+    }
+    m = {"date": a["dates_found"][0], "headline": a["title"][:120],
+         "description": a["content"][:400] + "...", "url": a["url"], "source": a["source"]}
+    return a, m
+
+
+def as_records(item):
+    p = item["payload"]
+    a = Article.from_payload(p, title=p["title"], published_at=p["publishedAt"], url=p["url"],
+                             source=item["source"], content=item["content"],
+                             entity_pairs=pack_entities(item["entities"]), dates_found=tuple(item["dates"]))
+    return a, Milestone(a.dates_found[0], a)
+
+
+def measure(build, n, chars):
+    gc.collect()
+    tracemalloc.start()
+    kept = [build(item) for item in inputs(n, chars, seed=7)]
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return current, peak
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--articles", type=int, default=100000)
+    ap.add_argument("--chars", type=int, default=2000, help="extracted text per article")
+    args = ap.parse_args()
+
+    content = args.chars * args.articles  # the article text itself (1 byte/char), the same for both
+    print(f"articles={args.articles} chars/article={args.chars}")
+    print(f"{'':10s} {'retained MB':>12s} {'bytes/article':>14s} {'excl. text':>11s} {'peak MB':>9s}")
+    results = {}
+    for name, build in (("dicts", as_dicts), ("records", as_records)):
+        current, peak = measure(build, args.articles, args.chars)
+        results[name] = current
+        print(f"{name:10s} {current / 2 ** 20:12.1f} {current / args.articles:14.0f} "
+              f"{(current - content) / args.articles:11.0f} {peak / 2 ** 20:9.1f}")
+    print(f"records keep {results['records'] / results['dicts']:.0%} of the dicts' memory")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+# benchmarks/bench_ner.py
+# One nlp() call per article vs extract_entities_batch (nlp.pipe).
+# Needs en_core_web_sm:  python -m spacy download en_core_web_sm
+#   python -m benchmarks.bench_ner --counts 1 8 20 --processes 1 2
+import argparse
+import glob
+import os
+import time
+
+from utils import nlp as nlp_mod
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "articles")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--corpus", default=FIXTURES)
+    ap.add_argument("--counts", type=int, nargs="+", default=[1, 8, 20])
+    ap.add_argument("--processes", type=int, nargs="+", default=[1])
+    ap.add_argument("--batch-size", type=int, default=nlp_mod.NER_BATCH_SIZE)
+    args = ap.parse_args()
+
+    if nlp_mod.get_nlp() is None:
+        raise SystemExit("en_core_web_sm is not installed; run: python -m spacy download en_core_web_sm")
+    print("pipeline:", nlp_mod.get_nlp().pipe_names)
+
+    corpus = [open(p, encoding="utf-8").read() for p in sorted(glob.glob(os.path.join(args.corpus, "*.txt")))]
+    nlp_mod.extract_entities(corpus[0])  # warm up
+
+    for n in args.counts:
+        texts = [corpus[i % len(corpus)] + f"\n\n(copy {i})" for i in range(n)]
+        t0 = time.perf_counter()
+        single = [nlp_mod.extract_entities(t) for t in texts]
+        t_single = time.perf_counter() - t0
+        line = f"articles={n:4d}  per-doc: {t_single:7.3f}s"
+        for procs in args.processes:
+            t0 = time.perf_counter()
+            batch = nlp_mod.extract_entities_batch(texts, batch_size=args.batch_size, n_process=procs)
+            t_batch = time.perf_counter() - t0
+            assert batch == single, "batched output differs from per-document output"
+            line += f"  pipe(n_process={procs}): {t_batch:7.3f}s"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# benchmarks/bench_nlp_pool.py
+# Dates + NER for a 20-article query in-process vs in the NLP worker pool at
+# several worker counts. A second thread stands in for another user's
+# session: how much pure-Python work it gets done while the query runs shows
+# how long the GIL was held.
+#   python -m benchmarks.bench_nlp_pool --articles 20 --workers 0 1 2 4
+import argparse
+import multiprocessing
+import os
+import threading
+import time
+
+from benchmarks.bench_dedupe import build_corpus
+from utils import nlp_pool
+from utils.models import Article
+
+
+def other_session(stop, done):
+    while not stop.is_set():
+        sum(i * i for i in range(1000))
+        done[0] += 1
+
+
+def meet(barrier):
+    barrier.wait()
+
+
+def run(queries):
+    # fresh articles for every query: the date memo must not make repeats free
+    stop, done = threading.Event(), [0]
+    t = threading.Thread(target=other_session, args=(stop, done), daemon=True)
+    t0 = time.perf_counter()
+    t.start()
+    for corpus in queries:
+        nlp_pool.analyze_articles([Article(title=a["title"], content=a["content"]) for a in corpus])
+    elapsed = time.perf_counter() - t0
+    stop.set()
+    t.join()
+    return elapsed, done[0] / elapsed
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--articles", type=int, default=20)
+    ap.add_argument("--queries", type=int, default=5, help="queries timed per setting")
+    ap.add_argument("--workers", type=int, nargs="+", default=sorted({0, 1, 2, 4, os.cpu_count() or 1}))
+    args = ap.parse_args()
+
+    seed = iter(range(10 ** 6))
+
+    def queries(n):
+        return [build_corpus(args.articles, 0, seed=next(seed)) for _ in range(n)]
+    print(f"articles={args.articles} queries={args.queries} cores={os.cpu_count()} "
+          f"spaCy model={'yes' if nlp_pool.get_nlp() else 'missing (dates only)'}")
+
+    # the other session alone, for reference
+    stop, done = threading.Event(), [0]
+    t = threading.Thread(target=other_session, args=(stop, done), daemon=True)
+    t.start()
+    time.sleep(1.0)
+    stop.set()
+    t.join()
+    idle_rate = done[0] / 1.0
+
+    base = None
+    manager = multiprocessing.get_context("spawn").Manager()
+    for n in args.workers:
+        nlp_pool._reset_pool()
+        nlp_pool.NLP_WORKERS = n
+        if n:
+            # n tasks that only finish together: every worker is up and has
+            # loaded its models before the timing starts
+            list(nlp_pool.get_pool().map(meet, [manager.Barrier(n)] * n))
+        run(queries(1))
+        elapsed, rate = run(queries(args.queries))
+        per_s = args.articles * args.queries / elapsed
+        base = base or per_s
+        label = "in-process" if n == 0 else f"{n} worker{'s' if n > 1 else ''}"
+        print(f"{label:12s} {per_s:8.1f} articles/s  x{per_s / base:4.2f}  "
+              f"other session ran at {rate / idle_rate:4.0%} of its idle speed")
+    nlp_pool._reset_pool()
+    manager.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# benchmarks/bench_providers.py
+# Candidate search latency with three providers that each have a slow tail:
+# the original order (NewsAPI, then Google News RSS only when NewsAPI came
+# back short) vs the fan-out in utils/providers.py, without and with hedged
+# requests. NewsAPI returns a full page half of the time; an extra RSS feed
+# is registered through EXTRA_FEEDS. Hedging matters most when one provider
+# has to answer, so the fan-out is also timed with NewsAPI alone.
+#   python -m benchmarks.bench_providers --queries 60
+import argparse
+import os
+import random
+import threading
+import time
+from urllib.parse import parse_qs, urlsplit
+
+from benchmarks.bench_e2e import RecordedProviders, percentile
+
+# (median seconds, chance of a stall, stall seconds) per provider path
+PROFILES = {
+    "/v2/everything": (0.35, 0.10, 2.5),
+    "/rss/search": (0.25, 0.05, 2.0),
+    "/feed/search": (0.45, 0.05, 2.0),
+}
+
+
+def legacy_candidates(fetcher, query, max_articles):
+    # fetch_candidates before the fan-out: one provider after the other
+    articles = fetcher.fetch_from_newsapi(query, page_size=max_articles)
+    if len(articles) < max_articles:
+        articles.extend(fetcher.fetch_from_gnews(query, page_size=max_articles - len(articles)))
+    return articles[:max_articles]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--queries", type=int, default=60, help="queries timed per mode")
+    ap.add_argument("--articles", type=int, default=8)
+    args = ap.parse_args()
+
+    n = args.articles
+    rng = random.Random(5)
+    lock = threading.Lock()
+    sent = {"requests": 0}
+    recorded = RecordedProviders(3 * n)
+
+    def handler(path, headers):
+        parts = urlsplit(path)
+        median, stall_p, stall = PROFILES.get(parts.path, (0.0, 0.0, 0.0))
+        with lock:
+            sent["requests"] += 1
+            delay = stall if rng.random() < stall_p else rng.lognormvariate(0, 0.25) * median
+            short = rng.random() < 0.5
+        time.sleep(delay)
+        if parts.path == "/v2/everything":
+            size = int(parse_qs(parts.query).get("pageSize", [str(n)])[0])
+            return recorded._json(recorded._newsapi(min(size, n // 2 if short else n)))
+        if parts.path in ("/rss/search", "/feed/search"):
+            start = n if parts.path == "/rss/search" else 2 * n
+            return 200, {"Content-Type": "application/rss+xml"}, recorded._rss(start, start + n).encode()
+        return recorded._get(path, headers)
+
+    recorded.server.handler = handler
+    with recorded:
+        os.environ.update({
+            "NEWSAPI_URL": recorded.server.url("/v2/everything"),
+            "GNEWS_RSS_URL": recorded.server.url("/rss/search"),
+            "EXTRA_FEEDS": "feed=" + recorded.server.url("/feed/search?q={query}"),
+            "NEWSAPI_KEY": "bench",
+            "HTTP_RETRIES": "0",
+        })
+        recorded.load()
+        from utils import fetcher, providers
+
+        everyone = providers.registered()
+        newsapi = [p for p in everyone if p.name == "newsapi"]
+        modes = (
+            ("sequential (original)", lambda q: legacy_candidates(fetcher, q, n), everyone, False),
+            ("fan-out", lambda q: fetcher.fetch_candidates(q, n), everyone, False),
+            ("fan-out + hedging", lambda q: fetcher.fetch_candidates(q, n), everyone, True),
+            ("NewsAPI alone", lambda q: fetcher.fetch_candidates(q, n), newsapi, False),
+            ("NewsAPI alone + hedging", lambda q: fetcher.fetch_candidates(q, n), newsapi, True),
+        )
+        print(f"queries={args.queries} articles={n} providers={[p.name for p in everyone]}")
+        print(f"{'':24s} {'p50 ms':>8s} {'p95 ms':>8s} {'p99 ms':>8s} {'requests/query':>15s} {'articles':>9s}")
+        for name, run, active, hedge in modes:
+            providers.HEDGE_REQUESTS = hedge
+            for p in everyone:
+                if p in active:
+                    providers._providers[p.name] = p
+                else:
+                    providers.unregister_provider(p.name)
+            for p in providers.registered():
+                p.calls = p.failures = p.hedged = p.hedge_wins = 0
+            for _ in range(10):
+                run("warm up")  # connections, and latency history for the hedge delays
+            time.sleep(3)  # let abandoned stragglers finish
+            sent["requests"] = 0
+            walls, got = [], 0
+            for i in range(args.queries):
+                t0 = time.perf_counter()
+                got += len(run(f"query {i}"))
+                walls.append(time.perf_counter() - t0)
+            time.sleep(3)
+            print(f"{name:24s} {percentile(walls, 50) * 1000:8.0f} {percentile(walls, 95) * 1000:8.0f} "
+                  f"{percentile(walls, 99) * 1000:8.0f} {sent['requests'] / args.queries:15.2f} "
+                  f"{got / args.queries:9.1f}")
+        print({p.name: p.stats() for p in everyone})
+
+
+if __name__ == "__main__":
+    main()
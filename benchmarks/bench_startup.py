@@ -0,0 +1,59 @@
+# benchmarks/bench_startup.py
+# Cold import cost of the app modules and time to first render of app.py.
+# Every measurement runs in a fresh interpreter.
+#   python -m benchmarks.bench_startup --runs 3
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CASES = {
+    "utils modules": "import utils.fetcher, utils.nlp, utils.timeline",
+    # what importing the app used to pull in before the loaders were lazy
+    "heavy deps (eager)": "import spacy, openai, dateparser, pandas, plotly.express, newspaper",
+    "first render": (
+        "from streamlit.testing.v1 import AppTest\n"
+        "at = AppTest.from_file('app.py', default_timeout=120)\n"
+        "at.secrets['NEWSAPI_KEY'] = ''\n"
+        "at.secrets['OPENAI_API_KEY'] = ''\n"
+        "at.run()\n"
+        "assert not at.exception, at.exception\n"
+    ),
+}
+
+
+def run(code: str) -> float:
+    t0 = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - t0
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=3)
+    ap.add_argument("--importtime", action="store_true", help="print the slowest imports of the utils modules")
+    args = ap.parse_args()
+
+    baseline = min(run("pass") for _ in range(args.runs))
+    print(f"{'bare interpreter':22s} {baseline:6.2f}s")
+    for name, code in CASES.items():
+        best = min(run(code) for _ in range(args.runs))
+        print(f"{name:22s} {best:6.2f}s  (+{best - baseline:.2f}s over bare)")
+
+    if args.importtime:
+        out = subprocess.run([sys.executable, "-X", "importtime", "-c", CASES["utils modules"]],
+                             cwd=ROOT, capture_output=True, text=True).stderr.splitlines()
+        rows = []
+        for line in out[1:]:
+            parts = line.split("|")
+            if len(parts) == 3:
+                rows.append((int(parts[1]), parts[2].rstrip()))
+        for cumulative, name in sorted(rows, reverse=True)[:15]:
+            print(f"{cumulative / 1e6:6.3f}s {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# benchmarks/bench_store.py
+# ArticleStore.search latency as the store grows. Articles are short
+# synthetic texts over the fixtures' vocabulary plus a topic tag, so queries
+# range from very common words to topics with a handful of matches.
+#   python -m benchmarks.bench_store --sizes 10000 100000 1000000
+import argparse
+import glob
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from utils.models import Article
+from utils.store import ArticleStore
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "articles")
+QUERIES = {
+    "common words": "the mission",
+    "topic, ~1k hits/1M": "topic123 launch",
+    "rare topic": "topic99991",
+    "no match": "zzzunseenword",
+}
+
+
+def articles(start, count, vocab, rng):
+    for i in range(start, start + count):
+        words = rng.choices(vocab, k=60)
+        yield Article(
+            url=f"https://example{i % 500}.com/news/{i}",
+            title=" ".join(words[:8]),
+            source=f"Outlet {i % 500}",
+            published_at="2024-01-01T00:00:00Z",
+            content=" ".join(words) + f" topic{rng.randrange(1000 if i % 10 == 0 else 100000)}",
+            entity_pairs=(),
+            dates_found=(),
+        )
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    ap.add_argument("--lookups", type=int, default=200)
+    ap.add_argument("--limit", type=int, default=8)
+    args = ap.parse_args()
+
+    vocab = []
+    for p in sorted(glob.glob(os.path.join(FIXTURES, "*.txt"))):
+        vocab += open(p, encoding="utf-8").read().lower().split()
+    rng = random.Random(1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ArticleStore(os.path.join(tmp, "store.sqlite3"))
+        size = 0
+        for target in sorted(args.sizes):
+            t0 = time.perf_counter()
+            while size < target:
+                n = min(20000, target - size)
+                store.put_many(articles(size, n, vocab, rng))
+                size += n
+            t1 = time.perf_counter()
+            store.optimize()
+            print(f"store={size:>9,d} articles  (+{t1 - t0:.1f}s to insert, {time.perf_counter() - t1:.1f}s to optimize)")
+            for name, q in QUERIES.items():
+                hits = len(store.search(q, args.limit))
+                times = []
+                for _ in range(args.lookups):
+                    t0 = time.perf_counter()
+                    store.search(q, args.limit)
+                    times.append((time.perf_counter() - t0) * 1000)
+                times.sort()
+                print(f"  {name:20s} hits={hits:2d}  p50={statistics.median(times):.3f}ms  "
+                      f"p99={times[int(len(times) * 0.99) - 1]:.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# benchmarks/bench_summarize.py
+# Old single-prompt summary (4000 chars per article) vs map-reduce, against a
+# fake completion endpoint.
+#   python -m benchmarks.bench_summarize --articles 20 --chars 20000
+import argparse
+import glob
+import os
+import time
+
+import openai
+
+from benchmarks.fake_openai import FakeOpenAI
+import utils.cache as cache_mod
+from utils import llm, nlp
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "articles")
+
+
+def legacy_summarize(texts):
+    # openai_summarize before map-reduce: one call, every article cut to 4000 chars
+    combined = "\n\n---\n\n".join([t[:4000] for t in texts])
+    user_prompt = f"\n\nArticles:\n{combined}\n\n{llm.FINAL_INSTRUCTIONS}"
+    return llm.chat([{"role": "system", "content": llm.SYSTEM_PROMPT}, {"role": "user", "content": user_prompt}])
+
+
+def coverage(texts, prompts):
+    # share of article dates that reached the model in some prompt
+    seen = "\n".join(prompts)
+    wanted = set(d for t in texts for d in nlp.find_dates(t))
+    return len(wanted & set(nlp.find_dates(seen))) / max(1, len(wanted))
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--articles", type=int, default=20)
+    ap.add_argument("--chars", type=int, default=20000, help="approximate length of each article")
+    ap.add_argument("--latency", type=float, default=0.3, help="fixed seconds per completion")
+    args = ap.parse_args()
+    cache_mod.LLM_CACHE_PATH = ""  # measure real calls, not the completion cache
+
+    corpus = [open(p, encoding="utf-8").read() for p in sorted(glob.glob(os.path.join(FIXTURES, "*.txt")))]
+    texts = []
+    for i in range(args.articles):
+        base = corpus[i % len(corpus)]
+        # vary the filler so later parts of each article carry their own dates
+        parts, n = [], 0
+        while n < args.chars:
+            part = base.replace("2023", str(2000 + (n // len(base)) % 25)).replace("2025", str(2001 + (n // len(base)) % 25))
+            parts.append(part)
+            n += len(part)
+        texts.append("\n\n".join(parts))
+
+    with FakeOpenAI(base_latency=args.latency) as fake:
+        openai.api_base = fake.api_base
+        llm.OPENAI_KEY = nlp.OPENAI_KEY = "sk-fake"
+
+        t0 = time.perf_counter()
+        legacy_summarize(texts)
+        t_old = time.perf_counter() - t0
+        old = (fake.calls, fake.prompt_tokens, coverage(texts, fake.prompts))
+
+        fake.reset()
+        t0 = time.perf_counter()
+        nlp.openai_summarize(texts)
+        t_new = time.perf_counter() - t0
+        new = (fake.calls, fake.prompt_tokens, coverage(texts, fake.prompts))
+
+    print(f"articles={args.articles} chars/article~{args.chars} concurrency={llm.LLM_CONCURRENCY} rpm={llm.LLM_RPM:g}")
+    print(f"single prompt: {t_old:6.2f}s  calls={old[0]:3d}  prompt_tokens={old[1]:7d}  dates covered={old[2]:.0%}")
+    print(f"map-reduce:    {t_new:6.2f}s  calls={new[0]:3d}  prompt_tokens={new[1]:7d}  dates covered={new[2]:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# benchmarks/bench_timeline.py
+# Timeline building and plotting for large events: the original per-article
+# dateparser.parse + per-milestone pd.to_datetime loop vs the columnar
+# builder (one vectorized parse per date format, NumPy sort). Dates are a
+# NewsAPI / RSS mix, with some articles dated only by their content.
+#   python -m benchmarks.bench_timeline --milestones 1000 5000
+import argparse
+import random
+import time
+
+from utils.models import Article, Milestone
+from utils.timeline import bucket_milestones, build_milestones_from_entities, milestone_frame
+
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+
+def legacy_build(articles):
+    # build_milestones_from_entities before the columnar engine
+    import dateparser
+    items = []
+    for a in articles:
+        dt = dateparser.parse(a.published_at) if a.published_at else None
+        if not dt and a.dates_found:
+            dt = dateparser.parse(a.dates_found[0])
+        items.append(Milestone(dt.date().isoformat() if dt else None, a))
+    return sorted(items, key=lambda x: x.date if x.date else "9999-12-31")
+
+
+def legacy_frame(milestones):
+    # plot_timeline's DataFrame before: one pd.to_datetime per milestone
+    import pandas as pd
+    rows = []
+    for m in milestones:
+        if m.date:
+            rows.append({"date": pd.to_datetime(m.date), "label": m.headline, "source": m.source})
+    return pd.DataFrame(rows)
+
+
+def make_articles(n, seed):
+    rng = random.Random(seed)
+    out = []
+    for i in range(n):
+        day = rng.randrange(730)
+        y, m, d = 2023 + day // 365, 1 + (day % 365) // 31, 1 + (day % 365) % 28
+        kind = rng.random()
+        if kind < 0.6:
+            published = f"{y}-{m:02d}-{d:02d}T{rng.randrange(24):02d}:{rng.randrange(60):02d}:00Z"
+        elif kind < 0.9:
+            published = f"{rng.choice(WEEKDAYS)}, {d:02d} {MONTHS[m - 1]} {y} {rng.randrange(24):02d}:15:00 GMT"
+        else:
+            published = None  # dated by its content
+        out.append(Article(title=f"Story {i}", url=f"https://example.com/{i}", source=f"Outlet {i % 40}",
+                           published_at=published, dates_found=(f"{y}-{m:02d}-{d:02d}",)))
+    return out
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - t0
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--milestones", type=int, nargs="+", default=[1000, 5000])
+    args = ap.parse_args()
+
+    legacy_build(make_articles(10, seed=0))  # dateparser's locale data loads outside the timings
+    build_milestones_from_entities(make_articles(10, seed=0))
+    print(f"{'milestones':>10s} {'build (orig)':>13s} {'build (new)':>12s} {'frame (orig)':>13s} "
+          f"{'frame (new)':>12s} {'buckets':>8s} {'same':>5s}")
+    for n in args.milestones:
+        articles = make_articles(n, seed=n)
+        old, t_build_old = timed(legacy_build, articles)
+        new, t_build_new = timed(build_milestones_from_entities, articles)
+        _, t_frame_old = timed(legacy_frame, old)
+        _, t_frame_new = timed(milestone_frame, new)
+        _, t_bucket = timed(bucket_milestones, new, "week")
+        same = [(m.date, m.article.url) for m in old] == [(m.date, m.article.url) for m in new]
+        print(f"{n:10d} {t_build_old * 1000:11.0f}ms {t_build_new * 1000:10.0f}ms {t_frame_old * 1000:11.0f}ms "
+              f"{t_frame_new * 1000:10.0f}ms {t_bucket * 1000:6.0f}ms {str(same):>5s}")
+
+
+if __name__ == "__main__":
+    main()
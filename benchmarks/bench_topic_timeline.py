@@ -0,0 +1,87 @@
+# benchmarks/bench_topic_timeline.py
+# Refreshing a long-running story: the original rebuild (every refetched
+# article through dates + NER, then build_milestones_from_entities over all
+# of them) vs merging into the topic's timeline (utils/topics.py), where
+# only the articles it hasn't seen are annotated and inserted. Each refresh
+# refetches the whole story plus `--new` new articles; the copies are fresh
+# objects, as a live fetch returns them.
+#   python -m benchmarks.bench_topic_timeline --history 200 1000 --new 2 20
+import argparse
+import random
+import time
+
+from benchmarks.bench_dedupe import build_corpus
+from utils import nlp_pool
+from utils.models import Article
+from utils.timeline import build_milestones_from_entities
+from utils.topics import TopicTimeline
+
+
+def make_story(n, seed):
+    rng = random.Random(seed)
+    out = []
+    for i, a in enumerate(build_corpus(n, 0, seed=seed)):
+        day = rng.randrange(365)
+        published = f"2024-{1 + day // 31:02d}-{1 + day % 28:02d}T{rng.randrange(24):02d}:00:00Z"
+        # distinct headlines: a repeated one would (rightly) be merged as a copy
+        out.append((f"https://example.com/{seed}/{i}", f"{a['title']} ({i})", a["source"], published, a["content"]))
+    return out
+
+
+def fetch(story):
+    # what a refresh gets back: new, un-annotated Article objects
+    return [Article(title=t, url=u, source=s, published_at=p, content=c) for u, t, s, p, c in story]
+
+
+def rebuild(story):
+    articles = fetch(story)
+    nlp_pool.analyze_articles(articles)
+    return build_milestones_from_entities(articles), len(articles)
+
+
+def merge(timeline, story):
+    articles = fetch(story)
+    fresh = timeline.unseen(articles)
+    nlp_pool.analyze_articles(fresh)
+    timeline.merge(articles)
+    return timeline.milestones(), len(fresh)
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - t0
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--history", type=int, nargs="+", default=[200, 1000], help="articles already on the timeline")
+    ap.add_argument("--new", type=int, nargs="+", default=[2, 20], help="new articles per refresh")
+    ap.add_argument("--refreshes", type=int, default=3)
+    args = ap.parse_args()
+
+    rebuild(make_story(8, seed=0))  # worker processes and the date parser load outside the timings
+    print(f"spaCy model={'yes' if nlp_pool.get_nlp() else 'missing (dates only)'}")
+    print(f"{'history':>8s} {'new':>5s} {'rebuild ms':>11s} {'NLP':>6s} {'merge ms':>9s} {'NLP':>5s} {'same':>5s}")
+    for n in args.history:
+        for k in args.new:
+            story = make_story(n + k * args.refreshes, seed=n + k)
+            timeline = TopicTimeline(limit=len(story))  # uncapped: compared with a full rebuild
+            merge(timeline, story[:n])  # the story so far, from earlier queries
+            t_old = t_new = 0.0
+            nlp_old = nlp_new = 0
+            same = True
+            for r in range(1, args.refreshes + 1):
+                upto = story[:n + k * r]
+                (old, annotated_old), dt_old = timed(rebuild, upto)
+                (new, annotated_new), dt_new = timed(merge, timeline, upto)
+                t_old, t_new = t_old + dt_old, t_new + dt_new
+                nlp_old, nlp_new = nlp_old + annotated_old, nlp_new + annotated_new
+                same = same and [(m.date, m.url) for m in old] == [(m.date, m.url) for m in new]
+            r = args.refreshes
+            print(f"{n:8d} {k:5d} {t_old / r * 1000:11.0f} {nlp_old // r:6d} {t_new / r * 1000:9.0f} "
+                  f"{nlp_new // r:5d} {str(same):>5s}")
+
+
+if __name__ == "__main__":
+    main()
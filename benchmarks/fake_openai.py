@@ -0,0 +1,81 @@
+# benchmarks/fake_openai.py
+# Local stand-in for the OpenAI chat completions endpoint.
+import json
+import threading
+import time
+
+from benchmarks.stub_server import StubServer
+from utils.dates import recognize_dates
+
+
+class FakeOpenAI:
+    """
+    Answers POST /v1/chat/completions after `base_latency` seconds plus
+    `per_token` seconds per prompt token (~4 chars), like a real model. The
+    reply lists the ISO dates found in the prompt so map/reduce output looks
+    like a timeline. Every prompt is recorded in `prompts`. `stream=True`
+    requests get the reply as server-sent events.
+
+        with FakeOpenAI() as fake:
+            openai.api_base = fake.api_base
+    """
+
+    def __init__(self, base_latency: float = 0.3, per_token: float = 0.00005):
+        self.base_latency = base_latency
+        self.per_token = per_token
+        self.prompts = []
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self._lock = threading.Lock()
+        self.server = StubServer(post_handler=self._complete)
+        self.api_base = self.server.url("/v1")
+
+    def _complete(self, path, headers, body):
+        req = json.loads(body)
+        prompt = "\n".join(m["content"] for m in req["messages"])
+        tokens = len(prompt) // 4
+        time.sleep(self.base_latency + tokens * self.per_token)
+        content = "\n".join(f"{d} → event" for d in recognize_dates(prompt)) or "No dated events."
+        usage = {"prompt_tokens": tokens, "completion_tokens": len(content) // 4, "total_tokens": tokens + len(content) // 4}
+        with self._lock:
+            self.calls += 1
+            self.prompts.append(prompt)
+            self.prompt_tokens += usage["prompt_tokens"]
+            self.completion_tokens += usage["completion_tokens"]
+        if req.get("stream"):
+            # server-sent events, one chunk per line of the reply
+            lines = content.split("\n")
+            events = []
+            for i, line in enumerate(lines):
+                delta = line + ("\n" if i < len(lines) - 1 else "")
+                chunk = {
+                    "id": f"chatcmpl-fake-{self.calls}",
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": req.get("model"),
+                    "choices": [{"index": 0, "delta": {"content": delta}, "finish_reason": None}],
+                }
+                events.append(f"data: {json.dumps(chunk)}\n\n")
+            events.append("data: [DONE]\n\n")
+            return 200, {"Content-Type": "text/event-stream"}, "".join(events).encode()
+        reply = {
+            "id": f"chatcmpl-fake-{self.calls}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": req.get("model"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": usage,
+        }
+        return 200, {"Content-Type": "application/json"}, json.dumps(reply).encode()
+
+    def reset(self):
+        with self._lock:
+            self.prompts, self.calls, self.prompt_tokens, self.completion_tokens = [], 0, 0, 0
+
+    def __enter__(self):
+        self.server.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.__exit__(*exc)
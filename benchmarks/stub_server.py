@@ -0,0 +1,73 @@
+# benchmarks/stub_server.py
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+ARTICLE_HTML = """<html><head><title>Stub article {n}</title></head><body>
+<article>
+<h1>Stub article {n}</h1>
+<p>The mission control team confirmed on August 23, 2023 that the lander touched down near the south pole of the Moon.</p>
+<p>Officials said the rover would spend the next two weeks collecting samples and sending data back to the ground stations.</p>
+<p>Engineers had rehearsed the descent sequence for months after the previous attempt ended in a hard landing in 2019.</p>
+</article>
+</body></html>"""
+
+
+class StubServer:
+    """
+    Tiny threaded HTTP server for benchmarks. Every GET sleeps `latency`
+    seconds and then answers with `handler(path, request_headers)` ->
+    (status, headers, body).
+
+    POSTs go to `post_handler(path, request_headers, body)` the same way.
+    """
+
+    def __init__(self, latency: float = 0.0, handler=None, post_handler=None, port: int = 0):
+        self.latency = latency
+        self.post_handler = post_handler
+        self.handler = handler or (lambda path, headers: (200, {"Content-Type": "text/html"}, ARTICLE_HTML.format(n=path).encode()))
+        self.hits = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True  # keep-alive + delayed ACK would add ~40ms per request
+
+            def do_GET(self):
+                stub.hits += 1
+                if stub.latency:
+                    time.sleep(stub.latency)
+                self._reply(*stub.handler(self.path, self.headers))
+
+            def do_POST(self):
+                stub.hits += 1
+                payload = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                if stub.latency:
+                    time.sleep(stub.latency)
+                self._reply(*stub.post_handler(self.path, self.headers, payload))
+
+            def _reply(self, status, headers, body):
+                self.send_response(status)
+                for k, v in headers.items():
+                    self.send_header(k, v)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+
+    def url(self, path: str = "/", host: str = "127.0.0.1") -> str:
+        return f"http://{host}:{self.port}{path}"
+
+    def __enter__(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
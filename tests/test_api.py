@@ -0,0 +1,21 @@
+# tests/test_api.py
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+import api
+
+
+def test_unknown_bucket_is_rejected_by_the_handler():
+    # FastAPI before 0.100 ignores Query(pattern=...): the handler checks too
+    with pytest.raises(HTTPException) as e:
+        asyncio.run(api.timeline(q="moon", max_articles=8, use_openai=False, refresh=False, bucket="year",
+                                 events=False))
+    assert e.value.status_code == 422
+
+
+def test_unknown_profiler_is_rejected_by_the_handler():
+    with pytest.raises(HTTPException) as e:
+        asyncio.run(api.debug_trace(q="moon", max_articles=8, use_openai=False, refresh=False, profile="perf"))
+    assert e.value.status_code == 422
@@ -0,0 +1,38 @@
+# tests/test_cache.py
+import time
+
+from utils.cache import CompletionCache, ContentCache
+
+
+def test_content_cache_revalidates_and_evicts_lru(tmp_path):
+    cache = ContentCache(str(tmp_path / "articles.sqlite3"), ttl=0.2, max_bytes=25)
+    cache.put("https://example.com/a?utm_source=x", "a" * 10, etag='"1"')
+    cache.put("https://example.com/b", "b" * 10)
+    hit = cache.get("https://EXAMPLE.com/a")
+    assert hit["text"] == "a" * 10 and hit["etag"] == '"1"' and hit["fresh"]
+    cache.put("https://example.com/c", "c" * 10)  # over budget: b was read least recently
+    assert cache.get("https://example.com/b") is None
+    assert len(cache) == 2
+    time.sleep(0.25)
+    assert not cache.get("https://example.com/a")["fresh"]
+    cache.touch("https://example.com/a")
+    assert cache.get("https://example.com/a")["fresh"]
+
+
+def test_completion_cache_expires_and_counts_savings(tmp_path):
+    cache = CompletionCache(str(tmp_path / "llm.sqlite3"), ttl=0.2, max_bytes=1024)
+    cache.put("k", "summary", prompt_tokens=100, completion_tokens=20, latency=1.5)
+    assert cache.get("k") == "summary"
+    time.sleep(0.25)
+    assert cache.get("k") is None
+    report = cache.report()
+    assert (report["hits"], report["misses"], report["saved_prompt_tokens"]) == (1, 1, 100)
+
+
+def test_reopens_existing_file(tmp_path):
+    path = str(tmp_path / "llm.sqlite3")
+    CompletionCache(path).put("k", "x" * 40)
+    reopened = CompletionCache(path, max_bytes=30)
+    assert reopened.get("k") == "x" * 40
+    reopened.put("j", "y" * 10)  # the stored size counts after a restart
+    assert len(reopened) == 1
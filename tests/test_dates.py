@@ -0,0 +1,12 @@
+# tests/test_dates.py
+import pytest
+
+from benchmarks.bench_dates import RELATIVE_PHRASES, legacy_find_dates
+from utils.nlp import find_dates
+
+
+@pytest.mark.parametrize("phrase", RELATIVE_PHRASES)
+def test_sentence_dates_match_dateparser(phrase):
+    # the vocabulary prefilter must not drop a sentence dateparser can read
+    text = f"The report was filed. {phrase}. Officials declined to comment."
+    assert find_dates(text) == legacy_find_dates(text)
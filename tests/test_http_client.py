@@ -0,0 +1,49 @@
+# tests/test_http_client.py
+import time
+from urllib.parse import urlsplit
+
+from benchmarks.stub_server import StubServer
+from utils import http_client
+
+
+def fail_first(n, status, retry_after):
+    # answers `status` with the given Retry-After n times, then 200
+    calls = []
+
+    def handler(path, headers):
+        calls.append(path)
+        if len(calls) <= n:
+            return status, {"Retry-After": retry_after}, b"busy"
+        return 200, {"Content-Type": "text/plain"}, b"ok"
+    return handler, calls
+
+
+def test_retry_after_zero_means_now():
+    handler, calls = fail_first(1, 429, "0")
+    with StubServer(handler=handler) as srv:
+        t0 = time.monotonic()
+        resp = http_client.get(srv.url("/zero"), timeout=10)
+        host = urlsplit(srv.url("/")).hostname
+    assert resp.status_code == 200 and len(calls) == 2
+    assert time.monotonic() - t0 < 1.0
+    assert http_client.cooldown(host) == 0.0
+
+
+def test_retry_after_longer_than_backoff_cap_is_honoured(monkeypatch):
+    monkeypatch.setattr(http_client, "HTTP_BACKOFF_MAX", 0.05)
+    handler, calls = fail_first(1, 503, "0.4")
+    with StubServer(handler=handler) as srv:
+        t0 = time.monotonic()
+        resp = http_client.get(srv.url("/slow"), timeout=10)
+    assert resp.status_code == 200 and len(calls) == 2
+    assert time.monotonic() - t0 >= 0.4
+
+
+def test_retry_after_beyond_budget_gives_up(monkeypatch):
+    monkeypatch.setattr(http_client, "HTTP_RETRY_BUDGET", 1.0)
+    handler, calls = fail_first(1, 503, "60")
+    with StubServer(handler=handler) as srv:
+        t0 = time.monotonic()
+        resp = http_client.get(srv.url("/later"), timeout=10)
+    assert resp.status_code == 503 and len(calls) == 1
+    assert time.monotonic() - t0 < 1.0
@@ -0,0 +1,45 @@
+# tests/test_scheduler.py
+import threading
+import time
+
+from utils.scheduler import PrefetchScheduler
+
+
+def test_hot_topic_is_refreshed_on_schedule():
+    # requested every 50 ms, far more often than the 0.3 s interval: requests
+    # must not keep pushing the refresh back
+    runs = []
+    lock = threading.Lock()
+
+    def job(key):
+        with lock:
+            runs.append(time.monotonic())
+        return True
+
+    scheduler = PrefetchScheduler(job, topics=1, interval=0.3, jitter=0.0, concurrency=1, per_minute=6000,
+                                  min_hits=1, tick=0.02)
+    try:
+        t0 = time.monotonic()
+        while time.monotonic() - t0 < 1.6:
+            scheduler.record("hot topic")
+            time.sleep(0.05)
+    finally:
+        scheduler.stop()
+    # first run ~0.3 s in, then one per interval after the previous one
+    assert len(runs) >= 3
+    assert runs[0] - t0 < 0.6
+    gaps = [b - a for a, b in zip(runs, runs[1:])]
+    assert all(0.25 < g < 0.6 for g in gaps)
+
+
+def test_new_topic_waits_one_interval():
+    runs = []
+    scheduler = PrefetchScheduler(lambda key: runs.append(key) or True, topics=1, interval=60, jitter=0.0,
+                                  min_hits=1, tick=0.02)
+    try:
+        scheduler.record("topic")
+        scheduler.record("topic")
+        time.sleep(0.2)
+    finally:
+        scheduler.stop()
+    assert runs == []
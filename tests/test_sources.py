@@ -0,0 +1,54 @@
+# tests/test_sources.py
+import pytest
+
+from utils import orchestrator
+from utils.models import Article
+from utils.store import ArticleStore
+
+
+def article(i, host="stored.example.com"):
+    return Article(title=f"Lander story {i}", url=f"https://{host}/{i}", source="Daily", content=f"lander text {i}")
+
+
+@pytest.fixture
+def sources(monkeypatch):
+    store = ArticleStore(":memory:")
+    store.put_many([article(i) for i in range(3)])
+    fetched = []
+
+    def live(query, max_articles, known=()):
+        fetched.append(len(known))
+        for pos in range(max_articles - len(known)):
+            yield pos, article(pos, "live.example.com")
+
+    monkeypatch.setattr(orchestrator, "get_article_store", lambda: store)
+    monkeypatch.setattr(orchestrator, "iter_articles", live)
+    return store, fetched
+
+
+def urls(query, max_articles):
+    return [a.url for _, a in orchestrator.iter_sources(query, max_articles)]
+
+
+def test_recent_store_matches_answer_without_a_live_fetch(sources):
+    _, fetched = sources
+    assert len(urls("lander", 3)) == 3 and fetched == []
+
+
+def test_old_store_matches_are_refetched_live(sources):
+    store, fetched = sources
+    store._db.execute("UPDATE articles SET stored_at = stored_at - ?", (orchestrator.STORE_MAX_AGE + 60,))
+    got = urls("lander", 3)
+    assert fetched == [0] and all("live.example.com" in u for u in got)
+
+
+def test_old_store_matches_fill_in_when_offline(sources, monkeypatch):
+    store, _ = sources
+    store._db.execute("UPDATE articles SET stored_at = stored_at - ?", (orchestrator.STORE_MAX_AGE + 60,))
+
+    def offline(query, max_articles, known=()):
+        raise ConnectionError("no network")
+        yield  # a generator, like iter_articles
+
+    monkeypatch.setattr(orchestrator, "iter_articles", offline)
+    assert sorted(urls("lander", 3)) == [f"https://stored.example.com/{i}" for i in range(3)]
@@ -0,0 +1,67 @@
+# tests/test_topics.py
+from utils.models import Article
+from utils import topics
+from utils.topics import TopicTimeline
+
+
+def story(i, source="Daily", url=None):
+    return Article(title=f"Lander update number {i}", url=url or f"https://example.com/{i}", source=source,
+                   published_at=f"2024-01-{1 + i % 28:02d}T00:00:00Z", content="")
+
+
+def test_timeline_keeps_at_most_limit_milestones():
+    timeline = TopicTimeline(limit=3)
+    timeline.merge([story(i) for i in range(3)])
+    timeline.merge([story(0, "Wire", "https://wire.example.org/0")])  # a copy of story 0
+    assert timeline.corroborated == 1
+    timeline.merge([story(3), story(4)])
+    assert len(timeline) == 3 and timeline.dropped == 2
+    assert sorted(m.url for m in timeline.milestones()) == [f"https://example.com/{i}" for i in (2, 3, 4)]
+    # the dropped story and its copy are forgotten: both come back as new
+    timeline.merge([story(0, "Wire", "https://wire.example.org/0")])
+    assert [m.url for m in timeline.milestones()].count("https://wire.example.org/0") == 1
+    assert len(timeline) == 3
+
+
+def test_refetching_known_articles_leaves_timeline_unchanged():
+    timeline = TopicTimeline()
+    timeline.merge([story(i) for i in range(5)])
+    version = timeline.version
+    timeline.merge([story(i) for i in range(5)])
+    assert timeline.version == version and len(timeline) == 5
+
+
+def test_copy_matched_by_text_is_forgotten_with_its_milestone():
+    text = " ".join(f"word{i} lander moon mission team" for i in range(80))
+    timeline = TopicTimeline(limit=2)
+    timeline.merge([Article(title="Lander touches down", url="https://a.com/0", source="A", content=text)])
+    timeline.merge([Article(title="Historic moon arrival", url="https://b.com/1", source="B", content=text)])
+    assert timeline.corroborated == 1 and len(timeline) == 1
+    timeline.merge([Article(title=f"Other story {i}", url=f"https://c.com/{i}", source="C",
+                            content=f"unrelated words {i} " * 30) for i in range(2)])
+    assert timeline.dropped == 1
+    # the copy's milestone is gone: it comes back as a milestone of its own
+    merged = timeline.merge([Article(title="Historic moon arrival", url="https://b.com/1", source="B", content=text)])
+    assert [a.url for a in merged] == ["https://b.com/1"]
+    assert "https://b.com/1" in [m.url for m in timeline.milestones()]
+
+
+def test_milestone_lookup_resolves_copies():
+    timeline = TopicTimeline()
+    timeline.merge([story(1)])
+    timeline.merge([story(1, "Wire", "https://wire.example.org/1")])
+    assert timeline.milestone("https://wire.example.org/1").url == "https://example.com/1"
+    assert timeline.milestone("https://example.com/9") is None
+
+
+def test_topics_over_the_byte_budget_are_dropped(monkeypatch):
+    monkeypatch.setattr(topics, "_timelines", type(topics._timelines)())
+    monkeypatch.setattr(topics, "TOPIC_TIMELINES_MAX_MB", 1 / 1024)  # 1 KB
+    big = Article(title="Big", url="https://example.com/big", source="Daily", content="x" * 800)
+    topics.get_topic_timeline("first topic").merge([big])
+    assert topics.get_topic_timeline("first topic").size > 800
+    topics.get_topic_timeline("second topic").merge([Article(title="Big too", url="https://example.com/big2",
+                                                             source="Daily", content="y" * 800)])
+    # over budget now: the next lookup drops the least recently used topic
+    topics.get_topic_timeline("second topic")
+    assert list(topics._timelines) == ["second topic"]
@@ -0,0 +1,307 @@
+# utils/cache.py
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# persistent store of extracted article text; set ARTICLE_CACHE_PATH="" to disable
+CACHE_PATH = os.getenv("ARTICLE_CACHE_PATH", os.path.join(".cache", "articles.sqlite3"))
+CACHE_TTL = float(os.getenv("ARTICLE_CACHE_TTL", str(6 * 3600)))  # seconds before revalidation
+CACHE_MAX_MB = float(os.getenv("ARTICLE_CACHE_MAX_MB", "200"))
+
+# query params that never change page content
+TRACKING_PARAMS = {"fbclid", "gclid", "dclid", "mc_cid", "mc_eid", "ocid", "cmpid", "ref", "ref_src", "igshid", "_ga"}
+
+
+def normalize_url(url: str) -> str:
+    # lowercase scheme/host, drop fragment, default ports and tracking params, sort the query
+    if not url:
+        return ""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and not ((scheme == "http" and parts.port == 80) or (scheme == "https" and parts.port == 443)):
+        host = f"{host}:{parts.port}"
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+             if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS]
+    path = parts.path or "/"
+    return urlunsplit((scheme, host, path, urlencode(sorted(query)), ""))
+
+
+class SQLiteCache:
+    """
+    Base for the SQLite-backed caches: one table keyed by a text column,
+    each row stamped with when it was stored and last read, and its size.
+    Rows go least recently used first once the stored sizes exceed
+    `max_bytes`. Subclasses name the table, key and stored-at columns and
+    declare their value columns; what a stale row means is theirs to say.
+    """
+
+    TABLE = ""
+    KEY = "key"
+    STORED = "stored_at"
+    COLUMNS = ""  # value columns, as in CREATE TABLE
+
+    def __init__(self, path: str, ttl: float, max_bytes: int):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.TABLE} ({self.KEY} TEXT PRIMARY KEY, {self.COLUMNS},"
+            f" {self.STORED} REAL NOT NULL, accessed_at REAL NOT NULL, size INTEGER NOT NULL)"
+        )
+        self._db.execute(f"CREATE INDEX IF NOT EXISTS {self.TABLE}_lru ON {self.TABLE}(accessed_at)")
+        self._size = self._db.execute(f"SELECT COALESCE(SUM(size), 0) FROM {self.TABLE}").fetchone()[0]
+
+    def _read(self, key: str, columns: str) -> Optional[tuple]:
+        # `columns` of the row, then its stored-at time; call with the lock held
+        return self._db.execute(
+            f"SELECT {columns}, {self.STORED} FROM {self.TABLE} WHERE {self.KEY} = ?", (key,)
+        ).fetchone()
+
+    def _used(self, key: str, now: float):
+        self._db.execute(f"UPDATE {self.TABLE} SET accessed_at = ? WHERE {self.KEY} = ?", (now, key))
+
+    def _write(self, key: str, size: int, **values):
+        now = time.time()
+        names = [self.KEY, *values, self.STORED, "accessed_at", "size"]
+        with self._lock:
+            old = self._db.execute(f"SELECT size FROM {self.TABLE} WHERE {self.KEY} = ?", (key,)).fetchone()
+            self._db.execute(
+                f"INSERT OR REPLACE INTO {self.TABLE} ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})",
+                (key, *values.values(), now, now, size),
+            )
+            self._size += size - (old[0] if old else 0)
+            self._evict()
+
+    def _evict(self):
+        while self._size > self.max_bytes:
+            rows = self._db.execute(
+                f"SELECT {self.KEY}, size FROM {self.TABLE} ORDER BY accessed_at LIMIT 64"
+            ).fetchall()
+            if not rows:
+                self._size = 0
+                return
+            for key, size in rows:
+                self._db.execute(f"DELETE FROM {self.TABLE} WHERE {self.KEY} = ?", (key,))
+                self._size -= size
+                if self._size <= self.max_bytes:
+                    return
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute(f"SELECT COUNT(*) FROM {self.TABLE}").fetchone()[0]
+
+
+class ContentCache(SQLiteCache):
+    """
+    SQLite-backed cache of extracted article text keyed by normalized URL.
+
+    Entries younger than `ttl` are served as-is; older ones are returned with
+    fresh=False so the caller can revalidate with a conditional GET. The file
+    is kept under `max_bytes` of text by evicting least recently used rows.
+    """
+
+    TABLE = "content"
+    KEY = "url"
+    STORED = "fetched_at"
+    COLUMNS = "text TEXT NOT NULL, etag TEXT, last_modified TEXT"
+
+    def __init__(self, path: str = CACHE_PATH, ttl: float = CACHE_TTL, max_bytes: int = int(CACHE_MAX_MB * 1024 * 1024)):
+        super().__init__(path, ttl, max_bytes)
+
+    def get(self, url: str) -> Optional[Dict]:
+        key = normalize_url(url)
+        now = time.time()
+        with self._lock:
+            row = self._read(key, "text, etag, last_modified")
+            if not row:
+                return None
+            self._used(key, now)
+        text, etag, last_modified, fetched_at = row
+        return {
+            "text": text,
+            "fetched_at": fetched_at,
+            "etag": etag,
+            "last_modified": last_modified,
+            "fresh": now - fetched_at < self.ttl,
+        }
+
+    def put(self, url: str, text: str, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        self._write(normalize_url(url), len(text.encode("utf-8")), text=text, etag=etag, last_modified=last_modified)
+
+    def touch(self, url: str):
+        # page revalidated (304): restart its TTL
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "UPDATE content SET fetched_at = ?, accessed_at = ? WHERE url = ?", (now, now, normalize_url(url))
+            )
+
+
+_content_cache = None
+_content_cache_lock = threading.Lock()
+
+
+def get_content_cache() -> Optional[ContentCache]:
+    # process-wide cache instance, or None when disabled / not writable
+    global _content_cache
+    if _content_cache is None and CACHE_PATH:
+        with _content_cache_lock:
+            if _content_cache is None:
+                try:
+                    _content_cache = ContentCache()
+                except (sqlite3.Error, OSError):
+                    return None
+    return _content_cache
+
+
+# in-process cache of whole pipeline results (see app.py / orchestrator)
+RESULT_CACHE_TTL = float(os.getenv("RESULT_CACHE_TTL", "900"))
+RESULT_CACHE_MAX_MB = float(os.getenv("RESULT_CACHE_MAX_MB", "64"))
+
+
+def normalize_query(query: str) -> str:
+    return " ".join((query or "").lower().split())
+
+
+class ResultCache:
+    """
+    Thread-safe in-memory TTL + LRU cache with a byte budget.
+
+    Sizes are estimated from the pickled value when it is stored; the least
+    recently used entries are dropped once the total goes over `max_bytes`.
+    """
+
+    def __init__(self, ttl: float = RESULT_CACHE_TTL, max_bytes: int = int(RESULT_CACHE_MAX_MB * 1024 * 1024)):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (stored_at, size, value)
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.time() - entry[0] >= self.ttl:
+                if entry is not None:
+                    self._drop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, key, value):
+        try:
+            size = len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        except Exception:
+            size = sys.getsizeof(value)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (time.time(), size, value)
+            self._size += size
+            while self._size > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+
+    def invalidate(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+
+    def _drop(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._size -= size
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+
+# persistent cache of LLM completions; set LLM_CACHE_PATH="" to disable
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(".cache", "llm.sqlite3"))
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+LLM_CACHE_MAX_MB = float(os.getenv("LLM_CACHE_MAX_MB", "50"))
+
+
+def completion_key(model: str, messages, **params) -> str:
+    # content-addressed: whitespace differences in the prompts don't matter
+    norm = [{"role": m["role"], "content": " ".join(m["content"].split())} for m in messages]
+    blob = json.dumps({"model": model, "messages": norm, "params": params}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class CompletionCache(SQLiteCache):
+    """
+    SQLite-backed store of chat completions keyed by completion_key().
+
+    Each row remembers the token usage and latency of the original call so
+    hits can be reported as tokens and seconds saved. Rows expire after
+    `ttl`; the least recently used ones go once text exceeds `max_bytes`.
+    """
+
+    TABLE = "completions"
+    STORED = "created_at"
+    COLUMNS = "text TEXT NOT NULL, prompt_tokens INTEGER, completion_tokens INTEGER, latency REAL"
+
+    def __init__(self, path: str = LLM_CACHE_PATH, ttl: float = LLM_CACHE_TTL, max_bytes: int = int(LLM_CACHE_MAX_MB * 1024 * 1024)):
+        super().__init__(path, ttl, max_bytes)
+        self.stats = {"hits": 0, "misses": 0, "saved_prompt_tokens": 0, "saved_completion_tokens": 0, "saved_seconds": 0.0}
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._read(key, "text, prompt_tokens, completion_tokens, latency")
+            if not row or now - row[4] >= self.ttl:
+                self.stats["misses"] += 1
+                return None
+            self._used(key, now)
+            self.stats["hits"] += 1
+            self.stats["saved_prompt_tokens"] += row[1] or 0
+            self.stats["saved_completion_tokens"] += row[2] or 0
+            self.stats["saved_seconds"] += row[3] or 0.0
+        return row[0]
+
+    def put(self, key: str, text: str, prompt_tokens: int = 0, completion_tokens: int = 0, latency: float = 0.0):
+        self._write(key, len(text.encode("utf-8")), text=text, prompt_tokens=prompt_tokens,
+                    completion_tokens=completion_tokens, latency=latency)
+
+    def report(self) -> Dict:
+        with self._lock:
+            out = dict(self.stats)
+        lookups = out["hits"] + out["misses"]
+        out["hit_rate"] = out["hits"] / lookups if lookups else 0.0
+        return out
+
+
+_completion_cache = None
+_completion_cache_lock = threading.Lock()
+
+
+def get_completion_cache() -> Optional[CompletionCache]:
+    global _completion_cache
+    if _completion_cache is None and LLM_CACHE_PATH:
+        with _completion_cache_lock:
+            if _completion_cache is None:
+                try:
+                    _completion_cache = CompletionCache()
+                except (sqlite3.Error, OSError):
+                    return None
+    return _completion_cache
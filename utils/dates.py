@@ -0,0 +1,230 @@
+# utils/dates.py
+# Fast date recognizer behind nlp.find_dates. The common written forms are
+# converted directly; dateparser is only called for spans the fast path is
+# not sure about, and results are memoized per span.
+import bisect
+import re
+import threading
+import unicodedata
+from datetime import date, datetime
+from functools import lru_cache
+from typing import List, Optional, Set, Tuple
+
+MONTHS = {
+    "jan": 1, "january": 1, "feb": 2, "february": 2, "mar": 3, "march": 3,
+    "apr": 4, "april": 4, "may": 5, "jun": 6, "june": 6, "jul": 7, "july": 7,
+    "aug": 8, "august": 8, "sep": 9, "sept": 9, "september": 9,
+    "oct": 10, "october": 10, "nov": 11, "november": 11, "dec": 12, "december": 12,
+}
+
+# same spans as the original find_dates patterns; they overlap (every year
+# inside an ISO or numeric date is also a bare-year hit), so each is scanned
+DATE_PATTERNS = [re.compile(p, re.IGNORECASE) for p in (
+    r"\b(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Sept|Oct|Nov|Dec)[a-z]*\s+\d{1,2},?\s*\d{0,4}",
+    r"\b\d{4}-\d{2}-\d{2}\b",
+    r"\b\d{1,2}\s+(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{4}\b",
+    r"\b\d{1,2}/\d{1,2}/\d{2,4}\b",
+    r"\b\d{4}\b",
+)]
+# full dates only (a bare year would be dated to today's month and day), as
+# one left-to-right scan; the lookahead skips positions no date starts at
+SENTENCE_DATE = re.compile(
+    r"(?=[\dJFMASOND])(?:" + "|".join(f"(?:{p.pattern})" for p in DATE_PATTERNS[:4]) + ")", re.IGNORECASE)
+
+_ISO = re.compile(r"(\d{4})-(\d{2})-(\d{2})")
+_YEAR = re.compile(r"\d{4}")
+_MONTH_DAY_YEAR = re.compile(r"([A-Za-z]+)\s+(\d{1,2}),?\s*(\d{4})")
+_DAY_MONTH_YEAR = re.compile(r"(\d{1,2})\s+([A-Za-z]+)\s+(\d{4})")
+_NUMERIC = re.compile(r"(\d{1,2})/(\d{1,2})/(\d{4})")
+_MONTH_DAY = re.compile(r"([A-Za-z]+)\s+(\d{1,2}),?\s*(\d{0,4})")
+_MONTH_YEAR = re.compile(r"[A-Za-z]+\s+\d{4}")
+_SENTENCE_END = re.compile(r"(?<=[.!?])[\"'”’)]*\s+|\n+")
+_WORDS = re.compile(r"[^\W\d_]+")
+
+
+def _ymd(y: int, m: int, d: int) -> Optional[str]:
+    try:
+        return date(y, m, d).isoformat()
+    except ValueError:
+        return None
+
+
+def _fast_parse(span: str) -> Optional[str]:
+    # None means "not sure" -> ask dateparser
+    m = _ISO.fullmatch(span)
+    if m:
+        return _ymd(int(m[1]), int(m[2]), int(m[3]))
+    if _YEAR.fullmatch(span):
+        # dateparser fills missing month/day from today
+        today = datetime.now()
+        return _ymd(int(span), today.month, today.day)
+    m = _MONTH_DAY_YEAR.fullmatch(span)
+    if m and m[1].lower() in MONTHS:
+        return _ymd(int(m[3]), MONTHS[m[1].lower()], int(m[2]))
+    m = _DAY_MONTH_YEAR.fullmatch(span)
+    if m and m[2].lower() in MONTHS:
+        return _ymd(int(m[3]), MONTHS[m[2].lower()], int(m[1]))
+    m = _NUMERIC.fullmatch(span)
+    if m:
+        a, b, y = int(m[1]), int(m[2]), int(m[3])
+        # month first, unless the first number can't be a month
+        if a <= 12:
+            return _ymd(y, a, b)
+        if b <= 12:
+            return _ymd(y, b, a)
+    return None
+
+
+# `today` is only part of the memo key: partial dates resolve against it
+@lru_cache(maxsize=65536)
+def _dateparser_iso(text: str, today: str) -> Optional[str]:
+    import dateparser  # slow to import; many texts never need it
+    dt = dateparser.parse(text)
+    return dt.date().isoformat() if dt else None
+
+
+@lru_cache(maxsize=65536)
+def parse_span(span: str, today: str) -> Optional[str]:
+    return _fast_parse(span) or _dateparser_iso(span, today)
+
+
+_vocab = None
+_vocab_lock = threading.Lock()
+# locale tables dateparser matches or rewrites ("two" -> "2", "midnight" ->
+# "00:00", "hace N días") before it looks words up in the dictionary
+_LOCALE_TABLES = ("simplifications", "relative-type", "relative-type-regex", "skip", "ago", "in")
+
+
+def _normalize(s: str) -> str:
+    return "".join(c for c in unicodedata.normalize("NFKD", s.lower()) if not unicodedata.combining(c))
+
+
+def _spellings(items, limit: int = 256) -> List[str]:
+    # the texts a parsed regex matches, numbers and other open-ended parts
+    # as a space: "пар[ауі]" -> пара, пару, парі; at most `limit` of them
+    from re import _parser as sre
+    out = [""]
+    for op, av in items:
+        if op is sre.LITERAL:
+            alts = [chr(av)]
+        elif op is sre.IN:
+            alts = [chr(a) if o is sre.LITERAL else " " for o, a in av]
+        elif op is sre.BRANCH:
+            alts = [s for branch in av[1] for s in _spellings(branch, limit)]
+        elif op is sre.SUBPATTERN:
+            alts = _spellings(av[-1], limit)
+        elif op in (sre.MAX_REPEAT, sre.MIN_REPEAT, sre.POSSESSIVE_REPEAT) and av[1] == 1:
+            alts = ([""] if av[0] == 0 else []) + _spellings(av[2], limit)  # optional part
+        else:
+            alts = [" "]
+        out = [a + b for a in out for b in alts][:limit]
+    return out
+
+
+def _table_words(value, words: Set[str]):
+    # words of a locale table: its strings, read as regexes where they are
+    # one, and nested keys and values
+    if isinstance(value, str):
+        from re import _parser as sre
+        try:
+            texts = _spellings(sre.parse(value)) + [value]
+        except Exception:
+            texts = [value]  # a replacement ("\1 month") or a bare character
+        for text in texts:
+            words.update(_WORDS.findall(_normalize(text)))
+    elif isinstance(value, dict):
+        for k, v in value.items():
+            _table_words(k, words)
+            _table_words(v, words)
+    elif isinstance(value, (list, tuple)):
+        for v in value:
+            _table_words(v, words)
+
+
+def _date_vocabulary() -> Optional[Set[str]]:
+    # every word any dateparser locale (or timezone name) understands. A
+    # sentence with a word outside this set can't parse as a date in any
+    # language, so it never needs to reach dateparser.
+    global _vocab
+    if _vocab is None:
+        with _vocab_lock:
+            if _vocab is None:
+                try:
+                    from dateparser.conf import Settings
+                    from dateparser.languages.loader import default_loader
+                    from dateparser.timezones import timezone_info_list
+                    settings = Settings()
+                    words = set()
+                    for locale in default_loader.get_locales():
+                        for key in locale._get_dictionary(settings)._dictionary:
+                            if isinstance(key, str):
+                                words.update(_WORDS.findall(_normalize(key)))
+                        for table in _LOCALE_TABLES:
+                            _table_words(locale.info.get(table), words)
+                    for info in timezone_info_list:
+                        for name, _ in info["timezones"]:
+                            words.update(_WORDS.findall(_normalize(name)))
+                    _vocab = words
+                except Exception:
+                    # dateparser internals moved; check every sentence like before
+                    _vocab = set()
+    return _vocab or None
+
+
+def _maybe_date(sentence: str) -> bool:
+    vocab = _date_vocabulary()
+    if vocab is None:
+        return True
+    return all(w in vocab for w in _WORDS.findall(_normalize(sentence)))
+
+
+def recognize_dates(text: str) -> List[str]:
+    res = set()
+    today = date.today().isoformat()
+    for pat in DATE_PATTERNS:
+        for m in pat.finditer(text):
+            iso = parse_span(m.group(0), today)
+            if iso:
+                res.add(iso)
+    # sentence-level pass, only for sentences made entirely of date words
+    for sent in text.split("."):
+        if sent.strip() and _maybe_date(sent):
+            iso = _dateparser_iso(sent, today)
+            if iso:
+                res.add(iso)
+    return sorted(res)
+
+
+def dated_sentences(text: str, year: Optional[int] = None) -> List[Tuple[str, str, str]]:
+    """
+    (sentence, ISO date, date as written) for every sentence of `text` that
+    has a full date in it; a sentence with several is tied to the first.
+    Dates written without a year ("August 23") take `year`, e.g. the
+    article's publication year, else the current one; month-and-year
+    mentions ("August 2023") don't count. One scan finds the dates in the
+    whole text; they are mapped to sentences by offset.
+    """
+    if not text:
+        return []
+    starts = [0] + [m.end() for m in _SENTENCE_END.finditer(text)]
+    today = date.today()
+    out = []
+    last = -1
+    for m in SENTENCE_DATE.finditer(text):
+        k = bisect.bisect_right(starts, m.start()) - 1
+        if k == last:
+            continue  # this sentence is already dated
+        span = m.group(0).strip().rstrip(",")
+        if _MONTH_YEAR.fullmatch(span):
+            continue  # "August 2023": no day
+        md = _MONTH_DAY.fullmatch(span)
+        if md and md[1].lower() in MONTHS:
+            # "August 23", or "July 15 2" where the number after isn't a year
+            iso = _ymd(int(md[3]) if len(md[3]) == 4 else year or today.year, MONTHS[md[1].lower()], int(md[2]))
+        else:
+            iso = parse_span(span, today.isoformat())
+        if iso:
+            end = starts[k + 1] if k + 1 < len(starts) else len(text)
+            out.append((text[starts[k]:end].strip(), iso, span))
+            last = k
+    return out
@@ -0,0 +1,164 @@
+# utils/dedupe.py
+# Near-duplicate detection, run before the expensive NLP stages: canonical
+# URLs catch AMP / mobile / tracking variants of one page, and a MinHash LSH
+# index over the extracted text catches syndicated copies of one story.
+import os
+import re
+import zlib
+from collections import defaultdict
+from typing import Dict, Hashable, List, Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from utils.cache import normalize_url
+
+DEDUPE_THRESHOLD = float(os.getenv("DEDUPE_THRESHOLD", "0.5"))  # estimated Jaccard of word 3-shingles
+MINHASH_PERMUTATIONS = 128
+LSH_BANDS = 32  # 32 bands x 4 rows: ~87% chance to compare pairs at 0.5 similarity
+SHINGLE_WORDS = 3
+
+# hosts and params that only select a mobile/AMP rendering of the same page
+MOBILE_HOST_PREFIXES = ("www.", "m.", "amp.", "mobile.")
+AMP_PARAMS = {"amp", "amp_js_v", "usqp", "outputtype", "amp_gsa", "__amp_source_origin"}
+_AMP_CACHE = re.compile(r"^/(?:amp|c|v)/(?:s/)?([^/]+\.[^/]+)(/.*)?$")
+_WORD = re.compile(r"\w+")
+_PRIME = (1 << 32) + 15  # > any crc32; a*h + b stays inside uint64
+
+
+def canonical_url(url: str) -> str:
+    # normalize_url plus: https, no www./m./amp. host prefix, no AMP path or
+    # params, no trailing slash; google / ampproject AMP caches unwrapped
+    norm = normalize_url(url)
+    if not norm:
+        return ""
+    parts = urlsplit(norm)
+    host, path = parts.netloc, parts.path
+    if host.endswith(".cdn.ampproject.org") or (host.startswith(("www.google.", "google.")) and path.startswith("/amp/")):
+        m = _AMP_CACHE.match(path)
+        if m:
+            host, path = m.group(1).lower(), m.group(2) or "/"
+    for prefix in MOBILE_HOST_PREFIXES:
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+            break
+    path = re.sub(r"^/amp(?=/)", "", path)
+    path = re.sub(r"/amp/?$", "", path)
+    path = re.sub(r"\.amp(?=\.html?$|$)", "", path)
+    path = path.rstrip("/") or "/"
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k.lower() not in AMP_PARAMS]
+    return urlunsplit(("https", host, path, urlencode(query), ""))
+
+
+def title_key(title: str, source: str = "") -> str:
+    # headline without the " - Publisher" / " | Publisher" tail and punctuation
+    title = (title or "").strip()
+    if source:
+        for sep in (" - ", " | ", " — ", " – "):
+            head, _, tail = title.rpartition(sep)
+            if head and tail.strip().lower() == source.strip().lower():
+                title = head
+                break
+    return " ".join(_WORD.findall(title.lower()))
+
+
+def shingles(text: str, k: int = SHINGLE_WORDS) -> List[int]:
+    words = _WORD.findall(text.lower())
+    if len(words) < k:
+        return [zlib.crc32(w.encode()) for w in words]
+    return list({zlib.crc32(" ".join(words[i:i + k]).encode()) for i in range(len(words) - k + 1)})
+
+
+_perm = None
+
+
+def _permutations():
+    global _perm
+    if _perm is None:
+        import numpy as np  # only needed once article text arrives
+        rng = np.random.RandomState(1)
+        a = rng.randint(1, 1 << 31, size=MINHASH_PERMUTATIONS).astype(np.uint64)
+        b = rng.randint(0, 1 << 31, size=MINHASH_PERMUTATIONS).astype(np.uint64)
+        _perm = (a, b)
+    return _perm
+
+
+def minhash(text: str):
+    # MINHASH_PERMUTATIONS-long signature of the text's shingle set, or None
+    import numpy as np
+    hashes = shingles(text)
+    if not hashes:
+        return None
+    a, b = _permutations()
+    h = np.asarray(hashes, dtype=np.uint64)
+    return ((np.outer(a, h) + b[:, None]) % np.uint64(_PRIME)).min(axis=1)
+
+
+def similarity(sig_a, sig_b) -> float:
+    # estimated Jaccard similarity of the two shingle sets
+    return float((sig_a == sig_b).mean())
+
+
+class NearDuplicateIndex:
+    """
+    Remembers the articles seen so far and reports when a new one repeats
+    an earlier one.
+
+    add_candidate() checks canonical URL and headline, before anything is
+    downloaded. add_text() checks the extracted text: MinHash signatures are
+    split into LSH bands, only articles sharing a band are compared, and a
+    pair counts as duplicate when its estimated Jaccard similarity is at
+    least `threshold`. Both return the key of the earlier article or None.
+    """
+
+    def __init__(self, threshold: float = DEDUPE_THRESHOLD, bands: int = LSH_BANDS):
+        self.threshold = threshold
+        self.bands = bands
+        self.urls: Dict[str, Hashable] = {}
+        self.titles: Dict[str, Hashable] = {}
+        self.signatures: Dict[Hashable, object] = {}
+        self.buckets = defaultdict(list)
+        self._names: Dict[Hashable, tuple] = {}  # key -> (canonical URL, headline key) it was added under
+
+    def add_candidate(self, key: Hashable, url: str = "", title: str = "", source: str = "") -> Optional[Hashable]:
+        canon, head = canonical_url(url), title_key(title, source)
+        if canon and canon in self.urls:
+            return self.urls[canon]
+        if head and head in self.titles:
+            return self.titles[head]
+        if canon:
+            self.urls[canon] = key
+        if head:
+            self.titles[head] = key
+        self._names[key] = (canon, head)
+        return None
+
+    def add_text(self, key: Hashable, text: str) -> Optional[Hashable]:
+        sig = minhash(text or "")
+        if sig is None:
+            return None
+        bands = [(i, band.tobytes()) for i, band in enumerate(sig.reshape(self.bands, -1))]
+        checked = set()
+        for band in bands:
+            for other in self.buckets.get(band, ()):
+                if other in checked:
+                    continue
+                checked.add(other)
+                if similarity(sig, self.signatures[other]) >= self.threshold:
+                    return other
+        self.signatures[key] = sig
+        for band in bands:
+            self.buckets[band].append(key)
+        return None
+
+    def remove(self, key: Hashable):
+        # forget an article, so later copies of it count as new
+        canon, head = self._names.pop(key, ("", ""))
+        if canon and self.urls.get(canon) == key:
+            del self.urls[canon]
+        if head and self.titles.get(head) == key:
+            del self.titles[head]
+        sig = self.signatures.pop(key, None)
+        if sig is not None:
+            for band in [(i, band.tobytes()) for i, band in enumerate(sig.reshape(self.bands, -1))]:
+                self.buckets[band].remove(key)
+                if not self.buckets[band]:
+                    del self.buckets[band]
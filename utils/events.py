@@ -0,0 +1,147 @@
+# utils/events.py
+# Sentence-level milestones. Every sentence with a full date in it is a
+# dated mention; mentions of the same date whose wording is similar (TF-IDF
+# cosine) are one event, however many articles report it. Similarities are
+# computed in NumPy from the sparse (sentence, term) weights, and only for
+# sentences that share a date and a term: no Python loop over pairs.
+import os
+import re
+from typing import List, Tuple
+
+from utils.dates import dated_sentences
+from utils.models import Article, Milestone
+from utils.tracing import traced
+
+EVENT_SIMILARITY = float(os.getenv("EVENT_SIMILARITY", "0.3"))  # cosine at which same-day sentences are one event
+EVENT_MIN_WORDS = 3  # shorter dated sentences (captions, datelines) are skipped
+
+_TOKEN = re.compile(r"\w+")
+_YEAR = re.compile(r"\b(\d{4})\b")
+STOPWORDS = frozenset("""
+a about after again against all also an and any are as at be because been before being between both but by can
+could did do does during each few for from further had has have having he her here hers him his how i if in into is
+it its itself just more most no nor not now of off on once only or other our out over own said same says she should
+so some such than that the their them then there these they this those through to too under until up very was we
+were what when where which while who whom why will with would you your
+""".split())
+
+
+def mentions(articles: List[Article]) -> Tuple[List[str], List[str], List[List[str]], List[int]]:
+    # (sentence, its date, its words for matching, article number) columns;
+    # the date itself is left out of the words: every sentence of a day shares it
+    sentences, dates, words, owners = [], [], [], []
+    for i, a in enumerate(articles):
+        year = _YEAR.search(a.published_at or "")
+        for sentence, iso, span in dated_sentences(a.content, int(year[1]) if year else None):
+            tokens = [t for t in _TOKEN.findall(sentence.replace(span, " ").lower()) if t not in STOPWORDS]
+            if len(tokens) < EVENT_MIN_WORDS:
+                continue
+            sentences.append(sentence)
+            dates.append(iso)
+            words.append(tokens)
+            owners.append(i)
+    return sentences, dates, words, owners
+
+
+def tfidf(words: List[List[str]]):
+    """
+    Sparse TF-IDF rows as parallel arrays (row, term, weight), one entry per
+    distinct word of a sentence: sublinear tf, smoothed idf, rows L2-normed.
+    """
+    import numpy as np
+    n = len(words)
+    lengths = np.fromiter(map(len, words), dtype=np.int64, count=n)
+    vocab, term_of = np.unique(np.array([t for ts in words for t in ts]), return_inverse=True)
+    keys, tf = np.unique(np.repeat(np.arange(n, dtype=np.int64), lengths) * len(vocab) + term_of,
+                         return_counts=True)
+    rows, terms = keys // len(vocab), keys % len(vocab)
+    df = np.bincount(terms, minlength=len(vocab))
+    weights = (1.0 + np.log(tf)) * (np.log((1.0 + n) / (1.0 + df)) + 1.0)[terms]
+    weights /= np.sqrt(np.bincount(rows, weights=weights * weights, minlength=n))[rows]
+    return rows, terms, weights
+
+
+def similar_pairs(rows, terms, weights, blocks):
+    """
+    Cosine similarity of every pair of rows in the same block (here: the
+    same date) that share at least one term, as (left, right, similarity)
+    with left < right. Entries are sorted by (block, term, row); each pair
+    inside a run of equal (block, term) contributes one product, and the
+    products are summed per pair.
+    """
+    import numpy as np
+    block = blocks[rows]
+    order = np.lexsort((rows, terms, block))
+    rows, terms, weights, block = rows[order], terms[order], weights[order], block[order]
+    n = len(rows)
+    starts = np.flatnonzero(np.r_[True, (terms[1:] != terms[:-1]) | (block[1:] != block[:-1])])
+    sizes = np.diff(np.r_[starts, n])
+    # entries after each one in its run: its partners
+    after = np.repeat(starts + sizes, sizes) - np.arange(n) - 1
+    left = np.repeat(np.arange(n), after)
+    right = left + 1 + np.arange(len(left)) - np.repeat(np.cumsum(after) - after, after)
+    size = int(rows.max()) + 1 if n else 0
+    pairs, inverse = np.unique(rows[left] * size + rows[right], return_inverse=True)
+    sims = np.bincount(inverse, weights=weights[left] * weights[right])
+    return pairs // max(size, 1), pairs % max(size, 1), sims
+
+
+def components(n: int, left, right):
+    # connected components over the edges: labels propagate the smallest
+    # member index, with pointer jumping so long chains take few rounds
+    import numpy as np
+    labels = np.arange(n)
+    while True:
+        low = np.minimum(labels[left], labels[right])
+        new = labels.copy()
+        np.minimum.at(new, left, low)
+        np.minimum.at(new, right, low)
+        new = new[new]
+        if np.array_equal(new, labels):
+            return labels
+        labels = new
+
+
+@traced("build_events", detail=lambda articles, *args, **kwargs: f"{len(articles)} articles")
+def build_events(articles: List[Article], threshold: float = EVENT_SIMILARITY) -> List[Milestone]:
+    """
+    Event milestones, in date order: each groups the same-day sentences
+    (from any article) whose TF-IDF cosine to another in the group is at
+    least `threshold`. The milestone's sentence is the group's
+    best-connected one, its article that sentence's; the other outlets
+    reporting it are its corroborations. Within a day, events reported by
+    more articles come first.
+    """
+    import numpy as np
+    sentences, dates, words, owners = mentions(articles)
+    n = len(sentences)
+    if not n:
+        return []
+    day_names, day = np.unique(np.array(dates, dtype=str), return_inverse=True)
+    owner = np.array(owners)
+    left, right, sims = similar_pairs(*tfidf(words), day)
+    linked = sims >= threshold
+    left, right, sims = left[linked], right[linked], sims[linked]
+    label = components(n, left, right)
+
+    # representative: most similar to the rest of its event, earliest article on ties
+    score = np.bincount(left, weights=sims, minlength=n) + np.bincount(right, weights=sims, minlength=n)
+    order = np.lexsort((owner, -score, label))
+    reps = order[np.r_[True, label[order][1:] != label[order][:-1]]]
+
+    # the distinct articles of each event, in article order
+    keys = np.unique(label.astype(np.int64) * len(articles) + owner)
+    event_of, article_of = keys // len(articles), keys % len(articles)
+    bounds = np.searchsorted(event_of, label[reps])
+    counts = np.searchsorted(event_of, label[reps], side="right") - bounds
+
+    events = []
+    for rep, start, count in zip(reps.tolist(), bounds.tolist(), counts.tolist()):
+        main = articles[owners[rep]]
+        outlets = dict.fromkeys(articles[j].source for j in article_of[start:start + count].tolist())
+        outlets.pop(main.source, None)
+        outlets.pop(None, None)
+        events.append((day[rep], -count, owners[rep],
+                       Milestone(str(day_names[day[rep]]), main, tuple(outlets), sentences[rep])))
+    events.sort(key=lambda e: e[:3])
+    return [m for *_, m in events]
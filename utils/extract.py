@@ -0,0 +1,118 @@
+# utils/extract.py
+# HTML -> article text from the bytes fetcher already downloaded. A streaming
+# lxml pass over the <p> elements handles most news pages; newspaper3k (much
+# slower) only runs when that finds too little, and every fallback works on
+# the same bytes, so no page is downloaded twice.
+import io
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
+from lxml import etree
+
+EXTRACT_ENGINE = os.getenv("EXTRACT_ENGINE", "lxml")  # "lxml" or "newspaper" (newspaper3k first, as before)
+EXTRACT_MIN_CHARS = int(os.getenv("EXTRACT_MIN_CHARS", "500"))  # less than this from lxml -> try newspaper3k
+MAX_TEXT_CHARS = 20000
+MIN_PARAGRAPH_CHARS = 30
+
+# paragraphs under these are page furniture, not the story
+SKIP_TAGS = {"nav", "header", "footer", "aside", "form", "figure", "figcaption", "noscript", "button", "select"}
+_SKIP_ATTR = re.compile(
+    r"comment|footer|related|share|social|promo|newsletter|subscribe|advert|sponsor|sidebar|breadcrumb|cookie|"
+    r"byline|caption|recommend|most-?read|trending|popular|outbrain|taboola",
+    re.IGNORECASE,
+)
+_SPACE = re.compile(r"\s+")
+
+
+def _skipped(el) -> bool:
+    if not isinstance(el.tag, str) or el.tag in SKIP_TAGS:
+        return True
+    attrs = (el.get("class") or "") + " " + (el.get("id") or "")
+    return bool(attrs.strip()) and bool(_SKIP_ATTR.search(attrs))
+
+
+def _paragraphs(content: bytes) -> List[Tuple[str, list]]:
+    # (text, ancestors) of every <p> outside page furniture, in document
+    # order; libxml2 parses incrementally and only <p> end events reach Python
+    out = []
+    try:
+        for _, p in etree.iterparse(io.BytesIO(content), events=("end",), tag="p", html=True,
+                                    recover=True, no_network=True, remove_comments=True):
+            text = _SPACE.sub(" ", "".join(p.itertext())).strip()
+            if text:
+                ancestors, el, skip = [], p.getparent(), _skipped(p)
+                while el is not None and not skip:
+                    skip = _skipped(el)
+                    ancestors.append(el)
+                    el = el.getparent()
+                if not skip:
+                    out.append((text, ancestors))
+            p.text, p.tail = None, None
+            del p[:]  # drop what was read; the ancestors stay for later paragraphs
+    except (etree.LxmlError, ValueError):
+        pass
+    return out
+
+
+def _main_text(paragraphs: List[Tuple[str, list]]) -> str:
+    # readability-style: a real paragraph scores its length for its parent and
+    # half of it for the grandparent (text split over sibling divs); the story
+    # is every paragraph under the best-scoring element
+    scores: Dict[int, float] = {}
+    nodes = {}
+    for text, ancestors in paragraphs:
+        if len(text) <= MIN_PARAGRAPH_CHARS:
+            continue
+        for weight, el in zip((1.0, 0.5), ancestors):
+            scores[id(el)] = scores.get(id(el), 0.0) + weight * len(text)
+            nodes[id(el)] = el
+    if not scores:
+        return ""
+    best = nodes[max(scores, key=scores.get)]
+    return "\n\n".join(t for t, ancestors in paragraphs if any(a is best for a in ancestors))[:MAX_TEXT_CHARS]
+
+
+def _newspaper_text(url: str, html: str) -> Optional[str]:
+    try:
+        from newspaper import Article  # heavy (nltk, PIL); imported on first use
+        art = Article(url, fetch_images=False)  # it would download the page's images to pick a top image
+        art.download(input_html=html)
+        art.parse()
+        if art.text and len(art.text) > 50:
+            return art.text
+    except Exception:
+        pass
+    return None
+
+
+def _decode(content: bytes, encoding: Optional[str]) -> str:
+    try:
+        return content.decode(encoding or "utf-8", "replace")
+    except LookupError:
+        return content.decode("utf-8", "replace")
+
+
+def html_to_text(url: str, content: bytes, encoding: Optional[str] = None, engine: str = EXTRACT_ENGINE) -> str:
+    """
+    Article text of one downloaded page.
+
+    engine="lxml": the main-content paragraphs found by one streaming lxml
+    pass; newspaper3k is tried only when they add up to fewer than
+    EXTRACT_MIN_CHARS, and the longer of the two wins. engine="newspaper":
+    newspaper3k first, all longer <p> texts as the fallback (the old behaviour, minus
+    the second download). `encoding` (from the response headers) is only
+    needed to decode the page for newspaper3k; lxml reads the bytes.
+    """
+    if engine == "newspaper":
+        text = _newspaper_text(url, _decode(content, encoding))
+        if text:
+            return text
+        return "\n\n".join(t for t, _ in _paragraphs(content) if len(t) > MIN_PARAGRAPH_CHARS)[:MAX_TEXT_CHARS]
+    text = _main_text(_paragraphs(content))
+    if len(text) >= EXTRACT_MIN_CHARS:
+        return text
+    fallback = _newspaper_text(url, _decode(content, encoding))
+    if fallback and len(fallback) > len(text):
+        return fallback
+    return text
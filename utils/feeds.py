@@ -0,0 +1,83 @@
+# utils/feeds.py
+# RSS 2.0 / Atom feeds -> Articles, streamed. lxml's iterparse reads the
+# response while it is still arriving and hands over one <item> / <entry> at
+# a time; each is freed once read and parsing stops as soon as enough items
+# are in, so no whole-feed tree (or the rest of the feed) is ever held.
+import io
+from typing import Iterator, List, Optional, Union
+
+from lxml import etree
+
+from utils.models import Article
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+_ITEM_TAGS = ("item", ATOM + "entry")
+
+
+def _text(el, tag: str) -> Optional[str]:
+    child = el.find(tag)
+    if child is None or child.text is None:
+        return None
+    return child.text.strip()
+
+
+def _atom_link(entry) -> str:
+    # rel="alternate" (or no rel) is the article; others are enclosures etc.
+    for link in entry.iterfind(ATOM + "link"):
+        if link.get("rel", "alternate") == "alternate" and link.get("href"):
+            return link.get("href")
+    return ""
+
+
+def _article(el) -> Article:
+    if el.tag == "item":
+        return Article(
+            title=_text(el, "title") or "",
+            published_at=_text(el, "pubDate"),
+            url=_text(el, "link") or "",
+            source=_text(el, "source"),
+        )
+    source = el.find(ATOM + "source")
+    author = el.find(ATOM + "author")
+    return Article(
+        title=_text(el, ATOM + "title") or "",
+        published_at=_text(el, ATOM + "published") or _text(el, ATOM + "updated"),
+        url=_atom_link(el),
+        source=(_text(source, ATOM + "title") if source is not None else None)
+        or (_text(author, ATOM + "name") if author is not None else None),
+    )
+
+
+def iter_feed(source: Union[bytes, io.RawIOBase], limit: Optional[int] = None) -> Iterator[Article]:
+    """
+    Articles from an RSS 2.0 or Atom feed, in feed order, at most `limit`.
+    `source` is the raw bytes or any file-like object (e.g. a streamed
+    response's .raw); it is only read as far as the last item needed.
+    A malformed feed yields the items before the error.
+    """
+    if limit is not None and limit <= 0:
+        return
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    n = 0
+    try:
+        # no DTDs, entities or network access: feeds come from third parties
+        for _, el in etree.iterparse(source, events=("end",), tag=_ITEM_TAGS, recover=True,
+                                     resolve_entities=False, no_network=True, load_dtd=False, huge_tree=False):
+            article = _article(el)
+            # free this item and the ones before it; <channel> stays, empty
+            el.clear(keep_tail=False)
+            parent = el.getparent()
+            if parent is not None:
+                while el.getprevious() is not None:
+                    del parent[0]
+            yield article
+            n += 1
+            if limit is not None and n >= limit:
+                return
+    except (etree.LxmlError, ValueError):
+        return
+
+
+def parse_feed(content: bytes, limit: Optional[int] = None) -> List[Article]:
+    return list(iter_feed(content, limit))
@@ -115,95 +115,273 @@
 #     return processed
 # utils/fetcher.py
 import os
-import requests
-from newspaper import Article
-from bs4 import BeautifulSoup
 from datetime import datetime
-from typing import List, Dict
-from urllib.parse import urlencode
+from typing import List, Dict, Iterable, Iterator, Tuple
+from urllib.parse import quote_plus, urlencode, urlparse
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+import contextvars
+import functools
+import queue
+import threading
 import time
 
-NEWSAPI_KEY = os.getenv("NEWSAPI_KEY")  # set in env
+from utils import http_client
+from utils.cache import get_content_cache
+from utils.dedupe import NearDuplicateIndex
+from utils.extract import html_to_text
+from utils.feeds import iter_feed
+from utils.models import Article
+from utils.providers import iter_fan_out, register_provider
+from utils.tracing import traced
 
-def fetch_from_newsapi(query: str, page_size: int = 8) -> List[Dict]:
+NEWSAPI_KEY = os.getenv("NEWSAPI_KEY")  # set in env
+# provider endpoints; overridden by the benchmarks' fixture server
+NEWSAPI_URL = os.getenv("NEWSAPI_URL", "https://newsapi.org/v2/everything")
+GNEWS_RSS_URL = os.getenv("GNEWS_RSS_URL", "https://news.google.com/rss/search")
+# more RSS / Atom searches queried alongside those two: "name=https://host/rss?q={query};..."
+EXTRA_FEEDS = os.getenv("EXTRA_FEEDS", "")
+
+# full-text extraction runs in a bounded thread pool; see extract_many
+EXTRACT_WORKERS = int(os.getenv("EXTRACT_WORKERS", "8"))
+EXTRACT_PER_HOST = int(os.getenv("EXTRACT_PER_HOST", "2"))
+EXTRACT_DEADLINE = float(os.getenv("EXTRACT_DEADLINE", "25"))
+
+@traced("fetch_from_newsapi", detail=lambda query, page_size=8, page=1: f"page {page}")
+def fetch_from_newsapi(query: str, page_size: int = 8, page: int = 1) -> List[Article]:
     if not NEWSAPI_KEY:
         return []
-    url = "https://newsapi.org/v2/everything"
+    url = NEWSAPI_URL
     params = {
         "q": query,
         "language": "en",
         "pageSize": page_size,
+        "page": page,
         "sortBy": "publishedAt",
         "apiKey": NEWSAPI_KEY
     }
-    r = requests.get(url, params=params, timeout=12)
+    r = http_client.get(url, params=params, timeout=12)
     out = []
     if r.ok:
         data = r.json()
         for art in data.get("articles", []):
-            out.append({
-                "title": art.get("title"),
-                "publishedAt": art.get("publishedAt"),
-                "url": art.get("url"),
-                "source": art.get("source", {}).get("name"),
-                "raw": art
-            })
+            out.append(Article.from_payload(
+                art,
+                title=art.get("title") or "",
+                published_at=art.get("publishedAt"),
+                url=art.get("url") or "",
+                source=(art.get("source") or {}).get("name"),
+            ))
     return out
 
-def fetch_from_gnews(query: str, page_size: int = 8) -> List[Dict]:
+@traced("fetch_from_gnews")
+def fetch_from_gnews(query: str, page_size: int = 8) -> List[Article]:
     # lightweight fallback using Google News RSS search
     q = urlencode({"q": query})
-    rss_url = f"https://news.google.com/rss/search?q={query}&hl=en-US&gl=US&ceid=US:en"
-    r = requests.get(rss_url, timeout=10)
-    out = []
-    if r.ok:
-        soup = BeautifulSoup(r.content, "xml")
-        items = soup.find_all("item")[:page_size]
-        for it in items:
-            link = it.link.text
-            out.append({
-                "title": it.title.text,
-                "publishedAt": it.pubDate.text if it.pubDate else None,
-                "url": link,
-                "source": it.source.text if it.source else None,
-                "raw": None
-            })
-    return out
+    rss_url = f"{GNEWS_RSS_URL}?q={query}&hl=en-US&gl=US&ceid=US:en"
+    return _read_feed(rss_url, page_size)
 
+def _read_feed(url: str, page_size: int) -> List[Article]:
+    # RSS or Atom, parsed while it downloads (utils/feeds.py); once page_size
+    # items are in, the rest of the response is never read
+    r = http_client.get(url, timeout=10, stream=True)
+    try:
+        if not r.ok:
+            return []
+        r.raw.decode_content = True  # gzip / deflate
+        return list(iter_feed(r.raw, page_size))
+    finally:
+        r.close()
+
+@traced("fetch_from_feed", detail=lambda template, query, page_size=8: template)
+def fetch_from_feed(template: str, query: str, page_size: int = 8) -> List[Article]:
+    # any RSS or Atom search endpoint; {query} in the template is the URL-encoded query
+    return _read_feed(template.replace("{query}", quote_plus(query)), page_size)
+
+def _register_providers():
+    # NewsAPI, Google News RSS and EXTRA_FEEDS, all queried at once (utils/providers.py)
+    register_provider("newsapi", fetch_from_newsapi, urlparse(NEWSAPI_URL).hostname, paged=True)
+    register_provider("gnews", fetch_from_gnews, urlparse(GNEWS_RSS_URL).hostname)
+    for entry in EXTRA_FEEDS.split(";"):
+        name, _, template = entry.strip().partition("=")
+        if name and template:
+            register_provider(name.strip(), functools.partial(fetch_from_feed, template.strip()),
+                              urlparse(template.strip()).hostname)
+
+_register_providers()
+
+@traced("extract_full_text", detail=lambda url: url)
 def extract_full_text(url: str) -> str:
+    # served from the on-disk content cache when fresh; stale entries are
+    # revalidated with a conditional GET so unchanged pages come back as 304
+    cache = get_content_cache() if url else None
+    cached = cache.get(url) if cache is not None else None
+    if cached and cached["fresh"]:
+        return cached["text"]
+    headers = {}
+    if cached:
+        if cached["etag"]:
+            headers["If-None-Match"] = cached["etag"]
+        if cached["last_modified"]:
+            headers["If-Modified-Since"] = cached["last_modified"]
     try:
-        art = Article(url)
-        art.download()
-        art.parse()
-        if art.text and len(art.text) > 50:
-            return art.text
+        r = http_client.get(url, timeout=10, headers=headers)
     except Exception:
-        pass
-    # fallback simple scrape:
+        return cached["text"] if cached else ""
+    if r.status_code == 304 and cached:
+        cache.touch(url)
+        return cached["text"]
+    if not r.ok:
+        return cached["text"] if cached else ""
+    text = html_to_text(url, r.content, r.encoding)
+    if text and cache is not None:
+        cache.put(url, text, r.headers.get("ETag"), r.headers.get("Last-Modified"))
+    return text
+
+def iter_extracted(urls: Iterable[str], workers: int = EXTRACT_WORKERS,
+                   per_host: int = EXTRACT_PER_HOST, deadline: float = EXTRACT_DEADLINE) -> Iterator[Tuple[str, str]]:
+    """
+    Run extract_full_text over many URLs concurrently, yielding (url, text)
+    as each page finishes.
+
+    At most `workers` pages are fetched at once and at most `per_host` of them
+    from the same host. `urls` may be a lazy stream (candidates still being
+    paged in): it is read on a feeder thread, and only while fewer than
+    2 * `workers` pages are in flight or finished but not yet taken by the
+    caller, so a slow consumer holds back the stream instead of piling up
+    pages. Iteration stops when `deadline` seconds have passed; URLs still
+    in flight are never yielded.
+    """
+    stop_at = time.monotonic() + deadline
+    host_slots = defaultdict(lambda: threading.BoundedSemaphore(per_host))  # filled by the feeder only
+    window = threading.Semaphore(max(1, 2 * workers))
+    results = queue.Queue()
+    stop = threading.Event()
+    submitted = [0]
+    fed = object()  # end of the stream marker
+
+    def run(url: str) -> str:
+        slot = host_slots[urlparse(url).netloc.lower()]
+        if not slot.acquire(timeout=max(0.0, stop_at - time.monotonic())):
+            return ""
+        try:
+            if time.monotonic() >= stop_at:
+                return ""
+            return extract_full_text(url) or ""
+        finally:
+            slot.release()
+
+    def task(url: str):
+        try:
+            text = run(url)
+        except Exception:
+            text = ""
+        results.put((url, text))
+
+    def feed():
+        seen = set()
+        try:
+            for url in urls:
+                if not url or url in seen:
+                    continue
+                seen.add(url)
+                while not window.acquire(timeout=0.2):
+                    if stop.is_set():
+                        return
+                if stop.is_set():
+                    return
+                host_slots[urlparse(url).netloc.lower()]  # created here, not from workers
+                submitted[0] += 1
+                pool.submit(contextvars.copy_context().run, task, url)
+        except Exception:
+            pass  # a failing source ends the stream; what was fed still counts
+        finally:
+            results.put(fed)
+
+    pool = ThreadPoolExecutor(max_workers=max(1, workers))
+    # tasks and the feeder run in copies of the caller's context so their spans join the caller's trace
+    threading.Thread(target=contextvars.copy_context().run, args=(feed,), daemon=True).start()
+    received, feeding = 0, True
     try:
-        r = requests.get(url, timeout=10, headers={"User-Agent":"Mozilla/5.0"})
-        soup = BeautifulSoup(r.content, "html.parser")
-        paragraphs = [p.get_text().strip() for p in soup.find_all("p")]
-        joined = "\n\n".join([p for p in paragraphs if len(p) > 30])
-        return joined[:20000]
-    except Exception:
-        return ""
-
-def aggregate_articles(query: str, max_articles: int = 8) -> List[Dict]:
-    articles = fetch_from_newsapi(query, page_size=max_articles)
-    if len(articles) < max_articles:
-        g = fetch_from_gnews(query, page_size=max_articles - len(articles))
-        articles.extend(g)
-    # Deduplicate by URL or title
-    seen = set()
-    dedup = []
-    for a in articles:
-        key = (a.get("url") or a.get("title")).strip()
-        if key in seen: continue
-        seen.add(key)
-        # get full text
-        a["content"] = extract_full_text(a.get("url", "")) or ""
-        dedup.append(a)
-    return dedup[:max_articles]
-
-
+        while feeding or received < submitted[0]:
+            try:
+                item = results.get(timeout=max(0.0, stop_at - time.monotonic()))
+            except queue.Empty:
+                break  # deadline hit: the caller keeps what it already got
+            if item is fed:
+                feeding = False
+                continue
+            received += 1
+            window.release()
+            yield item
+    finally:
+        # don't block on stragglers; queued work is dropped
+        stop.set()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+def extract_many(urls: Iterable[str], workers: int = EXTRACT_WORKERS,
+                 per_host: int = EXTRACT_PER_HOST, deadline: float = EXTRACT_DEADLINE) -> Dict[str, str]:
+    # iter_extracted collected into {url: text}; late URLs are missing
+    return dict(iter_extracted(urls, workers, per_host, deadline))
+
+def iter_candidates(query: str, max_articles: int = 8, index: NearDuplicateIndex = None) -> Iterator[Article]:
+    # distinct articles as provider pages arrive (every provider is asked at
+    # once); the rest are abandoned once there are enough. Candidates are
+    # added to `index` under their position 0, 1, ...
+    index = index if index is not None else NearDuplicateIndex()
+    n = 0
+    if max_articles <= 0:
+        return
+    for _, articles in iter_fan_out(query, limit=max_articles):
+        # Deduplicate by canonical URL (AMP, mobile, tracking variants) or headline
+        for a in articles:
+            if index.add_candidate(n, a.url, a.title, a.source or "") is not None:
+                continue
+            yield a
+            n += 1
+            if n >= max_articles:
+                return
+
+def fetch_candidates(query: str, max_articles: int = 8, index: NearDuplicateIndex = None) -> List[Article]:
+    return list(iter_candidates(query, max_articles, index))
+
+def iter_articles(query: str, max_articles: int = 8, known: List[Article] = ()) -> Iterator[Tuple[int, Article]]:
+    # (position, article) with content filled in, in the order extraction
+    # finishes; articles that missed the deadline come last with no content.
+    # Near-duplicate texts (syndicated copies) are not yielded; their URLs
+    # are listed in `duplicates` on the article that was kept. `known`
+    # articles (already in hand) count towards max_articles and are never
+    # fetched again. Extraction starts on the first provider page, while
+    # later pages are still being fetched.
+    index = NearDuplicateIndex()
+    owners = {}
+    for j, a in enumerate(known):
+        owners[("known", j)] = a
+        index.add_candidate(("known", j), a.url, a.title, a.source or "")
+        index.add_text(("known", j), a.content)
+    pending = {}  # position -> candidate not extracted yet
+    positions = defaultdict(list)
+
+    def urls():
+        # runs on iter_extracted's feeder thread, only as fast as extraction keeps up
+        for i, a in enumerate(iter_candidates(query, max(0, max_articles - len(known)), index)):
+            owners[i] = a
+            positions[a.url].append(i)
+            pending[i] = a
+            yield a.url
+
+    for url, text in iter_extracted(urls()):
+        for i in positions.pop(url, ()):
+            a = pending.pop(i)
+            original = index.add_text(i, text)
+            if original is not None:
+                owners[original].add_duplicate(url)
+                continue
+            a.content = text
+            yield i, a
+    for i, a in sorted(pending.copy().items()):
+        a.content = ""
+        yield i, a
+
+def aggregate_articles(query: str, max_articles: int = 8) -> List[Article]:
+    return [a for _, a in sorted(iter_articles(query, max_articles), key=lambda p: p[0])]
@@ -0,0 +1,149 @@
+# utils/http_client.py
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+# one pooled keep-alive session shared by every fetcher
+HTTP_POOL_HOSTS = int(os.getenv("HTTP_POOL_HOSTS", "32"))  # hosts kept in the pool
+HTTP_PER_HOST = int(os.getenv("HTTP_PER_HOST", "4"))  # open connections per host
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "3"))
+HTTP_BACKOFF = float(os.getenv("HTTP_BACKOFF", "0.5"))  # base delay, doubled per attempt
+HTTP_BACKOFF_MAX = float(os.getenv("HTTP_BACKOFF_MAX", "20"))
+HTTP_RETRY_BUDGET = float(os.getenv("HTTP_RETRY_BUDGET", "30"))  # seconds one request may spend waiting to retry
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+_stats = {"requests": 0, "retries": 0, "connections_opened": 0}
+_stats_lock = threading.Lock()
+
+
+# host -> time.monotonic() until which it asked us to back off (429)
+_cooldowns: Dict[str, float] = {}
+
+
+def cooldown(host: str) -> float:
+    # seconds left before `host` wants to hear from us again
+    return max(0.0, _cooldowns.get(host, 0.0) - time.monotonic())
+
+
+def _count(key: str, n: int = 1):
+    with _stats_lock:
+        _stats[key] += n
+
+
+class _CountingHTTPPool(HTTPConnectionPool):
+    def _new_conn(self):
+        _count("connections_opened")
+        return super()._new_conn()
+
+
+class _CountingHTTPSPool(HTTPSConnectionPool):
+    def _new_conn(self):
+        _count("connections_opened")
+        return super()._new_conn()
+
+
+class _PooledAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {"http": _CountingHTTPPool, "https": _CountingHTTPSPool}
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                s = requests.Session()
+                # pool_block: callers wait for a free connection instead of opening extra ones
+                adapter = _PooledAdapter(pool_connections=HTTP_POOL_HOSTS, pool_maxsize=HTTP_PER_HOST,
+                                         pool_block=True, max_retries=0)
+                s.mount("http://", adapter)
+                s.mount("https://", adapter)
+                s.headers["User-Agent"] = "Mozilla/5.0"
+                _session = s
+    return _session
+
+
+def _retry_after(resp: requests.Response) -> Optional[float]:
+    value = resp.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _backoff(attempt: int) -> float:
+    # "full jitter": uniform over [0, base * 2**attempt]
+    return random.uniform(0, min(HTTP_BACKOFF_MAX, HTTP_BACKOFF * (2 ** attempt)))
+
+
+def request(method: str, url: str, retries: int = HTTP_RETRIES, **kwargs) -> requests.Response:
+    """
+    Send a request through the shared session.
+
+    429/5xx responses and connection failures are retried up to `retries`
+    times with jittered exponential backoff. A Retry-After is waited out in
+    full; when it is longer than what is left of HTTP_RETRY_BUDGET the
+    request gives up instead. When retries run out the last response is
+    returned (or the error raised).
+    """
+    session = get_session()
+    attempt = 0
+    budget = HTTP_RETRY_BUDGET
+    while True:
+        _count("requests")
+        try:
+            resp = session.request(method, url, **kwargs)
+        except requests.ConnectionError as e:
+            if attempt >= retries or isinstance(e, requests.Timeout):
+                raise
+            delay = _backoff(attempt)
+        else:
+            if resp.status_code == 429:
+                # remembered for background work (see utils/scheduler.py)
+                host = urlsplit(url).hostname or ""
+                wait = _retry_after(resp)
+                wait = HTTP_BACKOFF_MAX if wait is None else wait
+                _cooldowns[host] = max(_cooldowns.get(host, 0.0), time.monotonic() + wait)
+            if resp.status_code not in RETRY_STATUSES or attempt >= retries:
+                return resp
+            delay = _retry_after(resp)
+            if delay is not None and delay > budget:
+                return resp  # the server wants longer than we may wait
+            delay = _backoff(attempt) if delay is None else delay
+            resp.close()
+        delay = min(delay, budget)
+        budget -= delay
+        attempt += 1
+        _count("retries")
+        time.sleep(delay)
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    return request("GET", url, **kwargs)
+
+
+def http_stats() -> Dict[str, int]:
+    # connections_reused = requests that went out on an already open socket
+    with _stats_lock:
+        out = dict(_stats)
+    out["connections_reused"] = max(0, out["requests"] - out["connections_opened"])
+    return out
@@ -0,0 +1,254 @@
+# utils/llm.py
+# Chat-completion helpers and the map-reduce summarizer used by
+# nlp.openai_summarize when the articles don't fit in one prompt.
+import contextvars
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional
+
+from utils.cache import completion_key, get_completion_cache
+from utils.tracing import traced
+
+OPENAI_KEY = os.getenv("OPENAI_API_KEY")
+LLM_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+LLM_CHUNK_TOKENS = int(os.getenv("LLM_CHUNK_TOKENS", "3000"))  # per map call
+LLM_SINGLE_PASS_TOKENS = int(os.getenv("LLM_SINGLE_PASS_TOKENS", "6000"))  # above this, map-reduce
+LLM_REDUCE_TOKENS = int(os.getenv("LLM_REDUCE_TOKENS", "12000"))  # partials per reduce call
+LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "4"))
+LLM_RPM = float(os.getenv("LLM_RPM", "300"))  # requests per minute
+
+SYSTEM_PROMPT = (
+    "You are an assistant that reads multiple news articles and writes a concise timeline of events, "
+    "listing chronological milestones with short descriptions (date → event). Also produce a short summary and note any conflicting claims among the sources."
+)
+MAP_PROMPT = (
+    "You read one news article (or part of one) and list the dated events it reports, one per line as "
+    "'YYYY-MM-DD → event (source claim)'. Use the most precise date the text supports. "
+    "Add a final line 'Claims:' with any figures or claims other outlets might dispute. No other text."
+)
+REDUCE_PROMPT = (
+    "You merge partial timelines extracted from several news articles. Combine duplicate events, "
+    "keep chronological order and note where sources disagree."
+)
+FINAL_INSTRUCTIONS = "Produce: (1) timeline bullets with ISO dates, (2) 2-paragraph summary, (3) 'Conflicts:' short notes"
+
+_encoder = None
+_encoder_loaded = False
+
+
+def estimate_tokens(text: str) -> int:
+    # exact with tiktoken when it is installed, ~4 chars per token otherwise
+    global _encoder, _encoder_loaded
+    if not _encoder_loaded:
+        try:
+            import tiktoken
+            _encoder = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            _encoder = None
+        _encoder_loaded = True
+    if _encoder is not None:
+        return len(_encoder.encode(text, disallowed_special=()))
+    return (len(text) + 3) // 4
+
+
+def chunk_text(text: str, max_tokens: int = LLM_CHUNK_TOKENS) -> List[str]:
+    # split on paragraphs, then sentences, so every chunk fits in max_tokens
+    pieces = []
+    for para in re.split(r"\n\s*\n", text):
+        if estimate_tokens(para) <= max_tokens:
+            pieces.append(para)
+            continue
+        for sent in re.split(r"(?<=[.!?])\s+", para):
+            while estimate_tokens(sent) > max_tokens:
+                cut = max_tokens * 4
+                pieces.append(sent[:cut])
+                sent = sent[cut:]
+            pieces.append(sent)
+    chunks, current, current_tokens = [], [], 0
+    for piece in pieces:
+        n = estimate_tokens(piece)
+        if current and current_tokens + n > max_tokens:
+            chunks.append("\n\n".join(current))
+            current, current_tokens = [], 0
+        current.append(piece)
+        current_tokens += n
+    if current:
+        chunks.append("\n\n".join(current))
+    return [c for c in chunks if c.strip()]
+
+
+class RateLimiter:
+    """Token bucket: at most `per_minute` acquisitions per minute, bursts up to `burst`."""
+
+    def __init__(self, per_minute: float = LLM_RPM, burst: Optional[int] = None):
+        self.rate = per_minute / 60.0
+        self.capacity = float(burst or max(1, LLM_CONCURRENCY))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+_limiter = RateLimiter()
+
+
+@traced("llm_chat")
+def chat(messages: List[Dict], max_tokens: int = 800, temperature: float = 0.2, model: str = LLM_MODEL) -> str:
+    # completions are cached by content hash, so an unchanged article reuses
+    # its map summary even when other articles in the query changed
+    cache = get_completion_cache()
+    key = completion_key(model, messages, max_tokens=max_tokens, temperature=temperature)
+    if cache is not None:
+        hit = cache.get(key)
+        if hit is not None:
+            return hit
+    import openai  # heavy; only needed when summarizing
+    openai.api_key = OPENAI_KEY
+    _limiter.acquire()
+    t0 = time.perf_counter()
+    resp = openai.ChatCompletion.create(
+        model=model,
+        messages=messages,
+        temperature=temperature,
+        max_tokens=max_tokens,
+    )
+    text = resp.choices[0].message.content.strip()
+    if cache is not None:
+        usage = resp.get("usage") or {}
+        cache.put(key, text, usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0), time.perf_counter() - t0)
+    return text
+
+
+@traced("llm_chat")
+def chat_stream(messages: List[Dict], max_tokens: int = 800, temperature: float = 0.2, model: str = LLM_MODEL) -> Iterator[str]:
+    # chat() that yields the reply as it is generated; shares chat()'s cache
+    cache = get_completion_cache()
+    key = completion_key(model, messages, max_tokens=max_tokens, temperature=temperature)
+    if cache is not None:
+        hit = cache.get(key)
+        if hit is not None:
+            yield hit
+            return
+    import openai
+    openai.api_key = OPENAI_KEY
+    _limiter.acquire()
+    t0 = time.perf_counter()
+    parts = []
+    for chunk in openai.ChatCompletion.create(
+        model=model,
+        messages=messages,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        stream=True,
+    ):
+        delta = chunk.choices[0].get("delta", {}).get("content")
+        if delta:
+            if not parts:
+                delta = delta.lstrip()
+            parts.append(delta)
+            yield delta
+    text = "".join(parts).strip()
+    if cache is not None and text:
+        # streamed responses carry no usage block; estimate it
+        prompt_tokens = sum(estimate_tokens(m["content"]) for m in messages)
+        cache.put(key, text, prompt_tokens, estimate_tokens(text), time.perf_counter() - t0)
+
+
+def cache_stats() -> Dict:
+    # hit rate plus tokens / seconds the completion cache saved this process
+    cache = get_completion_cache()
+    return cache.report() if cache is not None else {}
+
+
+def _map(chunk: str, label: str) -> str:
+    return chat(
+        [{"role": "system", "content": MAP_PROMPT},
+         {"role": "user", "content": f"{label}\n\n{chunk}"}],
+        max_tokens=400,
+    )
+
+
+def _final_messages(partials: List[str], prompt_extra: str) -> List[Dict]:
+    joined = "\n\n---\n\n".join(partials)
+    user = f"{prompt_extra}\n\nPartial timelines:\n{joined}\n\n{FINAL_INSTRUCTIONS}"
+    return [{"role": "system", "content": SYSTEM_PROMPT}, {"role": "user", "content": user}]
+
+
+def _reduce(partials: List[str]) -> str:
+    joined = "\n\n---\n\n".join(partials)
+    user = f"Partial timelines:\n{joined}\n\nReturn one merged timeline in the same line format, plus merged 'Claims:'."
+    return chat([{"role": "system", "content": REDUCE_PROMPT}, {"role": "user", "content": user}], max_tokens=800)
+
+
+def _map_and_collapse(texts: List[str]) -> List[str]:
+    # everything but the final call: map, then intermediate reduces until
+    # the partial timelines fit in one prompt
+    # labels don't number the articles: a map call (and its cache entry)
+    # depends only on its own text, so a refresh that adds or reorders
+    # articles only maps the new ones
+    jobs = []
+    for text in texts:
+        chunks = chunk_text(text)
+        for j, chunk in enumerate(chunks):
+            label = "Article" + (f", part {j + 1}/{len(chunks)}" if len(chunks) > 1 else "")
+            jobs.append((chunk, label))
+    if not jobs:
+        return []
+    with ThreadPoolExecutor(max_workers=max(1, min(LLM_CONCURRENCY, len(jobs)))) as pool:
+        # copied contexts keep the calls inside the caller's trace
+        futures = [pool.submit(contextvars.copy_context().run, _map, *job) for job in jobs]
+        partials = [f.result() for f in futures]
+
+    while True:
+        groups, current, current_tokens = [], [], 0
+        for p in partials:
+            n = estimate_tokens(p)
+            if current and current_tokens + n > LLM_REDUCE_TOKENS:
+                groups.append(current)
+                current, current_tokens = [], 0
+            current.append(p)
+            current_tokens += n
+        if current:
+            groups.append(current)
+        if len(groups) == 1:
+            return groups[0]
+        with ThreadPoolExecutor(max_workers=max(1, min(LLM_CONCURRENCY, len(groups)))) as pool:
+            futures = [pool.submit(contextvars.copy_context().run, _reduce, g) for g in groups]
+            partials = [f.result() for f in futures]
+
+
+def map_reduce_summarize(texts: List[str], prompt_extra: str = "") -> str:
+    """
+    Summarize articles too large for one prompt.
+
+    map: every article is cut into token-bounded chunks and each chunk is
+    turned into a partial timeline; these calls run concurrently under the
+    module rate limiter.
+    reduce: partial timelines are merged, in groups when they are too large
+    for one call, until a single final summary remains.
+    """
+    partials = _map_and_collapse(texts)
+    if not partials:
+        return ""
+    return chat(_final_messages(partials, prompt_extra), max_tokens=800)
+
+
+def map_reduce_summarize_stream(texts: List[str], prompt_extra: str = "") -> Iterator[str]:
+    # map_reduce_summarize with the final merge streamed
+    partials = _map_and_collapse(texts)
+    if partials:
+        yield from chat_stream(_final_messages(partials, prompt_extra), max_tokens=800)
@@ -0,0 +1,120 @@
+# utils/models.py
+# Articles and milestones as slotted records instead of free-form dicts.
+# Result caches and the prefetcher keep many of them alive at once, so the
+# per-object overhead matters: no __dict__, the provider payload kept as
+# compact JSON bytes until someone asks for it, entities as tuples, and a
+# milestone points at its article instead of copying the text.
+import json
+import sys
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+ENTITY_LABELS = ("PERSON", "ORG", "GPE", "DATE", "EVENT", "MISC")
+
+# ((label, (entity, ...)), ...) with empty labels left out
+Entities = Tuple[Tuple[str, Tuple[str, ...]], ...]
+
+
+def _intern(s: Optional[str]) -> Optional[str]:
+    # outlet names repeat across thousands of articles; keep one copy
+    return sys.intern(s) if s else s
+
+
+def pack_entities(entities: Dict[str, List[str]]) -> Entities:
+    return tuple((label, tuple(values)) for label, values in entities.items() if values)
+
+
+@dataclass(slots=True, eq=False)
+class Article:
+    """
+    One news article. `entities` and `dates_found` are None until the NLP
+    stage has run. `raw` (the provider's payload) is stored as JSON bytes and
+    decoded on access. to_dict() gives the JSON shape the API returns.
+    """
+
+    title: str = ""
+    url: str = ""
+    source: Optional[str] = None
+    published_at: Optional[str] = None
+    content: str = ""
+    entity_pairs: Optional[Entities] = None
+    dates_found: Optional[Tuple[str, ...]] = None
+    duplicates: Tuple[str, ...] = ()  # URLs of syndicated copies that were dropped
+    raw_json: Optional[bytes] = None
+
+    def __post_init__(self):
+        self.source = _intern(self.source)
+
+    @classmethod
+    def from_payload(cls, payload: Dict, **fields) -> "Article":
+        return cls(raw_json=json.dumps(payload, separators=(",", ":")).encode(), **fields)
+
+    @property
+    def raw(self) -> Optional[Dict]:
+        return json.loads(self.raw_json) if self.raw_json else None
+
+    @property
+    def entities(self) -> Optional[Dict[str, List[str]]]:
+        # a fresh dict per call; assign entity_pairs (or set_entities) to change them
+        if self.entity_pairs is None:
+            return None
+        out = {label: [] for label in ENTITY_LABELS}
+        for label, values in self.entity_pairs:
+            out[label] = list(values)
+        return out
+
+    def set_entities(self, entities: Dict[str, List[str]]):
+        self.entity_pairs = pack_entities(entities)
+
+    def add_duplicate(self, url: str):
+        self.duplicates += (url,)
+
+    def to_dict(self, raw: bool = False) -> Dict:
+        out = {
+            "title": self.title,
+            "publishedAt": self.published_at,
+            "url": self.url,
+            "source": self.source,
+            "content": self.content,
+            "entities": self.entities,
+            "dates_found": list(self.dates_found) if self.dates_found is not None else None,
+            "duplicates": list(self.duplicates),
+        }
+        if raw:
+            out["raw"] = self.raw
+        return out
+
+
+@dataclass(slots=True, eq=False)
+class Milestone:
+    # a dated timeline entry; headline and description are read from the
+    # article when needed. `corroborations` are the other outlets that
+    # reported it (their copies were merged into this milestone). Event
+    # milestones (utils/events.py) carry the `sentence` that dates them.
+    date: Optional[str]
+    article: Article
+    corroborations: Tuple[str, ...] = ()
+    sentence: Optional[str] = None
+
+    @property
+    def headline(self) -> str:
+        return (self.article.title or "")[:120]
+
+    @property
+    def description(self) -> str:
+        if self.sentence:
+            return self.sentence
+        text = self.article.content
+        return (text[:400] + "...") if text else ""
+
+    @property
+    def url(self) -> str:
+        return self.article.url
+
+    @property
+    def source(self) -> Optional[str]:
+        return self.article.source
+
+    def to_dict(self) -> Dict:
+        return {"date": self.date, "headline": self.headline, "description": self.description,
+                "url": self.url, "source": self.source, "corroborated_by": list(self.corroborations)}
@@ -1,28 +1,45 @@
 # utils/nlp.py
+# spaCy and openai are heavy to import, so both are loaded on first use
 import os
-import spacy
-from dateutil import parser as du_parser
-import dateparser
-import openai
-from typing import List, Dict
-import re
+import threading
+from typing import List, Dict, Iterator
+
+from utils import llm
+from utils.dates import recognize_dates
+from utils.tracing import traced
 
 OPENAI_KEY = os.getenv("OPENAI_API_KEY")
-if OPENAI_KEY:
-    openai.api_key = OPENAI_KEY
 
-# load spaCy small english
-try:
-    nlp = spacy.load("en_core_web_sm")
-except Exception:
-    # instruct user to download model in README
-    nlp = None
+# NER only needs the tokenizer and the ner component (which has its own
+# tok2vec in en_core_web_sm), so the rest of the pipeline is never loaded
+NER_UNUSED_PIPES = ["tok2vec", "tagger", "parser", "attribute_ruler", "lemmatizer", "senter"]
+NER_BATCH_SIZE = int(os.getenv("NER_BATCH_SIZE", "16"))
+NER_PROCESSES = int(os.getenv("NER_PROCESSES", "1"))
 
-def extract_entities(text: str) -> Dict:
-    ents = {"PERSON":[], "ORG":[], "GPE":[], "DATE":[], "EVENT":[], "MISC":[]}
-    if not nlp or not text:
-        return ents
-    doc = nlp(text[:50000])
+_nlp = None
+_nlp_loaded = False
+_nlp_lock = threading.Lock()
+
+def get_nlp():
+    # process-wide spaCy small english, loaded on first use (None if missing)
+    global _nlp, _nlp_loaded
+    if not _nlp_loaded:
+        with _nlp_lock:
+            if not _nlp_loaded:
+                try:
+                    import spacy
+                    _nlp = spacy.load("en_core_web_sm", exclude=NER_UNUSED_PIPES)
+                except Exception:
+                    # instruct user to download model in README
+                    _nlp = None
+                _nlp_loaded = True
+    return _nlp
+
+def _empty_entities() -> Dict:
+    return {"PERSON":[], "ORG":[], "GPE":[], "DATE":[], "EVENT":[], "MISC":[]}
+
+def _collect_entities(doc) -> Dict:
+    ents = _empty_entities()
     for e in doc.ents:
         if e.label_ in ents:
             ents[e.label_].append(e.text)
@@ -33,52 +50,78 @@ def extract_entities(text: str) -> Dict:
         ents[k] = list(dict.fromkeys(ents[k]))[:20]
     return ents
 
+@traced("extract_entities")
+def extract_entities(text: str) -> Dict:
+    if not text:
+        return _empty_entities()
+    nlp = get_nlp()
+    if not nlp:
+        return _empty_entities()
+    return _collect_entities(nlp(text[:50000]))
+
+@traced("extract_entities_batch", detail=lambda texts, *a, **k: f"{len(texts)} texts")
+def extract_entities_batch(texts: List[str], batch_size: int = NER_BATCH_SIZE, n_process: int = NER_PROCESSES) -> List[Dict]:
+    # same output as extract_entities for each text, but all documents go
+    # through nlp.pipe together (optionally over several processes)
+    results = [_empty_entities() for _ in texts]
+    nlp = get_nlp()
+    if not nlp:
+        return results
+    todo = [i for i, t in enumerate(texts) if t]
+    docs = nlp.pipe((texts[i][:50000] for i in todo), batch_size=batch_size, n_process=n_process)
+    for i, doc in zip(todo, docs):
+        results[i] = _collect_entities(doc)
+    return results
+
+@traced("find_dates")
 def find_dates(text: str) -> List[str]:
-    # look for date-like substrings; use dateparser to normalize
-    res = set()
-    # quick regex for YYYY or Month words
-    patterns = [
-        r"\b(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Sept|Oct|Nov|Dec)[a-z]*\s+\d{1,2},?\s*\d{0,4}",
-        r"\b\d{4}-\d{2}-\d{2}\b",
-        r"\b\d{1,2}\s+(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{4}\b",
-        r"\b\d{1,2}/\d{1,2}/\d{2,4}\b",
-        r"\b\d{4}\b"
+    # look for date-like substrings and normalize them to ISO dates; the common
+    # forms are converted directly, dateparser only sees the ambiguous ones
+    return recognize_dates(text)
+
+NO_OPENAI_KEY = "OpenAI API key not provided; cannot run LLM summarization. Set OPENAI_API_KEY in environment."
+
+def _single_pass_messages(texts: List[str], prompt_extra: str) -> List[Dict]:
+    # None when the articles are too large for one prompt
+    combined = "\n\n---\n\n".join(texts)
+    if llm.estimate_tokens(combined) > llm.LLM_SINGLE_PASS_TOKENS:
+        return None
+    user_prompt = f"{prompt_extra}\n\nArticles:\n{combined}\n\n{llm.FINAL_INSTRUCTIONS}"
+    return [
+        {"role":"system","content":llm.SYSTEM_PROMPT},
+        {"role":"user","content":user_prompt}
     ]
-    for pat in patterns:
-        for m in re.findall(pat, text, flags=re.IGNORECASE):
-            parsed = dateparser.parse(m)
-            if parsed:
-                res.add(parsed.date().isoformat())
-    # fallback: try sentence-level parse
-    for sent in text.split("."):
-        dt = dateparser.parse(sent)
-        if dt:
-            res.add(dt.date().isoformat())
-    return sorted(res)
 
+@traced("openai_summarize")
 def openai_summarize(texts: List[str], prompt_extra: str="") -> str:
     if not OPENAI_KEY:
-        return "OpenAI API key not provided; cannot run LLM summarization. Set OPENAI_API_KEY in environment."
-    combined = "\n\n---\n\n".join([t[:4000] for t in texts])
-    system_prompt = (
-        "You are an assistant that reads multiple news articles and writes a concise timeline of events, "
-        "listing chronological milestones with short descriptions (date → event). Also produce a short summary and note any conflicting claims among the sources."
-    )
-    user_prompt = f"{prompt_extra}\n\nArticles:\n{combined}\n\nProduce: (1) timeline bullets with ISO dates, (2) 2-paragraph summary, (3) 'Conflicts:' short notes"
+        return NO_OPENAI_KEY
     try:
-        resp = openai.ChatCompletion.create(
-            model="gpt-4o-mini", # use available model or gpt-4 if user prefers
-            messages=[
-                {"role":"system","content":system_prompt},
-                {"role":"user","content":user_prompt}
-            ],
-            temperature=0.2,
-            max_tokens=800
-        )
-        return resp.choices[0].message.content.strip()
+        # small article sets go in one prompt; larger ones are summarized
+        # per chunk concurrently and the partial timelines merged
+        messages = _single_pass_messages(texts, prompt_extra)
+        if messages is None:
+            return llm.map_reduce_summarize(texts, prompt_extra)
+        return llm.chat(messages, temperature=0.2, max_tokens=800)
     except Exception as e:
         return f"LLM summarization failed: {e}"
 
+@traced("openai_summarize")
+def openai_summarize_stream(texts: List[str], prompt_extra: str="") -> Iterator[str]:
+    # openai_summarize, yielded piece by piece as the model writes it
+    if not OPENAI_KEY:
+        yield NO_OPENAI_KEY
+        return
+    try:
+        messages = _single_pass_messages(texts, prompt_extra)
+        if messages is None:
+            yield from llm.map_reduce_summarize_stream(texts, prompt_extra)
+        else:
+            yield from llm.chat_stream(messages, temperature=0.2, max_tokens=800)
+    except Exception as e:
+        yield f"\n\nLLM summarization failed: {e}"
+
+@traced("lightweight_summary")
 def lightweight_summary(texts: List[str]) -> str:
     # simple heuristics fallback: join first sentences
     bullets = []
@@ -0,0 +1,103 @@
+# utils/nlp_pool.py
+# The CPU-bound NLP stage (date recognition + NER) in a pool of worker
+# processes: every core is used and one big query no longer holds the GIL
+# that every other Streamlit session / API request in the process needs.
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional, Tuple
+
+from utils.dates import recognize_dates
+from utils.models import Article, Entities, pack_entities
+from utils.nlp import NER_PROCESSES, extract_entities_batch, get_nlp
+from utils.tracing import traced
+
+NLP_WORKERS = int(os.getenv("NLP_WORKERS", str(min(4, os.cpu_count() or 1))))  # 0: run in-process
+NLP_MIN_CHUNK = int(os.getenv("NLP_MIN_CHUNK", "2"))  # articles per task, at least
+
+# (text for dates, text for NER); "" skips that half
+Job = Tuple[str, str]
+# (dates, entities) in Article's own compact form
+Result = Tuple[Tuple[str, ...], Entities]
+
+
+def _init_worker():
+    # once per process, before any task: spaCy model, dateparser and its
+    # locale data (both take seconds on first use)
+    import dateparser
+    get_nlp()
+    dateparser.parse("no date in this sentence")  # a miss checks, and so loads, every locale
+    recognize_dates("On Aug 23 the lander touched down, a day after launch on 22/07/2023.")
+
+
+def _analyze_chunk(jobs: List[Job], n_process: int = 1) -> List[Result]:
+    entities = extract_entities_batch([ner for _, ner in jobs], n_process=n_process)
+    out = []
+    for (text, _), ents in zip(jobs, entities):
+        out.append((tuple(recognize_dates(text)) if text else (), pack_entities(ents)))
+    return out
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> Optional[ProcessPoolExecutor]:
+    # process-wide pool, or None when disabled. spawn, not fork: the parent
+    # runs threads (Streamlit, uvicorn, extraction pools)
+    global _pool
+    if _pool is None and NLP_WORKERS > 0:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(max_workers=NLP_WORKERS, mp_context=multiprocessing.get_context("spawn"),
+                                            initializer=_init_worker)
+                for _ in range(NLP_WORKERS):
+                    _pool.submit(int)  # workers start on demand; start them all now, not mid-query
+    return _pool
+
+
+def _reset_pool():
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _run(jobs: List[Job]) -> List[Result]:
+    if not jobs:
+        return []
+    pool = get_pool()
+    if pool is None:
+        return _analyze_chunk(jobs, NER_PROCESSES)
+    # about two tasks per worker, so an unusually long article doesn't leave
+    # the other workers idle at the end
+    size = max(NLP_MIN_CHUNK, math.ceil(len(jobs) / (2 * NLP_WORKERS)))
+    chunks = [jobs[i:i + size] for i in range(0, len(jobs), size)]
+    try:
+        return [r for part in pool.map(_analyze_chunk, chunks) for r in part]
+    except BrokenProcessPool:
+        _reset_pool()  # a worker died (OOM, killed); start over next time
+        return _analyze_chunk(jobs, NER_PROCESSES)
+
+
+@traced("analyze_articles", detail=lambda articles: f"{len(articles)} articles")
+def analyze_articles(articles: List[Article]):
+    """
+    Fill in dates_found and entities on the articles missing them, split
+    across the worker processes. Same results as nlp.find_dates on
+    content + title and nlp.extract_entities on content (or title).
+    """
+    todo = [a for a in articles if a.dates_found is None or a.entity_pairs is None]
+    jobs = [(
+        (a.content + " " + a.title) if a.dates_found is None else "",
+        (a.content or a.title) if a.entity_pairs is None else "",
+    ) for a in todo]
+    for a, (dates, entities) in zip(todo, _run(jobs)):
+        if a.dates_found is None:
+            a.dates_found = dates
+        if a.entity_pairs is None:
+            a.entity_pairs = entities
@@ -0,0 +1,210 @@
+# utils/orchestrator.py
+# The fetch -> NLP -> timeline -> summary pipeline, shared by the Streamlit
+# app (app.py) and the HTTP API (api.py).
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterator, List, Tuple
+
+from utils.cache import ResultCache, normalize_query
+from utils.dedupe import canonical_url
+from utils.fetcher import iter_articles
+from utils.models import Article
+from utils.nlp import find_dates, openai_summarize, openai_summarize_stream, lightweight_summary
+from utils.nlp_pool import analyze_articles
+from utils.scheduler import PrefetchScheduler
+from utils.store import STORE_MAX_AGE, get_article_store
+from utils.topics import get_topic_timeline
+from utils.tracing import span
+
+MAX_ARTICLES_LIMIT = int(os.getenv("MAX_ARTICLES_LIMIT", "500"))  # largest max_articles the UI / API accept
+
+
+def _article_dates(a: Article) -> tuple:
+    return tuple(find_dates(a.content + " " + a.title))
+
+
+def iter_sources(query: str, max_articles: int = 8, refresh: bool = False) -> Iterator[Tuple[int, Article]]:
+    # (position, article): recent matches from the local article store first
+    # (stored within STORE_MAX_AGE), live fetching tops up the rest. Older
+    # matches only fill in when live sources come up short or are offline.
+    # refresh=True skips the store lookup.
+    store = get_article_store() if not refresh else None
+    stored = []
+    if store is not None:
+        with span("store_search"):
+            stored = store.search(query, max_articles, max_age=STORE_MAX_AGE)
+    for i, a in enumerate(stored):
+        yield i, a
+    if len(stored) >= max_articles:
+        return
+    seen = {canonical_url(a.url) for a in stored}
+    try:
+        for pos, a in iter_articles(query, max_articles, known=stored):
+            seen.add(canonical_url(a.url))
+            yield len(stored) + pos, a
+    except Exception:
+        pass  # offline: answer with what the store has
+    if store is None or len(seen) >= max_articles:
+        return
+    with span("store_search"):
+        older = store.search(query, max_articles)
+    for a in older:
+        if len(seen) >= max_articles:
+            break
+        if canonical_url(a.url) not in seen:
+            seen.add(canonical_url(a.url))
+            yield max_articles + len(seen), a
+
+
+def _annotate(articles: List[Article]):
+    # dates and entities (in the NLP worker processes) for articles that
+    # don't have them yet, then keep everything in the local store; stored
+    # articles come back annotated
+    todo = [a for a in articles if a.entity_pairs is None]
+    analyze_articles(articles)
+    store = get_article_store()
+    if store is not None and todo:
+        try:
+            store.put_many(todo)
+        except sqlite3.Error:
+            pass
+
+
+def run_pipeline(query: str, max_articles: int = 8, use_openai: bool = True, refresh: bool = False) -> Dict:
+    """
+    Fetch, annotate, date and summarize `max_articles` for the query.
+    "articles" are this run's; "milestones" is the topic's whole timeline,
+    which the run's articles are merged into (utils/topics.py): only
+    articles it hasn't seen, or that changed, go through NLP.
+    """
+    articles = [a for _, a in sorted(iter_sources(query, max_articles, refresh), key=lambda p: p[0])]
+    timeline = get_topic_timeline(query)
+    _annotate(timeline.unseen(articles))
+    articles = timeline.merge(articles)
+    milestones = timeline.milestones()
+    texts = [a.content or a.title for a in articles]
+    summary_text = openai_summarize(texts) if use_openai else lightweight_summary(texts)
+    return {"articles": articles, "milestones": milestones, "summary": summary_text}
+
+
+def iter_pipeline(query: str, max_articles: int = 8, use_openai: bool = True, refresh: bool = False) -> Iterator[Tuple[str, object]]:
+    """
+    run_pipeline as a stream of events, so a UI can show results as they arrive:
+      ("article", article)        each article once its text is extracted
+      ("milestones", milestones)  the milestone an article added to or changed on the
+                                  topic's timeline (not the whole timeline: "done" has it)
+      ("summary", text)           summary pieces as the LLM writes them
+      ("done", result)            the same dict run_pipeline returns
+    """
+    timeline = get_topic_timeline(query)
+    arrived = {}  # the timeline's article -> position
+    shown = None  # timeline version last yielded: known articles don't change it
+    for pos, a in iter_sources(query, max_articles, refresh):
+        if a.dates_found is None and timeline.unseen([a]):
+            a.dates_found = _article_dates(a)
+        a = timeline.merge([a])[0]
+        if a in arrived:
+            continue  # a copy of a story already shown
+        arrived[a] = pos
+        yield "article", a
+        if timeline.version != shown:
+            shown = timeline.version
+            m = timeline.milestone(a.url)
+            if m is not None:
+                yield "milestones", [m]
+    articles = sorted(arrived, key=arrived.get)
+    # NER is batched once every article is in, for the ones the timeline
+    # didn't have; the timeline doesn't need it
+    _annotate(articles)
+    milestones = timeline.milestones()
+    texts = [a.content or a.title for a in articles]
+    parts = []
+    for piece in (openai_summarize_stream(texts) if use_openai else [lightweight_summary(texts)]):
+        parts.append(piece)
+        yield "summary", piece
+    yield "done", {"articles": articles, "milestones": milestones, "summary": "".join(parts).strip()}
+
+
+def pipeline_key(query: str, max_articles: int, use_openai: bool) -> Tuple:
+    return (normalize_query(query), int(max_articles), bool(use_openai))
+
+
+_result_cache = None
+_result_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> ResultCache:
+    # one cache per server process, shared by every session / request
+    global _result_cache
+    if _result_cache is None:
+        with _result_cache_lock:
+            if _result_cache is None:
+                _result_cache = ResultCache()
+    return _result_cache
+
+
+def _prefetch(key: Tuple) -> bool:
+    # scheduler job: recompute a popular query from live sources, warm the cache
+    query, max_articles, use_openai = key
+    result = run_pipeline(query, max_articles, use_openai, refresh=True)
+    if result["articles"]:
+        get_result_cache().put(key, result)
+    return bool(result["articles"])
+
+
+_prefetcher = None
+_prefetcher_lock = threading.Lock()
+
+
+def get_prefetcher() -> PrefetchScheduler:
+    # started by the first recorded query; one per server process
+    global _prefetcher
+    if _prefetcher is None:
+        with _prefetcher_lock:
+            if _prefetcher is None:
+                _prefetcher = PrefetchScheduler(_prefetch)
+    return _prefetcher
+
+
+def note_query(query: str, max_articles: int, use_openai: bool):
+    # count a user request towards the popular topics the prefetcher keeps warm
+    get_prefetcher().record(pipeline_key(query, max_articles, use_openai))
+
+
+def cached_pipeline(query: str, max_articles: int = 8, use_openai: bool = True, refresh: bool = False,
+                    record: bool = True) -> Tuple[Dict, bool]:
+    """
+    run_pipeline behind the process-wide result cache.
+    Returns (result, served_from_cache). refresh=True recomputes from live
+    sources and overwrites the cached entry. Empty results are not cached.
+    record=False leaves the request out of the prefetcher's popularity count.
+    """
+    if record:
+        note_query(query, max_articles, use_openai)
+    cache = get_result_cache()
+    key = pipeline_key(query, max_articles, use_openai)
+    if not refresh:
+        hit = cache.get(key)
+        if hit is not None:
+            return hit, True
+    result = run_pipeline(query, int(max_articles), bool(use_openai), refresh)
+    if result["articles"]:
+        cache.put(key, result)
+    return result, False
+
+
+def iter_cached_pipeline(query: str, max_articles: int = 8, use_openai: bool = True, refresh: bool = False) -> Iterator[Tuple[str, object]]:
+    # iter_pipeline behind the result cache; a hit is a single ("cached", result)
+    note_query(query, max_articles, use_openai)
+    cache = get_result_cache()
+    key = pipeline_key(query, max_articles, use_openai)
+    if not refresh:
+        hit = cache.get(key)
+        if hit is not None:
+            yield "cached", hit
+            return
+    for kind, payload in iter_pipeline(query, int(max_articles), bool(use_openai), refresh):
+        if kind == "done" and payload["articles"]:
+            cache.put(key, payload)
+        yield kind, payload
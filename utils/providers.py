@@ -0,0 +1,209 @@
+# utils/providers.py
+# News search providers queried side by side. Every registered source is
+# asked at once and answers are merged as they arrive, so a query waits for
+# the fastest providers that together have enough articles, not for the sum
+# of all of them. A provider that is slower than usual gets a second
+# (hedged) request and whichever answers first is used. Providers that can
+# page are paged, one page ahead of the consumer at most.
+import contextvars
+import functools
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from utils import http_client
+from utils.models import Article
+from utils.tracing import traced
+
+PROVIDER_DEADLINE = float(os.getenv("PROVIDER_DEADLINE", "15"))  # seconds without an answer; then give up
+PROVIDER_PAGE_SIZE = int(os.getenv("PROVIDER_PAGE_SIZE", "100"))  # articles per page from paged providers
+HEDGE_REQUESTS = os.getenv("HEDGE_REQUESTS", "1") != "0"
+HEDGE_QUANTILE = float(os.getenv("HEDGE_QUANTILE", "0.9"))  # hedge once slower than this share of recent calls
+HEDGE_DEFAULT = float(os.getenv("HEDGE_DEFAULT", "2.0"))  # hedge delay until a provider has some history
+HEDGE_MIN = float(os.getenv("HEDGE_MIN", "0.2"))  # never hedge sooner than this
+HEDGE_MIN_SAMPLES = 5
+
+# fetch(query, page_size) -> articles, or fetch(query, page_size, page) for
+# paged providers (page counts from 1)
+Fetch = Callable[..., List[Article]]
+
+
+class Provider:
+    """
+    A named news source. Keeps the latencies of its recent successful calls;
+    a request still running after their HEDGE_QUANTILE is hedged. `host`
+    (if given) is checked against http_client.cooldown so a provider that
+    asked us to back off isn't sent a second request. A `paged` provider
+    takes a page number and is asked for the next page while its last one
+    came back full.
+    """
+
+    def __init__(self, name: str, fetch: Fetch, host: Optional[str] = None, hedge: bool = True,
+                 paged: bool = False, window: int = 50):
+        self.name = name
+        self.fetch = fetch
+        self.host = host
+        self.hedge = hedge
+        self.paged = paged
+        self._latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.failures = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    def observe(self, seconds: float):
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def count(self, attr: str):
+        with self._lock:
+            setattr(self, attr, getattr(self, attr) + 1)
+
+    def hedge_delay(self) -> float:
+        with self._lock:
+            samples = sorted(self._latencies)
+        if len(samples) < HEDGE_MIN_SAMPLES:
+            return HEDGE_DEFAULT
+        return max(HEDGE_MIN, samples[min(len(samples) - 1, int(HEDGE_QUANTILE * len(samples)))])
+
+    def may_hedge(self) -> bool:
+        return HEDGE_REQUESTS and self.hedge and not (self.host and http_client.cooldown(self.host) > 0)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"calls": self.calls, "failures": self.failures, "hedged": self.hedged,
+                    "hedge_wins": self.hedge_wins, "samples": len(self._latencies)}
+
+
+_providers: Dict[str, Provider] = {}
+_providers_lock = threading.Lock()
+
+
+def register_provider(name: str, fetch: Fetch, host: Optional[str] = None, hedge: bool = True,
+                      paged: bool = False) -> Provider:
+    # registering a name again replaces that provider
+    p = Provider(name, fetch, host, hedge, paged)
+    with _providers_lock:
+        _providers[name] = p
+    return p
+
+
+def unregister_provider(name: str):
+    with _providers_lock:
+        _providers.pop(name, None)
+
+
+def registered() -> List[Provider]:
+    with _providers_lock:
+        return list(_providers.values())
+
+
+def provider_stats() -> Dict[str, Dict]:
+    out = {}
+    for p in registered():
+        out[p.name] = dict(p.stats(), hedge_delay=round(p.hedge_delay(), 3))
+    return out
+
+
+def _observe(p: Provider, started: float, fut):
+    if not fut.cancelled() and fut.exception() is None:
+        p.observe(time.monotonic() - started)
+
+
+@traced("fan_out", detail=lambda query, *args, **kwargs: query)
+def iter_fan_out(query: str, limit: int = 8, deadline: float = PROVIDER_DEADLINE,
+                 providers: Iterable[Provider] = None) -> Iterator[Tuple[str, List[Article]]]:
+    """
+    Ask every provider at once for up to `limit` articles and yield
+    (name, articles) batches as pages arrive, fastest first. Paged providers
+    get their next page requested as soon as a full page arrives, so at most
+    one page per provider is in flight while the consumer works on the last.
+    A request still running after its provider's hedge delay is sent once
+    more; the first of the two to succeed counts. Providers that fail
+    (exception) are skipped. Iteration ends when every provider is done or
+    none has answered for `deadline` seconds; closing the generator early
+    (enough articles already) abandons the rest without waiting.
+    """
+    chosen = list(providers) if providers is not None else registered()
+    if not chosen or limit <= 0:
+        return
+    stop_at = time.monotonic() + deadline
+    pool = ThreadPoolExecutor(max_workers=3 * len(chosen), thread_name_prefix="provider")
+    attempts = {}  # future -> (provider, page, is the hedge)
+    hedge_at = {}  # name -> (when, provider, page), until hedged or answered
+    pages = {}  # name -> the page being waited for
+    got = {}  # name -> articles yielded so far
+    waiting = set()
+
+    def page_size(p: Provider) -> int:
+        return min(limit, PROVIDER_PAGE_SIZE) if p.paged else limit
+
+    def launch(p: Provider, page: int, hedge: bool):
+        # the copied context puts the provider's spans on the caller's trace
+        args = (query, page_size(p), page) if p.paged else (query, page_size(p))
+        fut = pool.submit(contextvars.copy_context().run, p.fetch, *args)
+        attempts[fut] = (p, page, hedge)
+        # timed when it finishes, even if nobody is waiting any more: the
+        # slow answers are the ones the hedge delay must know about
+        fut.add_done_callback(functools.partial(_observe, p, time.monotonic()))
+
+    def request(p: Provider, page: int):
+        nonlocal stop_at
+        p.count("calls")
+        waiting.add(p.name)
+        pages[p.name] = page
+        launch(p, page, False)
+        now = time.monotonic()
+        stop_at = now + deadline
+        if p.may_hedge():
+            hedge_at[p.name] = (now + p.hedge_delay(), p, page)
+
+    for p in chosen:
+        got[p.name] = 0
+        request(p, 1)
+    try:
+        while waiting:
+            now = time.monotonic()
+            if now >= stop_at:
+                break
+            wake = min([when for when, _, _ in hedge_at.values()] + [stop_at])
+            done, _ = wait(list(attempts), timeout=max(0.0, wake - now), return_when=FIRST_COMPLETED)
+            for fut in done:
+                p, page, hedge = attempts.pop(fut)
+                if p.name not in waiting or pages[p.name] != page:
+                    continue  # the other attempt already answered
+                try:
+                    articles = fut.result()
+                except Exception:
+                    if not any(q is p and n == page for q, n, _ in attempts.values()):
+                        waiting.discard(p.name)
+                        hedge_at.pop(p.name, None)
+                        p.count("failures")
+                    continue
+                if hedge:
+                    p.count("hedge_wins")
+                waiting.discard(p.name)
+                hedge_at.pop(p.name, None)
+                articles = articles[:limit - got[p.name]]
+                got[p.name] += len(articles)
+                if p.paged and len(articles) == page_size(p) and got[p.name] < limit:
+                    request(p, page + 1)  # fetched while the consumer handles this one
+                if articles:
+                    yield p.name, articles
+                    # time the consumer kept us suspended doesn't count against the providers
+                    stop_at = max(stop_at, time.monotonic() + deadline)
+            now = time.monotonic()
+            for name, (when, p, page) in list(hedge_at.items()):
+                if when > now or any(f.done() and q is p for f, (q, _, _) in attempts.items()):
+                    continue  # not due, or answered while the consumer had us suspended
+                del hedge_at[name]
+                if p.may_hedge():
+                    p.count("hedged")
+                    launch(p, page, True)
+    finally:
+        # don't block on stragglers
+        pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,154 @@
+# utils/scheduler.py
+# Background refresh of popular queries, so the result cache already holds
+# an answer when users ask about a trending event again.
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Hashable, List, Optional
+
+import utils.fetcher  # noqa: F401  (registers the news providers)
+from utils import http_client
+from utils.llm import RateLimiter
+from utils.providers import registered
+
+PREFETCH_TOPICS = int(os.getenv("PREFETCH_TOPICS", "5"))  # most popular queries kept warm; 0 disables
+PREFETCH_INTERVAL = float(os.getenv("PREFETCH_INTERVAL", "600"))  # keep below RESULT_CACHE_TTL
+PREFETCH_JITTER = float(os.getenv("PREFETCH_JITTER", "0.2"))  # +-20% on every interval
+PREFETCH_CONCURRENCY = int(os.getenv("PREFETCH_CONCURRENCY", "2"))
+PREFETCH_RPM = float(os.getenv("PREFETCH_RPM", "6"))  # refresh runs per minute
+PREFETCH_MIN_HITS = float(os.getenv("PREFETCH_MIN_HITS", "2"))  # decayed request count to qualify
+PREFETCH_HALF_LIFE = float(os.getenv("PREFETCH_HALF_LIFE", "3600"))  # popularity half-life, seconds
+PROVIDER_HOSTS = tuple(p.host for p in registered() if p.host)
+
+
+class PrefetchScheduler:
+    """
+    Tracks how often each query key is requested and periodically calls
+    `job(key)` for the most popular ones.
+
+    Popularity is a request count that halves every `half_life` seconds. A
+    topic is refreshed `interval` seconds (+- `jitter`) after its last run;
+    failed runs back off exponentially. At most `concurrency` jobs run at
+    once, runs are spaced by a token bucket of `per_minute`, and nothing
+    starts while a news provider has asked us to back off (429).
+    """
+
+    def __init__(self, job: Callable[[Hashable], bool], topics: int = PREFETCH_TOPICS,
+                 interval: float = PREFETCH_INTERVAL, jitter: float = PREFETCH_JITTER,
+                 concurrency: int = PREFETCH_CONCURRENCY, per_minute: float = PREFETCH_RPM,
+                 min_hits: float = PREFETCH_MIN_HITS, half_life: float = PREFETCH_HALF_LIFE,
+                 tick: float = 5.0, max_tracked: int = 1000):
+        self.job = job
+        self.topics = topics
+        self.interval = interval
+        self.jitter = jitter
+        self.min_hits = min_hits
+        self.half_life = half_life
+        self.tick = tick
+        self.max_tracked = max_tracked
+        self._limiter = RateLimiter(per_minute=per_minute, burst=1)
+        self._slots = threading.BoundedSemaphore(max(1, concurrency))
+        self._pool = ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="prefetch")
+        self._tracked: Dict[Hashable, Dict] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.runs = 0
+        self.failures = 0
+
+    def _score(self, entry: Dict, now: float) -> float:
+        return entry["score"] * 0.5 ** ((now - entry["seen"]) / self.half_life)
+
+    def _delay(self, failures: int = 0) -> float:
+        return self.interval * 2 ** min(failures, 5) * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def record(self, key: Hashable):
+        # one user request for `key`; its result was just computed or served
+        if self.topics <= 0:
+            return
+        now = time.time()
+        with self._lock:
+            entry = self._tracked.get(key)
+            if entry is None:
+                # first refresh one interval after the first request; after
+                # that, one interval after the last run (see _run). Later
+                # requests don't move it, or a topic asked for more often than
+                # the interval would never be refreshed.
+                entry = self._tracked[key] = {"score": 0.0, "seen": now, "due": now + self._delay(),
+                                              "failures": 0, "running": False}
+            entry["score"] = self._score(entry, now) + 1
+            entry["seen"] = now
+            if len(self._tracked) > self.max_tracked:
+                coldest = sorted(self._tracked, key=lambda k: self._score(self._tracked[k], now))
+                for k in coldest[:len(coldest) // 2]:
+                    if not self._tracked[k]["running"]:
+                        del self._tracked[k]
+        self.start()
+
+    def popular(self) -> List[Hashable]:
+        now = time.time()
+        with self._lock:
+            scored = [(self._score(e, now), k) for k, e in self._tracked.items()]
+        scored = [(s, k) for s, k in scored if s >= self.min_hits]
+        return [k for _, k in sorted(scored, key=lambda p: p[0], reverse=True)[:self.topics]]
+
+    def run_pending(self) -> int:
+        # start every due refresh the budgets allow; returns how many started
+        started = 0
+        for key in self.popular():
+            with self._lock:
+                entry = self._tracked.get(key)
+                if entry is None or entry["running"] or entry["due"] > time.time():
+                    continue
+            if any(http_client.cooldown(h) > 0 for h in PROVIDER_HOSTS):
+                break
+            if not self._slots.acquire(blocking=False):
+                break
+            self._limiter.acquire()
+            with self._lock:
+                entry["running"] = True
+            self._pool.submit(self._run, key)
+            started += 1
+        return started
+
+    def _run(self, key: Hashable):
+        try:
+            ok = bool(self.job(key))
+        except Exception:
+            ok = False
+        with self._lock:
+            self.runs += 1
+            entry = self._tracked.get(key)
+            if entry is not None:
+                entry["failures"] = 0 if ok else entry["failures"] + 1
+                entry["due"] = time.time() + self._delay(entry["failures"])
+                entry["running"] = False
+            if not ok:
+                self.failures += 1
+        self._slots.release()
+
+    def _loop(self):
+        while not self._stop.wait(self.tick):
+            try:
+                self.run_pending()
+            except Exception:
+                pass  # never let the scheduler thread die
+
+    def start(self):
+        if self._thread is None and self.topics > 0:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._loop, name="prefetch-scheduler", daemon=True)
+                    self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            tracked, running = len(self._tracked), sum(e["running"] for e in self._tracked.values())
+        return {"tracked": tracked, "popular": len(self.popular()), "running": running,
+                "runs": self.runs, "failures": self.failures}
@@ -0,0 +1,134 @@
+# utils/store.py
+# Local store of every processed article (text, entities, dates) with an
+# SQLite FTS5 index, so queries are answered locally first and work offline.
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Iterable, List, Optional
+
+from utils.dedupe import canonical_url
+from utils.models import Article
+
+# set ARTICLE_STORE_PATH="" to disable
+STORE_PATH = os.getenv("ARTICLE_STORE_PATH", os.path.join(".cache", "store.sqlite3"))
+STORE_MAX_AGE = float(os.getenv("STORE_MAX_AGE", "3600"))  # seconds a stored match stands in for a live fetch; 0: no limit
+
+_TOKEN = re.compile(r"\w+")
+
+
+def match_expression(query: str) -> str:
+    # every query word must appear; words are quoted so FTS5 syntax in user
+    # input ("AND", "-", "*", quotes) is taken literally
+    return " ".join('"' + t.replace('"', '""') + '"' for t in _TOKEN.findall(query.lower()))
+
+
+class ArticleStore:
+    """
+    SQLite table of articles keyed by canonical URL, indexed by an FTS5
+    external-content table over title and text.
+
+    search() returns the most recently stored matches. FTS5 walks its
+    doclists in rowid order, so `ORDER BY rowid DESC LIMIT n` stops after n
+    hits instead of ranking every match; on an optimized index lookups stay
+    under a millisecond at a million rows (see benchmarks/bench_store.py).
+    Articles are never rewritten: a URL is stored once.
+    """
+
+    def __init__(self, path: str = STORE_PATH):
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS articles ("
+            " id INTEGER PRIMARY KEY, url TEXT NOT NULL UNIQUE, link TEXT, title TEXT, source TEXT,"
+            " published_at TEXT, content TEXT NOT NULL, entities TEXT, dates TEXT, stored_at REAL NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5("
+            " title, content, content='articles', content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+        )
+
+    def put_many(self, articles: Iterable[Article]) -> int:
+        # stores articles that have text; returns how many were new
+        now = time.time()
+        added = 0
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                for a in articles:
+                    key, content = canonical_url(a.url), a.content
+                    if not key or not content:
+                        continue
+                    cur = self._db.execute(
+                        "INSERT OR IGNORE INTO articles"
+                        " (url, link, title, source, published_at, content, entities, dates, stored_at)"
+                        " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (key, a.url, a.title, a.source, a.published_at, content,
+                         json.dumps(a.entities or {}), json.dumps(a.dates_found or []), now),
+                    )
+                    if cur.rowcount:
+                        self._db.execute(
+                            "INSERT INTO articles_fts (rowid, title, content) VALUES (?, ?, ?)",
+                            (cur.lastrowid, a.title, content),
+                        )
+                        added += 1
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+        return added
+
+    def search(self, query: str, limit: int = 8, max_age: float = 0.0) -> List[Article]:
+        # max_age: only matches stored less than that many seconds ago (0: any);
+        # they are the most recent, so the newest `limit` matches contain them
+        expr = match_expression(query)
+        if not expr:
+            return []
+        since = time.time() - max_age if max_age > 0 else 0.0
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT link, title, source, published_at, content, entities, dates FROM articles"
+                " WHERE id IN (SELECT rowid FROM articles_fts WHERE articles_fts MATCH ? ORDER BY rowid DESC LIMIT ?)"
+                " AND stored_at >= ? ORDER BY id DESC",
+                (expr, int(limit), since),
+            ).fetchall()
+        out = []
+        for link, title, source, published_at, content, entities, dates in rows:
+            a = Article(title=title or "", url=link or "", source=source, published_at=published_at, content=content,
+                        dates_found=tuple(json.loads(dates or "[]")))
+            a.set_entities(json.loads(entities or "{}"))
+            out.append(a)
+        return out
+
+    def optimize(self):
+        # merge the FTS index into one b-tree; worth it after bulk loads,
+        # roughly halves lookup time on a fragmented index
+        with self._lock:
+            self._db.execute("INSERT INTO articles_fts (articles_fts) VALUES ('optimize')")
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_article_store() -> Optional[ArticleStore]:
+    # process-wide store, or None when disabled / not writable
+    global _store
+    if _store is None and STORE_PATH:
+        with _store_lock:
+            if _store is None:
+                try:
+                    _store = ArticleStore()
+                except (sqlite3.Error, OSError):
+                    return None
+    return _store
@@ -1,42 +1,79 @@
 # utils/timeline.py
-from typing import List, Dict
-import pandas as pd
-import plotly.express as px
-from dateutil import parser as du_parser
-import dateparser
-import numpy as np
-
-from typing import List, Dict
-import dateparser
-
-def build_milestones_from_entities(articles: List[Dict]) -> List[Dict]:
-    items = []
-
-    for a in articles:
-        # Try publishedAt first
-        raw_date = a.get("publishedAt")
-        dt = dateparser.parse(raw_date) if raw_date else None
-
-        # Fallback: use first extracted date from content/title
-        if not dt and a.get("dates_found"):
-            dt = dateparser.parse(a["dates_found"][0])
-
-        iso = dt.date().isoformat() if dt else None
-
-        title = a.get("title") or ""
-        text = a.get("content") or ""
-
-        items.append({
-            "date": iso,
-            "headline": title[:120],
-            "description": (text[:400] + "...") if text else "",
-            "url": a.get("url"),
-            "source": a.get("source")
-        })
-
-    # Sort by date (None values go to the end)
-    items_sorted = sorted(items, key=lambda x: x["date"] if x["date"] else "9999-12-31")
-    return items_sorted
+# pandas, plotly and dateparser are imported inside the functions that use
+# them so importing this module (every Streamlit rerun) stays cheap
+import os
+from typing import Dict, Iterable, List, Optional
+
+from utils.models import Article, Milestone
+from utils.tracing import traced
+
+TIMELINE_MAX_POINTS = int(os.getenv("TIMELINE_MAX_POINTS", "60"))  # above this, plot per-bucket counts
+
+# the calendar date at the start of the two formats providers send:
+# ISO-8601 (NewsAPI, recognized dates) and RFC-822 (RSS pubDate)
+_ISO_DATE = r"^\s*(\d{4}-\d{2}-\d{2})"
+_RFC822_DATE = r"^\s*(?:[A-Za-z]{3},\s*)?(\d{1,2} [A-Za-z]{3} \d{4})"
+
+BUCKETS = {"day": "D", "week": "W", "month": "M"}
+
+
+def normalize_dates(values: Iterable[Optional[str]]):
+    """
+    Date strings -> a datetime64 Series of calendar dates (NaT where there is
+    none), one vectorized parse per format for the whole column. The date is
+    the one written in the string, as dateparser's .date() gave it: no
+    timezone conversion. Only strings in neither format go to dateparser,
+    once per distinct value.
+    """
+    import pandas as pd
+    s = pd.Series(list(values), dtype="str")
+    iso = pd.to_datetime(s.str.extract(_ISO_DATE, expand=False), format="%Y-%m-%d", errors="coerce")
+    rfc = pd.to_datetime(s.str.extract(_RFC822_DATE, expand=False), format="%d %b %Y", errors="coerce")
+    out = iso.fillna(rfc)
+    rest = out.isna() & (s.str.strip().str.len() > 0)
+    if rest.any():
+        import dateparser
+        parsed = {}
+        for v in s[rest].unique():
+            dt = dateparser.parse(v)
+            parsed[v] = pd.Timestamp(dt.date()) if dt else pd.NaT
+        out[rest] = pd.to_datetime(s[rest].map(parsed))
+    return out
+
+
+def article_dates(articles: List[Article]):
+    # each article's milestone date: publishedAt, else the first date found
+    # in its content / title; a datetime64 Series, NaT where there is neither
+    import numpy as np
+
+    # publishedAt first, for the whole column at once
+    dates = normalize_dates([a.published_at for a in articles])
+
+    # Fallback: use first extracted date from content/title
+    missing = np.flatnonzero(dates.isna().to_numpy())
+    if len(missing):
+        firsts = [articles[i].dates_found[0] if articles[i].dates_found else None for i in missing]
+        dates.iloc[missing] = normalize_dates(firsts).to_numpy()
+    return dates
+
+
+def iso_dates(dates) -> List[Optional[str]]:
+    return list(dates.dt.strftime("%Y-%m-%d").to_numpy(dtype=object, na_value=None))
+
+
+@traced("build_milestones_from_entities")
+def build_milestones_from_entities(articles: List[Article]) -> List[Milestone]:
+    import numpy as np
+    if not articles:
+        return []
+    dates = article_dates(articles)
+
+    # Sort by date, stable (same-day articles keep their order), NaT last
+    order = np.argsort(dates.to_numpy(), kind="stable")
+    iso = iso_dates(dates)
+
+    # headline / description are read from the article, not copied
+    return [Milestone(iso[i], articles[i]) for i in order]
 # from datetime import datetime
 
 # def build_milestones_from_entities(articles: List[Dict]) -> List[Dict]:
@@ -65,27 +102,84 @@ def build_milestones_from_entities(articles: List[Dict]) -> List[Dict]:
 #     items_sorted = sorted(items, key=lambda x: x["date"])
 #     return items_sorted
 
-def plot_timeline(milestones: List[Dict]):
-    df = []
-    for m in milestones:
-        date = m.get("date")
-        if not date:
-            print("Skipping milestone with no date:", m["headline"])
-            continue
-        try:
-            parsed_date = pd.to_datetime(date)
-            df.append({
-                "date": parsed_date,
-                "label": m["headline"],
-                "source": m["source"]
-            })
-        except Exception as e:
-            print("Date parsing failed:", date, e)
-
-    if not df:
+
+def milestone_frame(milestones: List[Milestone]):
+    # the timeline as columns (date, label, source, url), undated rows dropped
+    import pandas as pd
+    df = pd.DataFrame({
+        "date": pd.to_datetime(pd.Series([m.date for m in milestones], dtype="str"), format="%Y-%m-%d", errors="coerce"),
+        "label": [m.headline for m in milestones],
+        "source": [m.source for m in milestones],
+        "url": [m.url for m in milestones],
+    })
+    return df.dropna(subset=["date"]).reset_index(drop=True)
+
+
+def _auto_bucket(dates) -> str:
+    # the finest bucket that keeps the plot to TIMELINE_MAX_POINTS bars
+    span = (dates.max() - dates.min()).days + 1
+    if span <= TIMELINE_MAX_POINTS:
+        return "day"
+    if span / 7 <= TIMELINE_MAX_POINTS:
+        return "week"
+    return "month"
+
+
+def bucket_milestones(milestones: List[Milestone], bucket: str = "auto"):
+    """
+    Milestones aggregated per day, week or month ("auto": the finest that
+    fits TIMELINE_MAX_POINTS): one row per non-empty bucket with its start
+    date, article count, distinct sources, and the earliest headline / url.
+    """
+    return _bucket_frame(milestone_frame(milestones), bucket)
+
+
+def _bucket_frame(df, bucket: str):
+    import pandas as pd
+    if df.empty:
+        return pd.DataFrame(columns=["start", "articles", "sources", "headline", "url"])
+    if bucket == "auto":
+        bucket = _auto_bucket(df["date"])
+    start = df["date"].dt.to_period(BUCKETS[bucket]).dt.start_time.rename("start")
+    out = df.groupby(start, sort=True).agg(
+        articles=("label", "size"),
+        sources=("source", "nunique"),
+        headline=("label", "first"),
+        url=("url", "first"),
+    )
+    return out.reset_index()
+
+
+def bucket_records(buckets) -> List[Dict]:
+    # bucket_milestones rows as plain JSON-able dicts
+    return [
+        {"start": start.date().isoformat(), "articles": int(n), "sources": int(s), "headline": h, "url": u}
+        for start, n, s, h, u in zip(buckets["start"], buckets["articles"], buckets["sources"],
+                                     buckets["headline"], buckets["url"])
+    ]
+
+
+@traced("plot_timeline")
+def plot_timeline(milestones: List[Milestone]):
+    import numpy as np
+    import plotly.express as px
+    df = milestone_frame(milestones)
+    if df.empty:
         return None
 
-    df = pd.DataFrame(df)
+    if len(df) > TIMELINE_MAX_POINTS:
+        # large events: one bar per bucket instead of thousands of labels
+        buckets = _bucket_frame(df, "auto")
+        fig = px.bar(buckets, x="start", y="articles", hover_data=["headline", "sources"])
+        fig.update_layout(
+            margin=dict(l=20, r=20, t=30, b=20),
+            height=260,
+            xaxis_title="Date",
+            yaxis_title="Articles",
+            showlegend=False
+        )
+        return fig
+
     df['y'] = np.linspace(1, 1.8, len(df))
 
     fig = px.scatter(df, x='date', y='y', text='label', hover_data=['source'])
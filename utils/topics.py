@@ -0,0 +1,272 @@
+# utils/topics.py
+# One timeline per topic, kept between queries. A refresh merges what it
+# fetched into the topic's timeline instead of rebuilding it: articles the
+# timeline already holds keep their annotations, another outlet's copy of a
+# known story corroborates that milestone, and only new or changed articles
+# are dated and inserted, each by binary search into the sorted milestones.
+# The article store keeps annotations across restarts, so rebuilding a
+# topic after one costs a merge and no NLP.
+import bisect
+import itertools
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from utils.cache import normalize_query
+from utils.dedupe import NearDuplicateIndex, canonical_url
+from utils.models import Article, Milestone
+from utils.timeline import article_dates, iso_dates
+from utils.tracing import traced
+
+TOPIC_TIMELINES = int(os.getenv("TOPIC_TIMELINES", "32"))  # topics kept; least recently used dropped
+TOPIC_TIMELINE_MAX = int(os.getenv("TOPIC_TIMELINE_MAX", "1000"))  # milestones per topic; first inserted dropped
+TOPIC_TIMELINES_MAX_MB = float(os.getenv("TOPIC_TIMELINES_MAX_MB", "128"))  # article text kept over all topics
+
+_UNDATED = "\uffff"  # sorts after every ISO date
+
+Key = Tuple[str, int]  # (date or _UNDATED, arrival number)
+
+
+def _size(a: Article) -> int:
+    # bytes of text a milestone keeps alive (about: characters, not encoded)
+    return len(a.content or "") + len(a.title or "")
+
+
+def _changed(new: Article, old: Article) -> bool:
+    # a refetch that lost its text (extraction failed) isn't a change
+    return bool(new.content) and (new.content != old.content or new.title != old.title)
+
+
+class TopicTimeline:
+    """
+    The milestones of one topic, sorted by date: undated last, same-day
+    milestones in the order they arrived (the order
+    build_milestones_from_entities gives for the same articles).
+
+    merge() sorts each incoming article into one of:
+      known        its URL is on the timeline, same title and text: the
+                   timeline's article (annotations included) stands in
+      changed      its URL is on the timeline with a new title or text: the
+                   milestone takes the new article and is re-dated / moved
+      corroborating  another outlet's copy of a milestone's story (same
+                   headline or near-duplicate text): its outlet is added to
+                   that milestone's corroborations
+      new          inserted as a milestone
+    Only changed and new articles are dated. Each is placed by binary
+    search, but the milestones are a plain sorted list, so inserting shifts
+    the ones after it: k of them on a timeline of n cost O(k log n)
+    comparisons and O(k n) moves (one memmove each, cheap next to dating
+    the article). n stays at most `limit`: past it the milestones inserted
+    longest ago are dropped, and a later copy of one counts as new.
+    """
+
+    def __init__(self, limit: int = TOPIC_TIMELINE_MAX):
+        self.limit = limit
+        self._lock = threading.Lock()
+        self._keys: List[Key] = []  # sorted
+        self._milestones: List[Milestone] = []  # in _keys order
+        self._by_url: Dict[str, Key] = {}  # canonical URL of a milestone's article -> its key
+        self._aliases: Dict[str, str] = {}  # canonical URL of a corroborating copy -> the milestone's
+        self._copies: Dict[str, List[str]] = {}  # the reverse: milestone URL -> its copies' URLs
+        self._canonical: Dict[str, str] = {}  # URL as fetched -> canonical; refreshes refetch the same URLs
+        self._index = NearDuplicateIndex()
+        self._arrivals = itertools.count()
+        self._anonymous = itertools.count()
+        self.inserted = 0
+        self.updated = 0
+        self.corroborated = 0
+        self.dropped = 0
+        self.version = 0  # bumped whenever the milestones change
+        self.size = 0  # _size of the milestones' articles
+
+    def _url(self, url: str) -> str:
+        canon = self._canonical.get(url)
+        if canon is None:
+            canon = self._canonical[url] = canonical_url(url)
+        return canon
+
+    def _key(self, a: Article) -> str:
+        return self._url(a.url) or f"#{next(self._anonymous)}"
+
+    def _at(self, key: Key) -> int:
+        return bisect.bisect_left(self._keys, key)
+
+    def _insert(self, url: str, m: Milestone):
+        key = (m.date or _UNDATED, next(self._arrivals))
+        i = bisect.bisect_right(self._keys, key)
+        self._keys.insert(i, key)
+        self._milestones.insert(i, m)
+        self._by_url[url] = key  # dicts keep insertion order: first key is the longest held
+        self.version += 1
+        self.size += _size(m.article)
+
+    def _remove(self, url: str) -> Milestone:
+        i = self._at(self._by_url.pop(url))
+        del self._keys[i]
+        self.version += 1
+        m = self._milestones.pop(i)
+        self.size -= _size(m.article)
+        return m
+
+    def _trim(self):
+        # drop the milestones inserted longest ago, with their copies, down to `limit`
+        while len(self._milestones) > self.limit:
+            url = next(iter(self._by_url))
+            self._remove(url)
+            for alias in self._copies.pop(url, ()):
+                del self._aliases[alias]
+                self._index.remove(alias)  # a copy matched by text has its own URL and headline entries
+            self._index.remove(url)
+            self.dropped += 1
+        if len(self._canonical) > 4 * self.limit:
+            self._canonical.clear()
+
+    def _original(self, url: str, a: Article, pending: set) -> Optional[str]:
+        # the milestone `a` repeats, if any; indexes `a` when it repeats nothing
+        while True:
+            original = self._index.add_candidate(url, a.url, a.title, a.source or "")
+            if original is None and a.content:
+                original = self._index.add_text(url, a.content)
+            if original is None:
+                return None
+            # the original may itself have come in as a copy earlier
+            original = self._aliases.get(original, original)
+            if original in self._by_url or original in pending:
+                return original
+            # a dropped milestone's leftover: forget it, and `a` as indexed so far
+            self._index.remove(original)
+            self._index.remove(url)
+
+    def unseen(self, articles: List[Article]) -> List[Article]:
+        # the articles merge() would date: not on the timeline yet, or changed
+        with self._lock:
+            out = []
+            for a in articles:
+                url = self._url(a.url)
+                if url in self._aliases:
+                    continue
+                key = self._by_url.get(url) if url else None
+                if key is None or _changed(a, self._milestones[self._at(key)].article):
+                    out.append(a)
+            return out
+
+    @traced("merge_timeline", detail=lambda self, articles: f"{len(articles)} articles into {len(self)}")
+    def merge(self, articles: List[Article]) -> List[Article]:
+        """
+        Merge a refresh's articles; returns them as the timeline now holds
+        them, in the same order: a known article is replaced by the
+        timeline's copy, a corroborating one by the article of the milestone
+        it corroborates (so the list may come back shorter, never with the
+        same article twice).
+        """
+        with self._lock:
+            out = []
+            dated = []  # (url, article, milestone it replaces or None)
+            pending = set()
+            copies = []  # (url, article, url of the article it repeats)
+            for a in articles:
+                url = self._key(a)
+                if url in pending:
+                    out.append(url)  # listed twice in this batch
+                    continue
+                if url in self._aliases:
+                    out.append(self._aliases[url])
+                    continue
+                if url in self._by_url:
+                    old = self._milestones[self._at(self._by_url[url])]
+                    if _changed(a, old.article):
+                        dated.append((url, a, self._remove(url)))
+                        pending.add(url)
+                    out.append(url)
+                    continue
+                original = self._original(url, a, pending)
+                if original is not None:
+                    copies.append((url, a, original))
+                    out.append(original)
+                    continue
+                dated.append((url, a, None))
+                pending.add(url)
+                out.append(url)
+
+            if dated:
+                dates = iso_dates(article_dates([a for _, a, _ in dated]))
+                for (url, a, old), date in zip(dated, dates):
+                    if old is None:
+                        self._insert(url, Milestone(date, a))
+                        self.inserted += 1
+                        continue
+                    a.duplicates = tuple(dict.fromkeys(old.article.duplicates + a.duplicates))
+                    old.date, old.article = date, a
+                    self._insert(url, old)
+                    self.updated += 1
+
+            for url, a, original in copies:
+                m = self._milestones[self._at(self._by_url[original])]
+                if a.source and a.source != m.source and a.source not in m.corroborations:
+                    m.corroborations += (a.source,)
+                if a.url and a.url != m.url and a.url not in m.article.duplicates:
+                    m.article.add_duplicate(a.url)
+                self._aliases[url] = original
+                self._copies.setdefault(original, []).append(url)
+                self.corroborated += 1
+                self.version += 1
+
+            seen, articles_out = set(), []
+            for url in out:
+                url = self._aliases.get(url, url)
+                if url not in seen:
+                    seen.add(url)
+                    articles_out.append(self._milestones[self._at(self._by_url[url])].article)
+            self._trim()
+            return articles_out
+
+    def milestone(self, url: str) -> Optional[Milestone]:
+        # the milestone holding `url`, as its own article or a copy
+        with self._lock:
+            url = self._url(url)
+            key = self._by_url.get(self._aliases.get(url, url))
+            return self._milestones[self._at(key)] if key is not None else None
+
+    def milestones(self) -> List[Milestone]:
+        with self._lock:
+            return list(self._milestones)
+
+    def __len__(self):
+        return len(self._milestones)
+
+
+_timelines: "OrderedDict[str, TopicTimeline]" = OrderedDict()
+_timelines_lock = threading.Lock()
+
+
+def get_topic_timeline(query: str) -> TopicTimeline:
+    # the process-wide timeline of a topic (normalized query), created on
+    # first use; least recently used topics go past TOPIC_TIMELINES or once
+    # the others' text is over TOPIC_TIMELINES_MAX_MB
+    key = normalize_query(query)
+    with _timelines_lock:
+        timeline = _timelines.get(key)
+        if timeline is None:
+            timeline = _timelines[key] = TopicTimeline()
+        else:
+            _timelines.move_to_end(key)
+        budget = TOPIC_TIMELINES_MAX_MB * 1024 * 1024
+        while len(_timelines) > 1 and (len(_timelines) > TOPIC_TIMELINES
+                                        or sum(t.size for t in _timelines.values()) > budget):
+            _timelines.popitem(last=False)
+        return timeline
+
+
+def topic_stats() -> Dict:
+    with _timelines_lock:
+        timelines = list(_timelines.values())
+    return {
+        "topics": len(timelines),
+        "milestones": sum(len(t) for t in timelines),
+        "mb": round(sum(t.size for t in timelines) / (1024 * 1024), 1),
+        "inserted": sum(t.inserted for t in timelines),
+        "updated": sum(t.updated for t in timelines),
+        "corroborated": sum(t.corroborated for t in timelines),
+        "dropped": sum(t.dropped for t in timelines),
+    }
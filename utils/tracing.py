@@ -0,0 +1,246 @@
+# utils/tracing.py
+# Per-stage timing: spans for the current run (the Streamlit debug
+# waterfall), process-wide latency histograms (Prometheus text / JSON) and an
+# optional profiler around one run.
+import contextvars
+import cProfile
+import functools
+import inspect
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+TRACING = os.getenv("TRACING", "1") != "0"
+TRACE_PROFILE = os.getenv("TRACE_PROFILE", "")  # "", "cprofile" or "sample"
+PROFILE_SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL", "0.005"))
+
+# seconds; Prometheus-style cumulative buckets, +Inf is implied
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float):
+        i = 0
+        while i < len(self.buckets) and seconds > self.buckets[i]:
+            i += 1
+        self.counts[i] += 1
+        self.sum += seconds
+        self.count += 1
+
+
+_histograms: Dict[str, Histogram] = {}
+_histograms_lock = threading.Lock()
+
+
+def observe(stage: str, seconds: float):
+    with _histograms_lock:
+        h = _histograms.get(stage)
+        if h is None:
+            h = _histograms[stage] = Histogram()
+        h.observe(seconds)
+
+
+def histograms_json() -> Dict[str, Dict]:
+    # {stage: {count, sum, buckets: {le: cumulative count}}}
+    out = {}
+    with _histograms_lock:
+        for stage, h in sorted(_histograms.items()):
+            cumulative, buckets = 0, {}
+            for le, n in zip([str(b) for b in h.buckets] + ["+Inf"], h.counts):
+                cumulative += n
+                buckets[le] = cumulative
+            out[stage] = {"count": h.count, "sum": round(h.sum, 6), "buckets": buckets}
+    return out
+
+
+def prometheus_text() -> str:
+    lines = [
+        "# HELP news_stage_seconds Time spent per pipeline stage.",
+        "# TYPE news_stage_seconds histogram",
+    ]
+    for stage, h in histograms_json().items():
+        for le, n in h["buckets"].items():
+            lines.append(f'news_stage_seconds_bucket{{stage="{stage}",le="{le}"}} {n}')
+        lines.append(f'news_stage_seconds_sum{{stage="{stage}"}} {h["sum"]}')
+        lines.append(f'news_stage_seconds_count{{stage="{stage}"}} {h["count"]}')
+    return "\n".join(lines) + "\n"
+
+
+class Trace:
+    """
+    Spans recorded while one run was active. Spans from worker threads are
+    included when the work was submitted with the caller's context (see
+    fetcher.iter_extracted). `profile` holds the profiler report, if any.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started = time.perf_counter()
+        self.spans: List[Dict] = []
+        self.profile: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def add(self, name: str, start: float, end: float, detail: str = "", error: bool = False):
+        with self._lock:
+            self.spans.append({
+                "stage": name,
+                "detail": detail,
+                "start": round(start - self.started, 6),
+                "duration": round(end - start, 6),
+                "thread": threading.current_thread().name,
+                "error": error,
+            })
+
+    def waterfall(self) -> List[Dict]:
+        with self._lock:
+            return sorted(self.spans, key=lambda s: s["start"])
+
+    def totals(self) -> Dict[str, float]:
+        # summed seconds per stage (overlapping spans count fully)
+        out = Counter()
+        for s in self.waterfall():
+            out[s["stage"]] += s["duration"]
+        return dict(out)
+
+
+_current: contextvars.ContextVar = contextvars.ContextVar("trace", default=None)
+
+
+def current_trace() -> Optional[Trace]:
+    return _current.get()
+
+
+@contextmanager
+def span(name: str, detail: str = ""):
+    if not TRACING:
+        yield
+        return
+    start = time.perf_counter()
+    error = False
+    try:
+        yield
+    except GeneratorExit:
+        raise  # a stream closed early by its consumer
+    except BaseException:
+        error = True
+        raise
+    finally:
+        end = time.perf_counter()
+        observe(name, end - start)
+        trace = _current.get()
+        if trace is not None:
+            trace.add(name, start, end, detail, error)
+
+
+def traced(name: str, detail: Callable[..., str] = None):
+    # decorator form of span(); generator functions are timed until exhausted
+    def wrap(fn):
+        def describe(args, kwargs):
+            try:
+                return str(detail(*args, **kwargs))[:200] if detail else ""
+            except Exception:
+                return ""
+
+        if inspect.isgeneratorfunction(fn):
+            @functools.wraps(fn)
+            def gen(*args, **kwargs):
+                with span(name, describe(args, kwargs)):
+                    yield from fn(*args, **kwargs)
+            return gen
+
+        @functools.wraps(fn)
+        def call(*args, **kwargs):
+            with span(name, describe(args, kwargs)):
+                return fn(*args, **kwargs)
+        return call
+    return wrap
+
+
+_IDLE_FILES = ("threading.py", "selectors.py", "queue.py", "socketserver.py")
+
+
+def _sample(stop: threading.Event, interval: float, counts: Counter):
+    # poor man's sampling profiler: the stack of every busy thread, every
+    # `interval`; threads parked in a wait/select are skipped
+    me = threading.get_ident()
+    while not stop.wait(interval):
+        for ident, frame in sys._current_frames().items():
+            if ident == me or os.path.basename(frame.f_code.co_filename) in _IDLE_FILES:
+                continue
+            seen = set()
+            while frame is not None:
+                code = frame.f_code
+                key = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+                if key not in seen:  # count recursion once
+                    counts[key] += 1
+                    seen.add(key)
+                frame = frame.f_back
+            counts["<samples>"] += 1
+
+
+@contextmanager
+def start_trace(name: str, profile: str = TRACE_PROFILE, top: int = 30):
+    """
+    Collect spans for one run. profile="cprofile" profiles the calling thread
+    with cProfile; profile="sample" samples every thread's stack, which also
+    covers the extraction and LLM worker pools. The report lands in
+    trace.profile.
+    """
+    trace = Trace(name)
+    token = _current.set(trace)
+    profiler, sampler, stop, counts = None, None, threading.Event(), Counter()
+    if profile == "cprofile":
+        profiler = cProfile.Profile()
+        profiler.enable()
+    elif profile == "sample":
+        sampler = threading.Thread(target=_sample, args=(stop, PROFILE_SAMPLE_INTERVAL, counts), daemon=True)
+        sampler.start()
+    try:
+        with span("request", name):
+            yield trace
+    finally:
+        _current.reset(token)
+        if profiler is not None:
+            profiler.disable()
+            out = io.StringIO()
+            pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(top)
+            trace.profile = out.getvalue()
+        if sampler is not None:
+            stop.set()
+            sampler.join()
+            total = counts.pop("<samples>", 0) or 1
+            rows = [f"{n / total:6.1%}  {key}" for key, n in counts.most_common(top)]
+            trace.profile = f"{total} thread samples every {PROFILE_SAMPLE_INTERVAL * 1000:.0f} ms (share with the function on the stack)\n" + "\n".join(rows)
+
+
+def plot_waterfall(trace: Trace):
+    # horizontal bars: one row per span, in start order
+    import plotly.graph_objects as go
+    spans = trace.waterfall()
+    if not spans:
+        return None
+    labels = [f"{s['stage']} {s['detail'][:50]}".strip() + f" #{i}" for i, s in enumerate(spans)]
+    fig = go.Figure(go.Bar(
+        y=labels,
+        x=[s["duration"] * 1000 for s in spans],
+        base=[s["start"] * 1000 for s in spans],
+        orientation="h",
+        hovertext=[f"{s['stage']} · {s['duration'] * 1000:.1f} ms · {s['thread']}" for s in spans],
+        marker_color=["#d62728" if s["error"] else "#1f77b4" for s in spans],
+    ))
+    fig.update_yaxes(autorange="reversed", showticklabels=len(spans) <= 60)
+    fig.update_layout(height=min(1200, 120 + 18 * len(spans)), margin=dict(l=20, r=20, t=30, b=20),
+                      xaxis_title="ms since request start", showlegend=False)
+    return fig